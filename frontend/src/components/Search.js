@@ -297,7 +297,7 @@ function Search({ onLogout }) {
                 <div className="container-section">
                   <div className="container-title">{currentResult.container || 'Container necunoscut'}</div>
                   <img
-                    src={currentResult.container_type_data?.imagine_url || 'http://localhost:8000/media/container_types/Container.png'}
+                    src={currentResult.container_type_data?.thumb_url || currentResult.container_type_data?.imagine_url || 'http://localhost:8000/media/container_types/Container.png'}
                     alt="Container"
                     className="container-image-large"
                     onError={(e) => {
@@ -312,7 +312,7 @@ function Search({ onLogout }) {
                     <div className="ship-name">{currentResult.nume_nava || 'Nava nedefinită'}</div>
                     {currentResult.ship_data && currentResult.ship_data.pavilion_data && currentResult.ship_data.pavilion_data.imagine_url && (
                       <img
-                        src={currentResult.ship_data.pavilion_data.imagine_url}
+                        src={currentResult.ship_data.pavilion_data.thumb_url || currentResult.ship_data.pavilion_data.imagine_url}
                         alt="Pavilion"
                         title={currentResult.ship_data.pavilion_data.nume_tara || currentResult.ship_data.pavilion_data.nume}
                         className="flag-image-inline"
@@ -322,7 +322,7 @@ function Search({ onLogout }) {
 
                   {currentResult.ship_data && currentResult.ship_data.imagine_url && (
                     <img
-                      src={currentResult.ship_data.imagine_url}
+                      src={currentResult.ship_data.thumb_url || currentResult.ship_data.imagine_url}
                       alt="Navă"
                       className="ship-image"
                     />
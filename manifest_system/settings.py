@@ -60,6 +60,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Pentru servirea fișierelor statice în producție
+    'manifests.instrumentation.RequestTimingMiddleware',  # Activ doar cu REQUEST_TIMING_ENABLED=True
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -220,3 +221,66 @@ if not DEBUG:
     SECURE_BROWSER_XSS_FILTER = True
     SECURE_CONTENT_TYPE_NOSNIFF = True
     X_FRAME_OPTIONS = 'DENY'
+
+# Cache-uri in memorie pentru tabelele de referinta (manifests/lookups.py)
+LOOKUP_CACHE_SIZE = int(os.environ.get('LOOKUP_CACHE_SIZE', '2048'))
+LOOKUP_CACHE_TTL = int(os.environ.get('LOOKUP_CACHE_TTL', '300'))  # secunde
+# Cat de des verifica un proces daca anul activ a fost schimbat de alt proces
+ACTIVE_YEAR_CHECK_INTERVAL = int(os.environ.get('ACTIVE_YEAR_CHECK_INTERVAL', '5'))  # secunde
+
+# Cache pentru raspunsurile API-ului de cautare (manifests/search_cache.py)
+# SEARCH_CACHE_BACKEND: file (implicit), db sau locmem (per proces)
+# Versiunile de invalidare (raspunsuri, anul activ, anii arhivati) sunt in cache-ul
+# 'versions', mereu partajat intre procesele web si run_jobs: file, sau db cu
+# SEARCH_CACHE_BACKEND=db. Pentru db trebuie rulat o data: python manage.py createcachetable
+SEARCH_CACHE_BACKEND = os.environ.get('SEARCH_CACHE_BACKEND', 'file')
+SEARCH_CACHE_TIMEOUT = int(os.environ.get('SEARCH_CACHE_TIMEOUT', '300'))  # secunde
+
+_SEARCH_CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'manifests-search'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / 'cache' / 'search')),
+    'db': ('django.core.cache.backends.db.DatabaseCache', 'manifests_search_cache'),
+}
+_search_backend, _search_location = _SEARCH_CACHE_BACKENDS[SEARCH_CACHE_BACKEND]
+_version_backend, _version_location = {
+    'db': ('django.core.cache.backends.db.DatabaseCache', 'manifests_cache_versions'),
+}.get(SEARCH_CACHE_BACKEND, ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / 'cache' / 'versions')))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'search': {
+        'BACKEND': _search_backend,
+        'LOCATION': os.environ.get('SEARCH_CACHE_LOCATION', _search_location),
+        'TIMEOUT': SEARCH_CACHE_TIMEOUT,
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    'versions': {
+        'BACKEND': _version_backend,
+        'LOCATION': os.environ.get('VERSION_CACHE_LOCATION', _version_location),
+        'TIMEOUT': None,
+    },
+}
+
+# Import in lot (manifests/batch_import.py)
+# IMPORT_BATCH_DIR: fisierele incarcate, pana le proceseaza run_jobs (nu e servit public)
+# IMPORT_WORKERS: procese pentru parsarea fisierelor; 0 = numarul de procesoare, 1 = secvential
+# IMPORT_ZIP_MAX_SIZE / IMPORT_ZIP_MAX_FILES: limite pentru o arhiva ZIP (dimensiunea dezarhivata, in octeti)
+IMPORT_BATCH_DIR = os.environ.get('IMPORT_BATCH_DIR', str(BASE_DIR / 'import_batches'))
+IMPORT_WORKERS = int(os.environ.get('IMPORT_WORKERS', '0'))
+IMPORT_ZIP_MAX_SIZE = int(os.environ.get('IMPORT_ZIP_MAX_SIZE', str(500 * 1024 * 1024)))
+IMPORT_ZIP_MAX_FILES = int(os.environ.get('IMPORT_ZIP_MAX_FILES', '500'))
+
+# Miniaturi pentru imaginile navelor, pavilioanelor si containerelor (manifests/thumbnails.py)
+# THUMBNAIL_DIR: subdirector in MEDIA_ROOT; THUMBNAIL_FORMAT: WEBP, JPEG sau PNG
+THUMBNAIL_DIR = os.environ.get('THUMBNAIL_DIR', 'thumbs')
+THUMBNAIL_FORMAT = os.environ.get('THUMBNAIL_FORMAT', 'WEBP').upper()
+
+# Masurarea cererilor (manifests/instrumentation.py): header Server-Timing si RequestTiming
+# REQUEST_TIMING_SAMPLE_RATE: fractiunea de cereri salvate; cele mai lente de REQUEST_TIMING_SLOW_MS sunt salvate mereu
+REQUEST_TIMING_ENABLED = os.environ.get('REQUEST_TIMING_ENABLED', 'False') == 'True'
+REQUEST_TIMING_SAMPLE_RATE = float(os.environ.get('REQUEST_TIMING_SAMPLE_RATE', '0.1'))
+REQUEST_TIMING_SLOW_MS = float(os.environ.get('REQUEST_TIMING_SLOW_MS', '1000'))
+# Masuratorile mai vechi sunt sterse automat (de middleware, cel mult o data pe ora per proces)
+REQUEST_TIMING_RETENTION_DAYS = int(os.environ.get('REQUEST_TIMING_RETENTION_DAYS', '14'))
@@ -1,16 +1,23 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.utils.html import format_html
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.urls import path
 from import_export import resources
 from import_export.admin import ImportExportModelAdmin
 from import_export.fields import Field
+from import_export.instance_loaders import ModelInstanceLoader
 from import_export.widgets import DateWidget
-from .models import ManifestEntry, DatabaseYear, ContainerType, Ship, Pavilion, ImportTemplate
+from .models import ManifestEntry, ManifestEntryArchive, DatabaseYear, ContainerType, Ship, Pavilion, ImportTemplate, StagedImport, YearSequence, Job, RequestTiming
+from .mapping import manual_values
+from .readers import iter_rows, UnsupportedFormat
+from .importer import DEFAULT_BATCH_SIZE, RelationResolver
+from . import archive, counters, deletion, jobs, lookups, search_cache, summaries, thumbnails
 from datetime import datetime
 
 
@@ -35,6 +42,66 @@ class CustomDateWidget(DateWidget):
         return super().clean(value, row, **kwargs)
 
 
+class ManifestEntryInstanceLoader(ModelInstanceLoader):
+    """
+    Intrarile existente pentru cheile (numar_manifest, numar_pozitie, container)
+    din fisier, citite cu un query per lot de randuri, nu cu un get() per rand.
+    """
+
+    def __init__(self, resource, dataset=None):
+        super().__init__(resource, dataset)
+        self.id_fields = [resource.fields[name] for name in resource.get_import_id_fields()]
+        self.instances = {}
+        if dataset is None or not all(field.column_name in dataset.headers for field in self.id_fields):
+            return
+
+        keys = {self.row_key(row) for row in dataset.dict} - {None}
+        keys = list(keys)
+        batch_size = resource._meta.batch_size or DEFAULT_BATCH_SIZE
+        for start in range(0, len(keys), batch_size):
+            chunk = keys[start:start + batch_size]
+            # Filtru pe fiecare camp (IN), apoi potrivire exacta pe cheia completa
+            filters = {
+                f'{field.attribute}__in': {key[i] for key in chunk}
+                for i, field in enumerate(self.id_fields)
+            }
+            wanted = set(chunk)
+            for instance in self.get_queryset().filter(**filters):
+                key = self.instance_key(instance)
+                if key in wanted:
+                    self.instances.setdefault(key, instance)
+
+    def _normalize(self, field, value):
+        # Aceeasi conversie ca la filtrarea in baza de date (ex: "12" / 12.0 -> 12)
+        return self.resource._meta.model._meta.get_field(field.attribute).to_python(value)
+
+    def row_key(self, row):
+        try:
+            return tuple(self._normalize(field, field.clean(row)) for field in self.id_fields)
+        except Exception:
+            # Randul primeste eroarea la import
+            return None
+
+    def instance_key(self, instance):
+        return tuple(self._normalize(field, field.get_value(instance)) for field in self.id_fields)
+
+    def get_instance(self, row):
+        key = self.row_key(row)
+        return self.instances.get(key) if key is not None else None
+
+    def add_pending(self, row, instance):
+        """Intrare noua: randurile urmatoare cu aceeasi cheie o actualizeaza, nu creeaza alta"""
+        key = self.row_key(row)
+        if key is not None:
+            self.instances[key] = instance
+
+    def forget_unsaved(self, instances):
+        """Dupa bulk_create fara id-uri (MySQL) intrarile nu mai pot fi actualizate in masa"""
+        unsaved = {id(instance) for instance in instances if instance.pk is None}
+        if unsaved:
+            self.instances = {key: instance for key, instance in self.instances.items() if id(instance) not in unsaved}
+
+
 class ManifestEntryResource(resources.ModelResource):
     """Resource pentru import/export Excel"""
 
@@ -66,42 +133,116 @@ class ManifestEntryResource(resources.ModelResource):
             'descriere_marfa', 'tip_operatiune', 'nume_nava', 'pavilion_nava', 'numar_sumara',
             'tip_container', 'linie_maritima', 'model_container'
         )
-
-    def before_import_row(self, row, **kwargs):
-        """Genereaza numar_curent automat inainte de import"""
-        # Get max numar_curent din baza de date
-        max_numar = ManifestEntry.objects.aggregate(models.Max('numar_curent'))['numar_curent__max']
-        if max_numar is None:
-            max_numar = 0
-        # Nu incrementam aici, o facem in after_import_row pentru fiecare rand nou
+        # Scriere in loturi: bulk_create / bulk_update in loc de save() per rand
+        use_bulk = True
+        batch_size = DEFAULT_BATCH_SIZE
+        instance_loader_class = ManifestEntryInstanceLoader
+
+    # Campuri calculate in before_save_instance / la rezolvarea relatiilor, scrise si la bulk_update
+    DERIVED_FIELDS = ['container_cod', 'container_cifre', 'container_type_rel', 'ship_rel', 'updated_at']
+
+    def before_import(self, dataset, **kwargs):
+        self.database_year_id = lookups.resolve_active_year_id()
+        self.relations = RelationResolver()
+        self.instance_loader = None
+        self.touched_years = set()
+
+    def get_or_init_instance(self, instance_loader, row):
+        self.instance_loader = instance_loader
+        instance, new = super().get_or_init_instance(instance_loader, row)
+        if new:
+            instance_loader.add_pending(row, instance)
+        return instance, new
+
+    def before_save_instance(self, instance, row, **kwargs):
+        """Campurile derivate se calculeaza aici; relatiile si numar_curent se seteaza pe lot"""
+        instance.populate_derived_fields()
+        if not instance.database_year_id:
+            instance.database_year_id = self.database_year_id
+        # Eroare pe rand: intrarile unui an arhivat nu ar mai fi citite (vezi archive.py)
+        archive.check_writable(instance.database_year_id)
+
+    def save_instance(self, instance, is_create, row, **kwargs):
+        if not is_create and instance.pk is None:
+            # Cheie repetata in fisier: intrarea e deja in lotul de creat
+            self.before_save_instance(instance, row, **kwargs)
+            return
+        super().save_instance(instance, is_create, row, **kwargs)
+
+    def bulk_create(self, using_transactions, dry_run, raise_errors, batch_size=None, result=None):
+        """Leaga relatiile, rezerva un bloc de numere curente si insereaza lotul"""
+        instances = list(self.create_instances)
+        if not instances or not (using_transactions or not dry_run):
+            return super().bulk_create(using_transactions, dry_run, raise_errors, batch_size, result)
+
+        errors = len(result.base_errors) if result else 0
+        try:
+            self.relations.resolve(instances)
+            by_year = {}
+            for instance in instances:
+                if not instance.numar_curent:
+                    by_year.setdefault(instance.database_year_id, []).append(instance)
+            # Un singur bloc rezervat per an, nu un numar per rand
+            for year_id, year_instances in by_year.items():
+                for instance, numar in zip(year_instances, YearSequence.reserve(year_id, len(year_instances))):
+                    instance.numar_curent = numar
+        except Exception as e:
+            self.create_instances.clear()
+            self.handle_import_error(result, e, raise_errors)
+            return
+
+        super().bulk_create(using_transactions, dry_run, raise_errors, batch_size, result)
+        if not result or len(result.base_errors) == errors:
+            # bulk_create nu trimite semnale - contoarele se actualizeaza explicit
+            counters.rows_created(ManifestEntry, instances)
+            self.touched_years.update(instance.database_year_id for instance in instances)
+        if self.instance_loader is not None:
+            self.instance_loader.forget_unsaved(instances)
+
+    def bulk_update(self, using_transactions, dry_run, raise_errors, batch_size=None, result=None):
+        instances = list(self.update_instances)
+        if not instances or not (using_transactions or not dry_run):
+            return super().bulk_update(using_transactions, dry_run, raise_errors, batch_size, result)
+
+        errors = len(result.base_errors) if result else 0
+        try:
+            self.relations.resolve(instances)
+        except Exception as e:
+            self.update_instances.clear()
+            self.handle_import_error(result, e, raise_errors)
+            return
+
+        now = timezone.now()
+        for instance in instances:
+            instance.updated_at = now
+        super().bulk_update(using_transactions, dry_run, raise_errors, batch_size, result)
+        if not result or len(result.base_errors) == errors:
+            counters.rows_updated(ManifestEntry, instances)
+            self.touched_years.update(instance.database_year_id for instance in instances)
+
+    def get_bulk_update_fields(self):
+        return super().get_bulk_update_fields() + self.DERIVED_FIELDS
+
+    def after_import(self, dataset, result, **kwargs):
+        super().after_import(dataset, result, **kwargs)
+        # Fara semnale post_save - actualizam explicit rezumatul anului si cache-ul de cautare
+        if not self._is_dry_run(kwargs):
+            for year_id in self.touched_years:
+                summaries.refresh(year_id, imported=True)
+                search_cache.bump_year_version(year_id)
 
     def after_import_row(self, row, row_result, **kwargs):
-        """Seteaza numar_curent pentru randurile noi sau actualizate"""
-        if row_result.import_type in ['new', 'update']:
-            instance = row_result.instance
-            if instance and instance.pk:
-                # Daca e nou, setam numar_curent
-                if instance.numar_curent == 0:
-                    max_numar = ManifestEntry.objects.aggregate(models.Max('numar_curent'))['numar_curent__max']
-                    if max_numar is None:
-                        max_numar = 0
-                    instance.numar_curent = max_numar + 1
-                    instance.save(update_fields=['numar_curent'])
+        """Progresul importului rulat ca job (vezi jobs.run_resource_import)"""
+        progress = kwargs.get('progress')
+        if progress and kwargs.get('row_number'):
+            progress(kwargs['row_number'])
 
 
 # Admin actions globale - trebuie definite INAINTE de clase
 def sync_lookup_tables_action(modeladmin, request, queryset):
-    """Actiune admin pentru sincronizarea tabelelor de referinta"""
-    from django.core.management import call_command
-    from io import StringIO
-
-    # Capteaza output-ul command-ului
-    out = StringIO()
-    call_command('sync_lookup_tables', stdout=out)
-    output = out.getvalue()
-
-    # Afiseaza output-ul ca mesaj de succes
-    modeladmin.message_user(request, output)
+    """Actiune admin pentru sincronizarea tabelelor de referinta (rulata in fundal)"""
+    job = jobs.enqueue('sync_lookup_tables', user=request.user)
+    return redirect('admin:manifests_job_progress', job.id)
 
 sync_lookup_tables_action.short_description = 'Sincronizeaza tabele (ContainerType, Ship, Pavilion)'
 
@@ -141,23 +282,34 @@ class ManifestEntryAdmin(ImportExportModelAdmin):
     format_data_inregistrare.short_description = format_html('Data<br>Inregistrare')
     format_data_inregistrare.admin_order_field = 'data_inregistrare'
 
+    def get_queryset(self, request):
+        """Adaugă numărul de apariții ale containerului în an (un singur query pe pagină)"""
+        queryset = super().get_queryset(request)
+        duplicates = ManifestEntry.objects.filter(
+            container=OuterRef('container'),
+            database_year=OuterRef('database_year')
+        ).order_by().values('container').annotate(total=Count('id')).values('total')
+        return queryset.annotate(duplicate_count=Subquery(duplicates, output_field=models.IntegerField()))
+
+    def delete_queryset(self, request, queryset):
+        """"Șterge selectate": un singur DELETE, contoarele actualizate o dată (vezi deletion.py)"""
+        deletion.delete_entries(queryset)
+
     def format_container(self, obj):
         """Evidentiaza containerele duplicate cu galben"""
         if not obj.container:
             return '-'
 
-        # Numără câte înregistrări au același container în toată baza de date
-        count = ManifestEntry.objects.filter(
-            container=obj.container,
-            database_year=obj.database_year
-        ).count()
+        # Numărul de înregistrări cu același container în anul respectiv (anotat în get_queryset)
+        count = getattr(obj, 'duplicate_count', None) or 1
 
         if count > 1:
             # Container duplicat - evidențiază cu galben
             return format_html(
-                '<span style="background-color: #fff3cd;" '
+                '<span class="duplicate-container" data-duplicate-count="{}" style="background-color: #fff3cd;" '
                 'title="Container duplicat (apare de {} ori în baza de date)">{}</span>',
                 count,
+                count,
                 obj.container
             )
         else:
@@ -289,6 +441,8 @@ class ManifestEntryAdmin(ImportExportModelAdmin):
         urls = super().get_urls()
         custom_urls = [
             path('import-personalizat/', self.admin_site.admin_view(self.custom_import_view), name='manifests_manifestentry_custom_import'),
+            path('import-personalizat/preview/<int:staged_id>/', self.admin_site.admin_view(self.custom_import_preview_view), name='manifests_manifestentry_custom_import_preview'),
+            path('import-personalizat/lot/', self.admin_site.admin_view(self.batch_import_view), name='manifests_manifestentry_batch_import'),
         ]
         return custom_urls + urls
 
@@ -298,57 +452,52 @@ class ManifestEntryAdmin(ImportExportModelAdmin):
         extra_context['show_custom_import_button'] = True
         return super().changelist_view(request, extra_context)
 
+    def process_import(self, request, **kwargs):
+        """Confirmarea importului import-export: scrierea în baza de date rulează în fundal"""
+        from django.core.exceptions import PermissionDenied
+
+        if not self.has_import_permission(request):
+            raise PermissionDenied
+
+        confirm_form = self.create_confirm_form(request)
+        if not confirm_form.is_valid():
+            return super().process_import(request, **kwargs)
+
+        # Fișierul rămâne în tmp storage până îl citește jobul
+        job = jobs.enqueue(
+            'resource_import',
+            user=request.user,
+            import_file_name=confirm_form.cleaned_data['import_file_name'],
+            original_file_name=confirm_form.cleaned_data['original_file_name'],
+            format=int(confirm_form.cleaned_data['format']),
+        )
+        return redirect('admin:manifests_job_progress', job.id)
+
     def custom_import_view(self, request):
         """View pentru import personalizat cu template și mapare coloane - cu preview"""
         from django.shortcuts import render
         from django.http import HttpResponseRedirect
         from django.urls import reverse
-        import openpyxl
-        import xlrd
         from decimal import Decimal
         import json
 
         # Verifică dacă e confirmarea importului (Step 2)
         if request.method == 'POST' and request.POST.get('confirm_import') == 'true':
             try:
-                # Citește datele din sesiune
-                preview_data = request.session.get('import_preview_data')
-                if not preview_data:
+                # Sesiunea conține doar id-ul importului pregătit (datele sunt în StagedRow)
+                staged_id = request.session.get('import_staged_id')
+                staged = StagedImport.objects.filter(
+                    id=staged_id, user=request.user
+                ).select_related('database_year').first() if staged_id else None
+                if not staged or str(staged.id) != request.POST.get('staged_id'):
                     messages.error(request, 'Sesiunea a expirat. Vă rugăm să reîncărcați fișierul.')
                     return HttpResponseRedirect(reverse('admin:manifests_manifestentry_custom_import'))
 
-                active_year_id = preview_data.get('active_year_id')
-                entries_data = preview_data.get('entries_data', [])
-
-                active_year = DatabaseYear.objects.get(id=active_year_id)
-                entries_created = 0
-
-                # Creează înregistrările în baza de date
-                for entry_dict in entries_data:
-                    # Convertește înapoi data dacă există
-                    if 'data_inregistrare' in entry_dict and entry_dict['data_inregistrare']:
-                        from datetime import datetime
-                        entry_dict['data_inregistrare'] = datetime.strptime(entry_dict['data_inregistrare'], '%Y-%m-%d').date()
-
-                    # Convertește Decimal pentru greutate_bruta
-                    if 'greutate_bruta' in entry_dict and entry_dict['greutate_bruta']:
-                        entry_dict['greutate_bruta'] = Decimal(str(entry_dict['greutate_bruta']))
-
-                    entry_dict['database_year'] = active_year
+                # Importul propriu-zis rulează în fundal (run_jobs) - nu mai blocăm request-ul
+                job = jobs.enqueue('custom_import', user=request.user, staged_id=staged.id)
+                del request.session['import_staged_id']
 
-                    # Calculează numar_curent automat
-                    max_curent = ManifestEntry.objects.filter(database_year=active_year).aggregate(models.Max('numar_curent'))['numar_curent__max'] or 0
-                    entry_dict['numar_curent'] = max_curent + 1
-
-                    ManifestEntry.objects.create(**entry_dict)
-                    entries_created += 1
-
-                # Șterge datele din sesiune
-                del request.session['import_preview_data']
-                request.session.modified = True
-
-                messages.success(request, f'Import finalizat cu succes! {entries_created} înregistrări au fost create.')
-                return HttpResponseRedirect(reverse('admin:manifests_manifestentry_changelist'))
+                return HttpResponseRedirect(reverse('admin:manifests_job_progress', args=[job.id]))
 
             except Exception as e:
                 messages.error(request, f'Eroare la salvarea datelor: {str(e)}')
@@ -376,316 +525,98 @@ class ManifestEntryAdmin(ImportExportModelAdmin):
                 messages.error(request, 'Numărul manifestului este obligatoriu.')
                 return HttpResponseRedirect(reverse('admin:manifests_manifestentry_custom_import'))
 
+            staged = None
+
             try:
                 template = ImportTemplate.objects.get(id=template_id)
-                active_year = DatabaseYear.objects.filter(is_active=True).first()
+                active_year = lookups.active_year()
 
-                if not active_year:
+                if not active_year or not active_year.is_active:
                     messages.error(request, 'Nu există un an activ selectat. Vă rugăm să activați un an din secțiunea "Ani Baze Date".')
                     return HttpResponseRedirect(reverse('admin:manifests_manifestentry_custom_import'))
 
-                # Procesare fișier și colectare date pentru preview
+                # Procesare fișier - rândurile sunt salvate în loturi într-un import pregătit (StagedImport)
+                StagedImport.delete_stale()
+                staged = StagedImport.objects.create(
+                    user=request.user,
+                    database_year_id=active_year.id,
+                    template_name=template.nume,
+                    manual_fields={
+                        'numar_manifest': manual_numar_manifest,
+                        'numar_permis': manual_numar_permis,
+                        'data_inregistrare': manual_data_inregistrare,
+                        'cerere_operatiune': manual_cerere_operatiune,
+                        'nume_nava': manual_nume_nava,
+                        'pavilion_nava': manual_pavilion_nava,
+                    }
+                )
                 preview_entries = []
                 errors = []
 
-                # Funcție helper pentru a converti literă coloană Excel în index (A=1, B=2, etc.)
-                def excel_col_to_index(col_letter):
-                    """Convertește literă coloană Excel (A, B, AA, etc.) în index numeric"""
-                    col_letter = col_letter.upper().strip()
-                    result = 0
-                    for char in col_letter:
-                        result = result * 26 + (ord(char) - ord('A') + 1)
-                    return result
-
-                # Detectează formatul fișierului
-                file_extension = file.name.split('.')[-1].lower()
-
-                if file_extension == 'xlsx' or template.format_fisier == 'xlsx':
-                    workbook = openpyxl.load_workbook(file)
-                    sheet = workbook.active
-
-                    # Procesare rânduri
-                    for row_idx, row in enumerate(sheet.iter_rows(min_row=template.rand_start), template.rand_start):
-                        try:
-                            entry_data = {}
-
-                            # Mapare coloane din template (excel_col_letter este A, B, C, etc.)
-                            for db_field, excel_col_letter in template.mapare_coloane.items():
-                                # Sari peste câmpurile manuale - acestea nu se iau din Excel
-                                if db_field in ['numar_manifest', 'numar_permis', 'data_inregistrare', 'cerere_operatiune', 'nume_nava', 'pavilion_nava']:
-                                    continue
-
-                                try:
-                                    col_idx = excel_col_to_index(excel_col_letter)
-                                    cell_value = row[col_idx - 1].value
-
-                                    if cell_value is not None:
-                                        # Conversii speciale pentru tipuri de date
-                                        if db_field in ['numar_colete', 'numar_pozitie'] and cell_value:
-                                            entry_data[db_field] = int(float(cell_value)) if cell_value else None
-                                        elif db_field == 'greutate_bruta' and cell_value:
-                                            entry_data[db_field] = Decimal(str(cell_value)) if cell_value else None
-                                        elif db_field == 'tip_operatiune':
-                                            # Conversie tip operațiune: IMP -> I, TRS -> T
-                                            tip_op = str(cell_value).strip().upper()
-                                            if tip_op == 'IMP':
-                                                entry_data[db_field] = 'I'
-                                            elif tip_op == 'TRS':
-                                                entry_data[db_field] = 'T'
-                                            elif tip_op in ['I', 'T']:
-                                                entry_data[db_field] = tip_op
-                                            else:
-                                                # Validare: doar I sau T sunt permise
-                                                raise ValueError(f"Tip operațiune invalid: '{tip_op}'. Doar I, T, IMP sau TRS sunt permise.")
-                                        else:
-                                            entry_data[db_field] = str(cell_value).strip() if cell_value else ''
-                                except (IndexError, ValueError) as e:
-                                    if 'Tip operațiune invalid' in str(e):
-                                        raise  # Propagă eroarea de validare
-                                    continue
-
-                            # Aplică câmpurile manuale la toate rândurile
-                            entry_data['numar_manifest'] = manual_numar_manifest
-                            entry_data['numar_permis'] = manual_numar_permis
-                            entry_data['cerere_operatiune'] = manual_cerere_operatiune
-                            if manual_nume_nava:
-                                entry_data['nume_nava'] = manual_nume_nava
-                            if manual_pavilion_nava:
-                                entry_data['pavilion_nava'] = manual_pavilion_nava
-
-                            # Conversie data din format YYYY-MM-DD (HTML date input)
-                            if manual_data_inregistrare:
-                                from datetime import datetime
-                                try:
-                                    entry_data['data_inregistrare'] = datetime.strptime(manual_data_inregistrare, '%Y-%m-%d').date()
-                                except ValueError:
-                                    pass  # Dacă data nu e validă, nu o setează
-
-                            if entry_data:
-                                # Convertește date și Decimal în string pentru sesiune
-                                entry_data_serializable = {}
-                                for key, value in entry_data.items():
-                                    if hasattr(value, 'isoformat'):  # datetime.date
-                                        entry_data_serializable[key] = value.isoformat()
-                                    elif isinstance(value, Decimal):
-                                        entry_data_serializable[key] = str(value)
-                                    else:
-                                        entry_data_serializable[key] = value
-
-                                preview_entries.append(entry_data_serializable)
-
-                        except Exception as e:
-                            errors.append(f"Rând {row_idx}: {str(e)}")
-
-                elif file_extension == 'xls' or template.format_fisier == 'xls':
-                    # Încearcă să citești cu xlrd (pentru fișiere .xls vechi)
-                    xlrd_success = False
-                    try:
-                        workbook = xlrd.open_workbook(file_contents=file.read())
-                        sheet = workbook.sheet_by_index(0)
-                        xlrd_success = True
-                    except Exception as xlrd_error:
-                        # Fallback la openpyxl pentru fișiere .xls cu format nou
-                        try:
-                            file.seek(0)  # Resetează pointer-ul fișierului
-                            workbook = openpyxl.load_workbook(file)
-                            sheet = workbook.active
-                            xlrd_success = False  # Folosim openpyxl
-                        except Exception as openpyxl_error:
-                            raise Exception(f"Nu s-a putut citi fișierul .xls. Eroare xlrd: {xlrd_error}. Eroare openpyxl: {openpyxl_error}")
-
-                    # Procesare cu xlrd sau openpyxl în funcție de ce a funcționat
-                    if xlrd_success:
-                        # Procesare cu xlrd (format vechi .xls)
-                        for row_idx in range(template.rand_start - 1, sheet.nrows):
-                            try:
-                                entry_data = {}
-
-                                for db_field, excel_col_letter in template.mapare_coloane.items():
-                                    # Sari peste câmpurile manuale - acestea nu se iau din Excel
-                                    if db_field in ['numar_manifest', 'numar_permis', 'data_inregistrare', 'cerere_operatiune', 'nume_nava', 'pavilion_nava']:
-                                        continue
-
-                                    try:
-                                        col_idx = excel_col_to_index(excel_col_letter) - 1  # XLS folosește index 0-based
-                                        cell_value = sheet.cell_value(row_idx, col_idx)
-
-                                        if cell_value:
-                                            if db_field in ['numar_colete', 'numar_pozitie']:
-                                                entry_data[db_field] = int(float(cell_value)) if cell_value else None
-                                            elif db_field == 'greutate_bruta':
-                                                entry_data[db_field] = Decimal(str(cell_value)) if cell_value else None
-                                            elif db_field == 'tip_operatiune':
-                                                # Conversie tip operațiune: IMP -> I, TRS -> T
-                                                tip_op = str(cell_value).strip().upper()
-                                                if tip_op == 'IMP':
-                                                    entry_data[db_field] = 'I'
-                                                elif tip_op == 'TRS':
-                                                    entry_data[db_field] = 'T'
-                                                elif tip_op in ['I', 'T']:
-                                                    entry_data[db_field] = tip_op
-                                                else:
-                                                    # Validare: doar I sau T sunt permise
-                                                    raise ValueError(f"Tip operațiune invalid: '{tip_op}'. Doar I, T, IMP sau TRS sunt permise.")
-                                            else:
-                                                entry_data[db_field] = str(cell_value).strip()
-                                    except (IndexError, ValueError) as e:
-                                        if 'Tip operațiune invalid' in str(e):
-                                            raise  # Propagă eroarea de validare
-                                        continue
-
-                                # Aplică câmpurile manuale la toate rândurile
-                                entry_data['numar_manifest'] = manual_numar_manifest
-                                entry_data['numar_permis'] = manual_numar_permis
-                                entry_data['cerere_operatiune'] = manual_cerere_operatiune
-                                if manual_nume_nava:
-                                    entry_data['nume_nava'] = manual_nume_nava
-                                if manual_pavilion_nava:
-                                    entry_data['pavilion_nava'] = manual_pavilion_nava
-
-                                # Conversie data din format YYYY-MM-DD (HTML date input)
-                                if manual_data_inregistrare:
-                                    from datetime import datetime
-                                    try:
-                                        entry_data['data_inregistrare'] = datetime.strptime(manual_data_inregistrare, '%Y-%m-%d').date()
-                                    except ValueError:
-                                        pass  # Dacă data nu e validă, nu o setează
-
-                                if entry_data:
-                                    # Convertește date și Decimal în string pentru sesiune
-                                    entry_data_serializable = {}
-                                    for key, value in entry_data.items():
-                                        if hasattr(value, 'isoformat'):  # datetime.date
-                                            entry_data_serializable[key] = value.isoformat()
-                                        elif isinstance(value, Decimal):
-                                            entry_data_serializable[key] = str(value)
-                                        else:
-                                            entry_data_serializable[key] = value
-
-                                    preview_entries.append(entry_data_serializable)
-
-                            except Exception as e:
-                                errors.append(f"Rând {row_idx + 1}: {str(e)}")
-
-                    else:
-                        # Procesare cu openpyxl (fallback pentru .xls cu format nou)
-                        for row_idx, row in enumerate(sheet.iter_rows(min_row=template.rand_start), template.rand_start):
-                            try:
-                                entry_data = {}
-
-                                for db_field, excel_col_letter in template.mapare_coloane.items():
-                                    if db_field in ['numar_manifest', 'numar_permis', 'data_inregistrare', 'cerere_operatiune', 'nume_nava', 'pavilion_nava']:
-                                        continue
-
-                                    try:
-                                        col_idx = excel_col_to_index(excel_col_letter)
-                                        cell_value = row[col_idx - 1].value
-
-                                        if cell_value is not None:
-                                            if db_field in ['numar_colete', 'numar_pozitie'] and cell_value:
-                                                entry_data[db_field] = int(float(cell_value)) if cell_value else None
-                                            elif db_field == 'greutate_bruta' and cell_value:
-                                                entry_data[db_field] = Decimal(str(cell_value)) if cell_value else None
-                                            elif db_field == 'tip_operatiune':
-                                                tip_op = str(cell_value).strip().upper()
-                                                if tip_op == 'IMP':
-                                                    entry_data[db_field] = 'I'
-                                                elif tip_op == 'TRS':
-                                                    entry_data[db_field] = 'T'
-                                                elif tip_op in ['I', 'T']:
-                                                    entry_data[db_field] = tip_op
-                                                else:
-                                                    raise ValueError(f"Tip operațiune invalid: '{tip_op}'. Doar I, T, IMP sau TRS sunt permise.")
-                                            else:
-                                                entry_data[db_field] = str(cell_value).strip() if cell_value else ''
-                                    except (IndexError, ValueError) as e:
-                                        if 'Tip operațiune invalid' in str(e):
-                                            raise
-                                        continue
-
-                                # Aplică câmpurile manuale
-                                entry_data['numar_manifest'] = manual_numar_manifest
-                                entry_data['numar_permis'] = manual_numar_permis
-                                entry_data['cerere_operatiune'] = manual_cerere_operatiune
-                                if manual_nume_nava:
-                                    entry_data['nume_nava'] = manual_nume_nava
-                                if manual_pavilion_nava:
-                                    entry_data['pavilion_nava'] = manual_pavilion_nava
-
-                                if manual_data_inregistrare:
-                                    from datetime import datetime
-                                    try:
-                                        entry_data['data_inregistrare'] = datetime.strptime(manual_data_inregistrare, '%Y-%m-%d').date()
-                                    except ValueError:
-                                        pass
-
-                                if entry_data:
-                                    entry_data_serializable = {}
-                                    for key, value in entry_data.items():
-                                        if hasattr(value, 'isoformat'):
-                                            entry_data_serializable[key] = value.isoformat()
-                                        elif isinstance(value, Decimal):
-                                            entry_data_serializable[key] = str(value)
-                                        else:
-                                            entry_data_serializable[key] = value
-
-                                    preview_entries.append(entry_data_serializable)
-
-                            except Exception as e:
-                                errors.append(f"Rând {row_idx}: {str(e)}")
-
-                else:
-                    # Format de fișier nerecunoscut
-                    messages.error(request, f'Format de fișier nerecunoscut: .{file_extension}. Vă rugăm să încărcați un fișier .xlsx sau .xls')
+                # Câmpurile manuale aplicate pe fiecare rând (data vine din HTML date input)
+                manual = manual_values(staged.manual_fields)
+
+                def add_preview_entry(entry_data):
+                    """Aplică câmpurile manuale și adaugă rândul (serializabil) în preview"""
+                    entry_data.update(manual)
+
+                    # Convertește date și Decimal în string pentru sesiune
+                    entry_data_serializable = {}
+                    for key, value in entry_data.items():
+                        if hasattr(value, 'isoformat'):  # datetime.date
+                            entry_data_serializable[key] = value.isoformat()
+                        elif isinstance(value, Decimal):
+                            entry_data_serializable[key] = str(value)
+                        else:
+                            entry_data_serializable[key] = value
+
+                    preview_entries.append(entry_data_serializable)
+                    if len(preview_entries) >= 500:
+                        staged.add_rows(preview_entries)
+                        preview_entries.clear()
+
+                def add_streamed_rows(parsed_rows):
+                    for parsed in parsed_rows:
+                        if parsed.error:
+                            errors.append(f"Rând {parsed.row_idx}: {parsed.error}")
+                        else:
+                            add_preview_entry(parsed.data)
+
+                # Formatul (xlsx, xls sau CSV) e detectat după conținut, nu după extensie
+                try:
+                    parsed_rows = iter_rows(file, template)
+                except UnsupportedFormat:
+                    staged.delete()
+                    messages.error(request, f'Format de fișier nerecunoscut: {file.name}. Vă rugăm să încărcați un fișier .xlsx, .xls sau CSV')
                     return HttpResponseRedirect(reverse('admin:manifests_manifestentry_custom_import'))
 
-                # Salvează datele în sesiune pentru preview
+                # Citire streaming - doar coloanele mapate, rând cu rând
+                add_streamed_rows(parsed_rows)
+
+                if preview_entries:
+                    staged.add_rows(preview_entries)
+
                 if errors:
+                    staged.delete()
                     messages.error(request, f'Erori la procesarea fișierului: {"; ".join(errors[:5])}')
                     return HttpResponseRedirect(reverse('admin:manifests_manifestentry_custom_import'))
 
-                if not preview_entries:
+                if not staged.total_rows:
+                    staged.delete()
                     messages.warning(request, 'Nu s-au găsit date de importat în fișier.')
                     return HttpResponseRedirect(reverse('admin:manifests_manifestentry_custom_import'))
 
-                # Salvează în sesiune pentru Step 2
-                request.session['import_preview_data'] = {
-                    'active_year_id': active_year.id,
-                    'entries_data': preview_entries,
-                    'template_name': template.nume,
-                    'manual_fields': {
-                        'numar_manifest': manual_numar_manifest,
-                        'numar_permis': manual_numar_permis,
-                        'data_inregistrare': manual_data_inregistrare,
-                        'cerere_operatiune': manual_cerere_operatiune,
-                        'nume_nava': manual_nume_nava,
-                        'pavilion_nava': manual_pavilion_nava,
-                    }
-                }
-                request.session.modified = True
+                # În sesiune se păstrează doar id-ul importului pentru Step 2
+                request.session['import_staged_id'] = staged.id
 
                 # Redirecționează la preview
-                context = {
-                    **self.admin_site.each_context(request),
-                    'title': 'Previzualizare Import',
-                    'preview_entries': preview_entries[:50],  # Primele 50 pentru afișare
-                    'total_entries': len(preview_entries),
-                    'template_name': template.nume,
-                    'manual_fields': {
-                        'numar_manifest': manual_numar_manifest,
-                        'numar_permis': manual_numar_permis,
-                        'data_inregistrare': manual_data_inregistrare,
-                        'cerere_operatiune': manual_cerere_operatiune,
-                        'nume_nava': manual_nume_nava,
-                        'pavilion_nava': manual_pavilion_nava,
-                    },
-                    'opts': self.model._meta,
-                }
-                return render(request, 'admin/manifests/import_preview.html', context)
+                return HttpResponseRedirect(reverse('admin:manifests_manifestentry_custom_import_preview', args=[staged.id]))
 
             except ImportTemplate.DoesNotExist:
                 messages.error(request, 'Template-ul selectat nu există.')
             except Exception as e:
+                if staged is not None and staged.pk:
+                    staged.delete()
                 messages.error(request, f'Eroare la import: {str(e)}')
 
             return HttpResponseRedirect(reverse('admin:manifests_manifestentry_custom_import'))
@@ -700,6 +631,98 @@ class ManifestEntryAdmin(ImportExportModelAdmin):
         }
         return render(request, 'admin/manifests/custom_import.html', context)
 
+    def batch_import_view(self, request):
+        """Import în lot: mai multe fișiere Excel (sau ZIP), fiecare cu câmpurile manuale proprii"""
+        import shutil
+        from django.http import HttpResponseRedirect
+        from django.urls import reverse
+        from . import batch_import
+        from .mapping import MANUAL_FIELDS
+
+        if request.method == 'POST':
+            template_id = request.POST.get('template_id')
+            uploads = request.FILES.getlist('files')
+            redirect_url = reverse('admin:manifests_manifestentry_batch_import')
+
+            if not template_id or not uploads:
+                messages.error(request, 'Vă rugăm să selectați un template și să încărcați cel puțin un fișier.')
+                return HttpResponseRedirect(redirect_url)
+
+            template = ImportTemplate.objects.filter(id=template_id).first()
+            if template is None:
+                messages.error(request, 'Template-ul selectat nu există.')
+                return HttpResponseRedirect(redirect_url)
+
+            active_year = lookups.active_year()
+            if not active_year or not active_year.is_active:
+                messages.error(request, 'Nu există un an activ selectat. Vă rugăm să activați un an din secțiunea "Ani Baze Date".')
+                return HttpResponseRedirect(redirect_url)
+
+            # Fișierele sunt salvate pe disc; parsarea și importul rulează în fundal (run_jobs)
+            batch_dir = batch_import.new_batch_dir()
+            try:
+                files = []
+                for i, uploaded in enumerate(uploads):
+                    # Câmpurile manuale ale fișierului i vin ca numar_manifest_<i>, nume_nava_<i>, ...
+                    manual_fields = {name: request.POST.get(f'{name}_{i}', '').strip() for name in MANUAL_FIELDS}
+                    files.extend(batch_import.save_upload(batch_dir, uploaded, manual_fields))
+            except batch_import.BatchError as e:
+                shutil.rmtree(batch_dir, ignore_errors=True)
+                messages.error(request, str(e))
+                return HttpResponseRedirect(redirect_url)
+
+            job = jobs.enqueue(
+                'batch_import',
+                user=request.user,
+                template_id=template.id,
+                year_id=active_year.id,
+                batch_dir=str(batch_dir),
+                files=files,
+            )
+            return HttpResponseRedirect(reverse('admin:manifests_job_progress', args=[job.id]))
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Import în Lot',
+            'templates': ImportTemplate.objects.all(),
+            'index_file_name': batch_import.INDEX_FILE_NAME,
+            'opts': self.model._meta,
+        }
+        return render(request, 'admin/manifests/batch_import.html', context)
+
+    def custom_import_preview_view(self, request, staged_id):
+        """Previzualizare paginată a unui import pregătit (Step 1 -> Step 2)"""
+        from django.http import HttpResponseRedirect
+        from django.urls import reverse
+
+        staged = StagedImport.objects.filter(id=staged_id, user=request.user).first()
+        if not staged or request.session.get('import_staged_id') != staged.id:
+            messages.error(request, 'Sesiunea a expirat. Vă rugăm să reîncărcați fișierul.')
+            return HttpResponseRedirect(reverse('admin:manifests_manifestentry_custom_import'))
+
+        per_page = 50
+        num_pages = max(1, -(-staged.total_rows // per_page))
+        try:
+            page = min(max(int(request.GET.get('page', 1)), 1), num_pages)
+        except ValueError:
+            page = 1
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Previzualizare Import',
+            'staged_id': staged.id,
+            'preview_rows': staged.page_rows(page, per_page),
+            'total_entries': staged.total_rows,
+            'page': page,
+            'num_pages': num_pages,
+            'previous_page': page - 1 if page > 1 else None,
+            'next_page': page + 1 if page < num_pages else None,
+            'template_name': staged.template_name,
+            'manual_fields': staged.manual_fields,
+            'opts': self.model._meta,
+        }
+        return render(request, 'admin/manifests/import_preview.html', context)
+
 
 # Admin pentru DatabaseYear
 @admin.register(DatabaseYear)
@@ -712,20 +735,21 @@ class DatabaseYearAdmin(admin.ModelAdmin):
         }
         js = ('admin/js/resizable_columns.js', 'admin/js/move_filters.js', 'admin/js/search_reset.js', 'admin/js/highlight_duplicates.js')
 
-    list_display = ['year', 'is_active', 'entries_count', 'created_at']
-    list_filter = ['is_active', 'year']
+    list_display = ['year', 'is_active', 'is_archived', 'entries_count', 'created_at']
+    list_filter = ['is_active', 'is_archived', 'year']
     search_fields = ['year']
     actions = ['activate_year']
 
-    def entries_count(self, obj):
-        return obj.entries.count()
-    entries_count.short_description = 'Numar Intrari'
-
     def activate_year(self, request, queryset):
+        if queryset.filter(is_archived=True).exists():
+            self.message_user(request, 'Un an arhivat nu poate fi activat. Rulați mai întâi: python manage.py archive_year <an> --restore', level=messages.ERROR)
+            return
         # Dezactiveaza toate
         DatabaseYear.objects.all().update(is_active=False)
         # Activeaza selectiile
         count = queryset.update(is_active=True)
+        # update() nu trimite semnale - invalideaza manual anul activ (si in celelalte procese)
+        lookups.active_year_provider.invalidate()
         self.message_user(request, f'{count} an(i) activat(i) cu succes.')
     activate_year.short_description = 'Activeaza anul selectat'
 
@@ -797,20 +821,16 @@ class PavilionAdmin(admin.ModelAdmin):
 
     def preview_imagine(self, obj):
         if obj.imagine:
-            return format_html('<img src="{}" width="50" height="30" style="object-fit: contain;" />', obj.imagine.url)
+            return format_html('<img src="{}" width="50" height="30" style="object-fit: contain;" />', thumbnails.thumbnail_url(obj.imagine))
         return '-'
     preview_imagine.short_description = 'Preview'
 
     def preview_imagine_large(self, obj):
         if obj.imagine:
-            return format_html('<img src="{}" width="200" style="object-fit: contain;" />', obj.imagine.url)
+            return format_html('<img src="{}" width="200" style="object-fit: contain;" />', thumbnails.thumbnail_url(obj.imagine, 'large'))
         return '-'
     preview_imagine_large.short_description = 'Preview Imagine'
 
-    def ships_count(self, obj):
-        return obj.ships.count()
-    ships_count.short_description = 'Numar Nave'
-
 
 # Admin pentru Ship
 @admin.register(Ship)
@@ -841,26 +861,22 @@ class ShipAdmin(admin.ModelAdmin):
 
     def preview_imagine(self, obj):
         if obj.imagine:
-            return format_html('<img src="{}" width="60" height="40" style="object-fit: cover; border-radius: 4px;" />', obj.imagine.url)
+            return format_html('<img src="{}" width="60" height="40" style="object-fit: cover; border-radius: 4px;" />', thumbnails.thumbnail_url(obj.imagine))
         return '-'
     preview_imagine.short_description = 'Nava'
 
     def preview_imagine_large(self, obj):
         if obj.imagine:
-            return format_html('<img src="{}" width="300" style="object-fit: contain;" />', obj.imagine.url)
+            return format_html('<img src="{}" width="300" style="object-fit: contain;" />', thumbnails.thumbnail_url(obj.imagine, 'large'))
         return '-'
     preview_imagine_large.short_description = 'Preview Imagine'
 
     def preview_pavilion(self, obj):
         if obj.pavilion and obj.pavilion.imagine:
-            return format_html('<img src="{}" width="50" height="30" style="object-fit: contain;" />', obj.pavilion.imagine.url)
+            return format_html('<img src="{}" width="50" height="30" style="object-fit: contain;" />', thumbnails.thumbnail_url(obj.pavilion.imagine))
         return '-'
     preview_pavilion.short_description = 'Pavilion'
 
-    def entries_count(self, obj):
-        return obj.entries.count()
-    entries_count.short_description = 'Intrari'
-
 
 # Filtru custom pentru containere cu/fara imagine
 class HasImageFilter(admin.SimpleListFilter):
@@ -911,20 +927,16 @@ class ContainerTypeAdmin(admin.ModelAdmin):
 
     def preview_imagine(self, obj):
         if obj.imagine:
-            return format_html('<img src="{}" width="60" height="40" style="object-fit: cover; border-radius: 4px;" />', obj.imagine.url)
+            return format_html('<img src="{}" width="60" height="40" style="object-fit: cover; border-radius: 4px;" />', thumbnails.thumbnail_url(obj.imagine))
         return '-'
     preview_imagine.short_description = 'Preview'
 
     def preview_imagine_large(self, obj):
         if obj.imagine:
-            return format_html('<img src="{}" width="300" style="object-fit: contain;" />', obj.imagine.url)
+            return format_html('<img src="{}" width="300" style="object-fit: contain;" />', thumbnails.thumbnail_url(obj.imagine, 'large'))
         return '-'
     preview_imagine_large.short_description = 'Preview Imagine'
 
-    def entries_count(self, obj):
-        return obj.entries.count()
-    entries_count.short_description = 'Intrari'
-
     def extract_unique_containers(self, request, queryset):
         """Extrage automat model_container unice din ManifestEntry si le adauga in ContainerType"""
         unique_containers = ManifestEntry.objects.exclude(model_container='').values('model_container', 'tip_container').distinct()
@@ -1084,6 +1096,160 @@ class ImportTemplateAdmin(admin.ModelAdmin):
     )
 
 
+# Admin pentru ManifestEntryArchive
+@admin.register(ManifestEntryArchive)
+class ManifestEntryArchiveAdmin(admin.ModelAdmin):
+    """Intrările anilor arhivați (python manage.py archive_year) - doar vizualizare"""
+
+    class Media:
+        css = {
+            'all': ('admin/css/custom_admin.css',)
+        }
+        js = ('admin/js/resizable_columns.js', 'admin/js/move_filters.js', 'admin/js/search_reset.js')
+
+    list_display = [
+        'numar_curent', 'numar_manifest', 'data_inregistrare', 'container', 'model_container',
+        'numar_colete', 'greutate_bruta', 'nume_nava', 'database_year'
+    ]
+    list_filter = ['database_year']
+    list_select_related = ['database_year']
+    search_fields = ['container', 'numar_manifest']
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+# Admin pentru Job
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Joburi rulate în fundal (importuri, sincronizări) - doar vizualizare"""
+
+    list_display = ['id', 'kind', 'status', 'format_progress', 'user', 'created_at', 'finished_at']
+    list_filter = ['status', 'kind']
+    readonly_fields = [
+        'kind', 'status', 'params', 'user', 'progress_current', 'progress_total',
+        'message', 'worker', 'created_at', 'started_at', 'finished_at', 'updated_at'
+    ]
+
+    def format_progress(self, obj):
+        if obj.progress_total:
+            return f'{obj.progress_current} / {obj.progress_total}'
+        return '-'
+    format_progress.short_description = 'Progres'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        urls = super().get_urls()
+        custom_urls = [
+            path('<int:job_id>/progress/', self.admin_site.admin_view(self.progress_view), name='manifests_job_progress'),
+            path('<int:job_id>/status/', self.admin_site.admin_view(self.status_view), name='manifests_job_status'),
+        ]
+        return custom_urls + urls
+
+    def get_job(self, request, job_id):
+        from django.shortcuts import get_object_or_404
+
+        queryset = Job.objects.all()
+        if not request.user.is_superuser:
+            queryset = queryset.filter(user=request.user)
+        return get_object_or_404(queryset, id=job_id)
+
+    def progress_view(self, request, job_id):
+        """Pagina de progres - se actualizează singură din status_view"""
+        job = self.get_job(request, job_id)
+        context = {
+            **self.admin_site.each_context(request),
+            'title': f'Job #{job.id} - {job.kind}',
+            'job': job,
+            'opts': self.model._meta,
+        }
+        return render(request, 'admin/manifests/job_progress.html', context)
+
+    def status_view(self, request, job_id):
+        """Endpoint JSON pentru polling"""
+        from django.http import JsonResponse
+
+        job = self.get_job(request, job_id)
+        return JsonResponse({
+            'id': job.id,
+            'kind': job.kind,
+            'status': job.status,
+            'status_display': job.get_status_display(),
+            'progress_current': job.progress_current,
+            'progress_total': job.progress_total,
+            'message': job.message,
+            'finished': job.is_finished,
+        })
+
+
+# Admin pentru RequestTiming
+@admin.register(RequestTiming)
+class RequestTimingAdmin(admin.ModelAdmin):
+    """Masuratorile cererilor (RequestTimingMiddleware) - doar vizualizare, plus sumar pe endpoint"""
+
+    change_list_template = 'admin/manifests/requesttiming_changelist.html'
+    list_display = ['created_at', 'method', 'endpoint', 'status_code', 'duration_ms', 'db_ms', 'render_ms', 'queries']
+    list_filter = ['method', 'status_code']
+    search_fields = ['endpoint']
+    readonly_fields = [
+        'endpoint', 'method', 'status_code', 'duration_ms', 'db_ms', 'render_ms',
+        'queries', 'slowest_sql', 'slowest_sql_ms', 'created_at'
+    ]
+
+    # Perioadele din sumar (zile); masuratorile mai vechi de MAX_AGE sunt sterse oricum
+    SUMMARY_DAYS = [1, 7, 14]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        urls = super().get_urls()
+        custom_urls = [
+            path('summary/', self.admin_site.admin_view(self.summary_view), name='manifests_requesttiming_summary'),
+        ]
+        return custom_urls + urls
+
+    def summary_view(self, request):
+        """Endpoint-urile ordonate dupa p95, pentru ultimele ?days= zile (agregate in SQL)"""
+        from datetime import timedelta
+        from .instrumentation import summarize
+
+        try:
+            days = int(request.GET.get('days', self.SUMMARY_DAYS[0]))
+        except ValueError:
+            days = self.SUMMARY_DAYS[0]
+        days = min(max(days, 1), self.SUMMARY_DAYS[-1])
+        timings = RequestTiming.objects.filter(created_at__gte=timezone.now() - timedelta(days=days))
+        rows = summarize(timings)
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Sumar timpi de răspuns',
+            'rows': rows,
+            'total': sum(row['count'] for row in rows),
+            'days': days,
+            'day_choices': self.SUMMARY_DAYS,
+            'retention_days': RequestTiming.MAX_AGE.days,
+            'opts': self.model._meta,
+        }
+        return render(request, 'admin/manifests/request_timing_summary.html', context)
+
+
 # Customizare titluri admin
 admin.site.site_header = "Registru import RE1"
 admin.site.site_title = "Registru import RE1"
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ManifestsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'manifests'
+
+    def ready(self):
+        # Inregistreaza semnalele (invalidare cache-uri de referinta etc.)
+        from . import signals  # noqa: F401
@@ -0,0 +1,109 @@
+"""
+Arhivarea anilor inchisi.
+
+Toti anii sunt in aceeasi tabela (manifests_manifestentry), deci indexurile
+folosite de cautarile si importurile anului curent cresc cu fiecare an vechi.
+Un an inchis poate fi mutat in tabela de arhiva (ManifestEntryArchive, aceleasi
+coloane si id-uri) cu:
+
+    python manage.py archive_year 2023
+    python manage.py archive_year 2023 --restore     # inapoi in tabela curenta
+
+Mutarea e un INSERT ... SELECT urmat de DELETE, in loturi, intr-o singura
+tranzactie; DatabaseYear.is_archived indica unde sunt intrarile anului.
+Citirile pentru un an (cautare, export, rezumat) folosesc entry_model(year_id).
+Contoarele nu se schimba (intrarile sunt mutate, nu sterse), iar rebuild()
+numara si randurile arhivate. Un an arhivat nu mai primeste intrari noi
+(check_writable): ar ajunge in tabela curenta, unde nu mai sunt citite.
+
+Partitionarea nativa MySQL nu e folosita: tabelele partitionate InnoDB nu
+suporta chei straine, iar ManifestEntry are trei.
+"""
+from django.db import connection, transaction
+
+from . import lookups, search_cache
+from .models import DatabaseYear, ManifestEntry, ManifestEntryArchive
+
+
+# Cate randuri sunt mutate intr-un singur INSERT ... SELECT
+MOVE_BATCH_SIZE = 5000
+
+
+class ArchiveError(ValueError):
+    """Anul nu poate fi arhivat (ex: este anul activ) sau este arhivat si nu poate primi intrari"""
+
+
+def check_writable(year_id):
+    """ArchiveError daca anul este arhivat - intrarile lui se scriu doar dupa --restore"""
+    if lookups.is_archived_year(year_id):
+        year = DatabaseYear.objects.filter(pk=year_id).values_list('year', flat=True).first()
+        raise ArchiveError(
+            f'Registrul {year} este arhivat; restaurați-l (archive_year {year} --restore) înainte de a adăuga intrări.'
+        )
+
+
+def entry_model(year_id):
+    """Modelul (tabela) in care sunt intrarile anului"""
+    return ManifestEntryArchive if lookups.is_archived_year(year_id) else ManifestEntry
+
+
+def entries_for_year(year_id):
+    """Intrarile unui an, din tabela curenta sau din arhiva"""
+    return entry_model(year_id).objects.filter(database_year_id=year_id)
+
+
+def archive_year(database_year, batch_size=MOVE_BATCH_SIZE, progress=None):
+    """Muta intrarile anului in tabela de arhiva; intoarce numarul de randuri mutate"""
+    if database_year.is_active:
+        raise ArchiveError(f'{database_year} este anul activ și nu poate fi arhivat.')
+    return _move(database_year, ManifestEntry, ManifestEntryArchive, True, batch_size, progress)
+
+
+def restore_year(database_year, batch_size=MOVE_BATCH_SIZE, progress=None):
+    """Muta intrarile anului inapoi in tabela curenta; intoarce numarul de randuri mutate"""
+    return _move(database_year, ManifestEntryArchive, ManifestEntry, False, batch_size, progress)
+
+
+def _move(database_year, source, target, archived, batch_size, progress):
+    from . import summaries
+
+    # Cele doua modele au aceleasi coloane (ManifestEntryBase + aceleasi relatii)
+    columns = [field.column for field in source._meta.concrete_fields]
+    quote = connection.ops.quote_name
+    column_list = ', '.join(quote(column) for column in columns)
+    pk = quote(source._meta.pk.column)
+    year_column = quote(source._meta.get_field('database_year').column)
+    insert_sql = (
+        f'INSERT INTO {quote(target._meta.db_table)} ({column_list}) '
+        f'SELECT {column_list} FROM {quote(source._meta.db_table)} '
+        f'WHERE {year_column} = %s AND {pk} >= %s AND {pk} <= %s'
+    )
+    delete_sql = (
+        f'DELETE FROM {quote(source._meta.db_table)} '
+        f'WHERE {year_column} = %s AND {pk} >= %s AND {pk} <= %s'
+    )
+
+    moved = 0
+    last_id = 0
+    rows = source.objects.filter(database_year_id=database_year.pk).order_by('pk').values_list('pk', flat=True)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # Loturi pe intervale de id; urmatorul lot incepe dupa ultimul id mutat
+            while True:
+                ids = list(rows.filter(pk__gt=last_id)[:batch_size])
+                if not ids:
+                    break
+                first_id, last_id = ids[0], ids[-1]
+                cursor.execute(insert_sql, [database_year.pk, first_id, last_id])
+                cursor.execute(delete_sql, [database_year.pk, first_id, last_id])
+                moved += len(ids)
+                if progress:
+                    progress(moved)
+
+        # save() trimite post_save - semnalele invalideaza anii arhivati in toate procesele
+        database_year.is_archived = archived
+        database_year.save(update_fields=['is_archived'])
+        # Rezumatul se recalculeaza din tabela in care sunt acum intrarile
+        summaries.refresh(database_year.pk)
+        search_cache.bump_year_version(database_year.pk)
+    return moved
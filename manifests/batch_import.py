@@ -0,0 +1,292 @@
+"""
+Import in lot: mai multe fisiere Excel/CSV (sau o arhiva ZIP) intr-o singura trimitere.
+
+Fiecare fisier are propriile campuri manuale (numar manifest, nava, ...).
+Admin-ul salveaza fisierele intr-un director temporar si inregistreaza un job
+'batch_import'; jobul parseaza fisierele in paralel (ProcessPoolExecutor -
+parsarea Excel e limitata de CPU) si trimite randurile fiecarui fisier valid,
+pe masura ce e parsat, unui singur BulkImporter (o tranzactie, numere curente
+consecutive). In memorie sunt doar randurile fisierelor in curs de parsare,
+nu ale intregului lot. Rezultatul jobului este un raport per fisier.
+
+Modulul nu importa modele la nivel de modul: functia parse_file ruleaza si in
+procese copil pornite cu 'spawn' (Windows), unde Django nu este initializat.
+"""
+import csv
+import io
+import os
+import shutil
+import uuid
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from pathlib import Path, PurePath
+
+from django.conf import settings
+
+from .mapping import MANUAL_FIELDS, get_plan, manual_values
+from .readers import iter_rows
+
+
+SHEET_EXTENSIONS = ('xlsx', 'xls', 'csv')
+
+# Fisier optional in arhiva ZIP cu campurile manuale per fisier:
+# fisier;numar_manifest;numar_permis;data_inregistrare;cerere_operatiune;nume_nava;pavilion_nava
+INDEX_FILE_NAME = 'manifeste.csv'
+
+# Cate erori se pastreaza in raport pentru un fisier
+MAX_FILE_ERRORS = 5
+
+
+class BatchError(ValueError):
+    """Lot invalid (arhiva corupta, fisier fara numar de manifest etc.)"""
+
+
+def extension(file_name):
+    return PurePath(file_name).suffix.lstrip('.').lower()
+
+
+def new_batch_dir():
+    """Director nou (gol) pentru fisierele unui lot"""
+    path = Path(settings.IMPORT_BATCH_DIR) / uuid.uuid4().hex
+    path.mkdir(parents=True)
+    return path
+
+
+def save_upload(batch_dir, uploaded, manual_fields):
+    """
+    Salveaza un fisier incarcat in directorul lotului. Un .xlsx/.xls/.csv devine un
+    fisier al lotului; dintr-un .zip sunt extrase fisierele .xlsx/.xls/.csv. Intoarce
+    lista de fisiere: {'name', 'path', 'manual_fields'}.
+    """
+    ext = extension(uploaded.name)
+    if ext == 'zip':
+        return _extract_zip(batch_dir, uploaded, manual_fields)
+    if ext not in SHEET_EXTENSIONS:
+        raise BatchError(f'{uploaded.name}: format nerecunoscut (sunt acceptate .xlsx, .xls, .csv și .zip).')
+    if not manual_fields.get('numar_manifest'):
+        raise BatchError(f'{uploaded.name}: numărul manifestului este obligatoriu.')
+
+    path = _unique_path(batch_dir, uploaded.name)
+    with open(path, 'wb') as out:
+        for chunk in uploaded.chunks():
+            out.write(chunk)
+    return [{'name': uploaded.name, 'path': str(path), 'manual_fields': manual_fields}]
+
+
+def _extract_zip(batch_dir, uploaded, manual_fields):
+    """
+    Fisierele de date din arhiva. Campurile manuale: randul din manifeste.csv
+    (daca exista), altfel cele din formular; fara numar de manifest, se
+    foloseste numele fisierului (ex: 2025-001.xlsx -> 2025-001).
+    Arhivele peste IMPORT_ZIP_MAX_FILES fisiere sau IMPORT_ZIP_MAX_SIZE octeti
+    dezarhivati sunt respinse inainte de a scrie ceva pe disc.
+    """
+    try:
+        archive = zipfile.ZipFile(uploaded)
+    except zipfile.BadZipFile:
+        raise BatchError(f'{uploaded.name}: arhiva ZIP nu poate fi citită.')
+
+    files = []
+    with archive:
+        members = [info for info in archive.infolist() if _is_sheet_member(info)]
+        _check_zip_limits(uploaded.name, members)
+        index = _read_index(archive)
+        for info in members:
+            # Doar numele fisierului - caile din arhiva nu ies din directorul lotului
+            name = PurePath(info.filename).name
+            fields = {**manual_fields, **index.get(name.lower(), {})}
+            if not fields.get('numar_manifest'):
+                fields['numar_manifest'] = PurePath(name).stem
+
+            path = _unique_path(batch_dir, name)
+            with archive.open(info) as source, open(path, 'wb') as out:
+                shutil.copyfileobj(source, out)
+            files.append({'name': f'{uploaded.name}/{name}', 'path': str(path), 'manual_fields': fields})
+
+    if not files:
+        raise BatchError(f'{uploaded.name}: arhiva nu conține fișiere .xlsx, .xls sau .csv.')
+    return files
+
+
+def _is_sheet_member(info):
+    """Fisier de date din arhiva (fara directoare, fisiere ascunse, __MACOSX si manifeste.csv)"""
+    name = PurePath(info.filename).name
+    if info.is_dir() or name.startswith('.') or '__MACOSX' in info.filename:
+        return False
+    return extension(name) in SHEET_EXTENSIONS and name.lower() != INDEX_FILE_NAME
+
+
+def _check_zip_limits(archive_name, members):
+    """
+    BatchError daca arhiva depaseste limitele (ex: o arhiva mica care s-ar
+    dezarhiva in gigaocteti). Dimensiunile sunt cele din directorul arhivei -
+    zipfile nu citeste mai mult de file_size dintr-un fisier.
+    """
+    if len(members) > settings.IMPORT_ZIP_MAX_FILES:
+        raise BatchError(
+            f'{archive_name}: arhiva conține {len(members)} fișiere (maxim {settings.IMPORT_ZIP_MAX_FILES}).'
+        )
+    total_size = sum(info.file_size for info in members)
+    if total_size > settings.IMPORT_ZIP_MAX_SIZE:
+        raise BatchError(
+            f'{archive_name}: arhiva dezarhivată are {total_size // (1024 * 1024)} MB '
+            f'(maxim {settings.IMPORT_ZIP_MAX_SIZE // (1024 * 1024)} MB).'
+        )
+
+
+def _read_index(archive):
+    """manifeste.csv din arhiva -> {nume fisier (lowercase): campuri manuale completate}"""
+    member = next((name for name in archive.namelist() if PurePath(name).name.lower() == INDEX_FILE_NAME), None)
+    if member is None:
+        return {}
+
+    text = archive.read(member).decode('utf-8-sig', errors='replace')
+    try:
+        dialect = csv.Sniffer().sniff(text.split('\n', 1)[0], delimiters=';,\t')
+    except csv.Error:
+        dialect = 'excel'
+
+    index = {}
+    for row in csv.DictReader(io.StringIO(text), dialect=dialect):
+        row = {(key or '').strip().lower(): (value or '').strip() for key, value in row.items()}
+        if row.get('fisier'):
+            index[row['fisier'].lower()] = {name: row[name] for name in MANUAL_FIELDS if row.get(name)}
+    return index
+
+
+def _unique_path(batch_dir, name):
+    """Acelasi nume poate aparea in mai multe arhive - prefixam cu un numar"""
+    path = Path(batch_dir) / name
+    counter = 1
+    while path.exists():
+        path = Path(batch_dir) / f'{counter}_{name}'
+        counter += 1
+    return path
+
+
+class ParseTemplate:
+    """
+    Ce folosesc cititoarele dintr-un ImportTemplate, fara acces la baza de date
+    (se poate trimite unui proces copil). Planul coloanelor vine din
+    mapping.get_plan, refolosit in fiecare proces cat timp template-ul e neschimbat.
+    """
+
+    def __init__(self, import_template):
+        self.pk = import_template.pk
+        self.updated_at = import_template.updated_at
+        self.mapare_coloane = import_template.mapare_coloane
+        self.rand_start = import_template.rand_start
+
+    def get_plan(self):
+        return get_plan(self)
+
+
+def parse_file(file, template):
+    """
+    Parseaza un fisier al lotului (ruleaza in procesul copil).
+    Intoarce {'name', 'rows', 'errors'}; randurile au deja campurile manuale aplicate.
+    """
+    result = {'name': file['name'], 'rows': [], 'errors': []}
+    manual = manual_values(file['manual_fields'])
+
+    try:
+        for parsed in iter_rows(file['path'], template):
+            if parsed.error:
+                result['errors'].append(f'Rând {parsed.row_idx}: {parsed.error}')
+            else:
+                parsed.data.update(manual)
+                result['rows'].append(parsed.data)
+    except Exception as e:
+        result['errors'].append(f'Fișierul nu poate fi citit: {e}')
+    return result
+
+
+def worker_count():
+    return settings.IMPORT_WORKERS or os.cpu_count() or 1
+
+
+def iter_parsed(files, template):
+    """
+    Rezultatele parsarii, in ordinea fisierelor, pe masura ce sunt gata. In
+    paralel sunt parsate cel mult worker_count() fisiere inaintea celui consumat,
+    deci rezultatele nu se aduna in memorie cand importul e mai lent decat parsarea.
+    Daca procesele nu pot fi pornite (ex: hosting care nu permite fork),
+    fisierele ramase sunt parsate secvential in procesul curent.
+    """
+    workers = min(worker_count(), len(files))
+    done = 0
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                remaining = iter(files)
+                pending = deque(executor.submit(parse_file, file, template) for file in islice(remaining, workers))
+                while pending:
+                    result = pending.popleft().result()
+                    file = next(remaining, None)
+                    if file is not None:
+                        pending.append(executor.submit(parse_file, file, template))
+                    done += 1
+                    yield result
+            return
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            pass
+
+    for file in files[done:]:
+        yield parse_file(file, template)
+
+
+def run(params, progress):
+    """
+    Executa un lot (apelat de jobul 'batch_import'). Fisierele cu erori nu sunt
+    importate; randurile celorlalte sunt inserate impreuna. Intoarce raportul.
+    """
+    from .importer import BulkImporter
+    from .models import DatabaseYear, ImportTemplate
+
+    files = params['files']
+    results = []
+    try:
+        database_year = DatabaseYear.objects.get(pk=params['year_id'])
+        template = ParseTemplate(ImportTemplate.objects.get(pk=params['template_id']))
+        importer = BulkImporter(database_year)
+
+        def imported(entries_created):
+            progress(len(results), message=f'{entries_created} înregistrări importate...')
+
+        def valid_rows():
+            # Randurile unui fisier sunt importate doar dupa ce tot fisierul a fost parsat fara erori
+            for result in iter_parsed(files, template):
+                rows = result.pop('rows')
+                result['count'] = len(rows)
+                results.append(result)
+                if rows and not result['errors']:
+                    yield from rows
+                progress(len(results), message=f'{importer.entries_created} înregistrări importate...', force=True)
+
+        progress(0, total=len(files), message=f'Se importă {len(files)} fișiere...', force=True)
+        importer.run(valid_rows(), progress=imported)
+    finally:
+        shutil.rmtree(params['batch_dir'], ignore_errors=True)
+
+    return report(results, importer.entries_created)
+
+
+def report(results, entries_created):
+    imported = sum(1 for result in results if result['count'] and not result['errors'])
+    lines = [
+        f'Import în lot finalizat: {entries_created} înregistrări create din '
+        f'{imported} fișiere (din {len(results)}).',
+        '',
+    ]
+    for result in results:
+        if result['errors']:
+            lines.append(f'✗ {result["name"]}: neimportat, {len(result["errors"])} erori')
+            lines.extend(f'    {error}' for error in result['errors'][:MAX_FILE_ERRORS])
+        elif not result['count']:
+            lines.append(f'– {result["name"]}: nu conține date de importat')
+        else:
+            lines.append(f'✓ {result["name"]}: {result["count"]} înregistrări')
+    return '\n'.join(lines)
@@ -0,0 +1,374 @@
+"""
+Benchmark-uri pentru caile critice: import (personalizat si import-export),
+sincronizarea tabelelor de referinta, cautarea API si lista din admin.
+
+Pentru fiecare dimensiune (ex: 1k / 10k / 100k randuri) si format (XLSX, XLS)
+se genereaza un manifest sintetic intr-un an nou, apoi fiecare pas e masurat:
+timp, numar de query-uri si memorie maxima (tracemalloc). Rezultatul e un
+raport JSON care poate fi comparat intre commit-uri:
+
+    python manage.py benchmark --rows 1000 10000 --output bench-a.json
+    python manage.py benchmark --rows 1000 10000 --compare bench-a.json
+
+Ruleaza pe baza de date configurata (SQLite sau MySQL cu DB_ENGINE=mysql),
+intr-o baza de date de test creata si stearsa de comanda. Cu --use-current-db
+ruleaza direct pe baza curenta; datele sintetice sunt sterse la final, iar anul
+activ este restaurat (Runner.run).
+"""
+import io
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from contextlib import contextmanager
+from decimal import Decimal
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+FORMATS = ('xlsx', 'xls')
+
+# .xls (BIFF8) are cel mult 65536 randuri pe foaie
+XLS_MAX_ROWS = 65535
+
+# Coloanele manifestului sintetic, in ordinea din fisier (A-G)
+SHEET_HEADERS = ['numar pozitie', 'container', 'numar colete', 'greutate bruta', 'descriere marfa', 'tip operatiune', 'tip container']
+TEMPLATE_MAPPING = {
+    'numar_pozitie': 'A', 'container': 'B', 'numar_colete': 'C', 'greutate_bruta': 'D',
+    'descriere_marfa': 'E', 'tip_operatiune': 'F', 'tip_container': 'G',
+}
+
+SHIP_NAMES = ['MSC ANNA', 'MAERSK KOWLOON', 'CMA CGM TIGRIS', 'EVER GIVEN', 'HAPAG ESSEN']
+FLAGS = ['PANAMA', 'LIBERIA', 'MALTA', 'MARSHALL ISLANDS', 'SINGAPORE']
+CONTAINER_TYPES = ['22G1', '45G1', '42G1', '22R1', '45R1']
+
+
+# Prefixul containerelor sintetice (si al model_container: BNCU22G1, BNCU45G1, ...)
+CONTAINER_OWNER = 'BNCU'
+
+
+def container_number(index):
+    """Numar de container sintetic, unic per index (ex: BNCU0000042)"""
+    return f'{CONTAINER_OWNER}{index:07d}'
+
+
+def sheet_rows(count):
+    """Randurile manifestului sintetic (fara antet)"""
+    for i in range(count):
+        yield [
+            str(i + 1),
+            container_number(i),
+            i % 40 + 1,
+            float(Decimal(1000 + i % 9000) + Decimal('0.5')),
+            f'Marfa generala lot {i % 500}',
+            'IMP' if i % 3 else 'TRS',
+            CONTAINER_TYPES[i % len(CONTAINER_TYPES)],
+        ]
+
+
+def make_xlsx(count):
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(SHEET_HEADERS)
+    for row in sheet_rows(count):
+        sheet.append(row)
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+def make_xls(count):
+    """.xls sintetic; None daca xlwt nu e instalat sau fisierul ar depasi limita formatului"""
+    try:
+        import xlwt
+    except ImportError:
+        return None
+    if count > XLS_MAX_ROWS:
+        return None
+
+    workbook = xlwt.Workbook()
+    sheet = workbook.add_sheet('Manifest')
+    for col, header in enumerate(SHEET_HEADERS):
+        sheet.write(0, col, header)
+    for row_idx, row in enumerate(sheet_rows(count), 1):
+        for col, value in enumerate(row):
+            sheet.write(row_idx, col, value)
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+FILE_MAKERS = {'xlsx': make_xlsx, 'xls': make_xls}
+
+
+def resource_dataset(count, numar_manifest):
+    """Dataset tablib cu antetele ManifestEntryResource"""
+    import tablib
+
+    dataset = tablib.Dataset(headers=[
+        'numar manifest', 'numar pozitie', 'container', 'nume nava', 'pavilion nava',
+        'tip container', 'data inregistrare', 'descriere marfa',
+    ])
+    for i in range(count):
+        dataset.append([
+            numar_manifest, str(i + 1), container_number(i), SHIP_NAMES[i % len(SHIP_NAMES)],
+            FLAGS[i % len(FLAGS)], CONTAINER_TYPES[i % len(CONTAINER_TYPES)], '15.03.2025', 'Marfa generala',
+        ])
+    return dataset
+
+
+@contextmanager
+def measure(result, track_memory=True):
+    """Completeaza result cu seconds, queries si peak_memory_kb pentru blocul masurat"""
+    if track_memory:
+        tracemalloc.start()
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            result['seconds'] = round(time.perf_counter() - start, 4)
+            result['queries'] = len(queries.captured_queries)
+            if track_memory:
+                result['peak_memory_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024)
+                tracemalloc.stop()
+
+
+class Runner:
+    """Ruleaza benchmark-urile pe baza de date curenta si aduna rezultatele"""
+
+    def __init__(self, sizes, formats=FORMATS, repeat=5, track_memory=True, log=None):
+        self.sizes = sizes
+        self.formats = formats
+        self.repeat = repeat
+        self.track_memory = track_memory
+        self.log = log or (lambda message: None)
+        self.results = []
+
+    def run(self):
+        """
+        Ruleaza toate seturile de date. La final (si dupa o eroare) baza de date
+        revine la starea de dinainte: anii sintetici, intrarile, template-ul,
+        joburile si tabelele de referinta create sunt sterse, iar anul activ si
+        anii arhivati sunt restaurati - comanda poate rula si pe baza curenta.
+        """
+        from django.contrib.auth.models import User
+        from django.db.models import Max
+        from django.test import Client
+        from .models import DatabaseYear
+
+        snapshot = self.snapshot()
+        self.year_ids = []
+        self.user = User.objects.filter(username='benchmark').first()
+        self.created_user = self.user is None
+        if self.created_user:
+            self.user = User.objects.create_superuser('benchmark', 'benchmark@example.com', None)
+        self.template = None
+        try:
+            self.client = Client()
+            self.client.force_login(self.user)
+            self.template = self.create_template()
+
+            # Fiecare set de date intr-un an nou (dupa anii existenti, incepand cu 3001)
+            year = max(3000, DatabaseYear.objects.aggregate(Max('year'))['year__max'] or 0)
+            for count in self.sizes:
+                for file_format in self.formats:
+                    content = FILE_MAKERS[file_format](count)
+                    if content is None:
+                        self.skip(count, file_format)
+                        continue
+                    year += 1
+                    self.run_dataset(year, count, file_format, content)
+        finally:
+            self.cleanup(snapshot)
+        return self.results
+
+    def snapshot(self):
+        """Starea anilor si ultimele id-uri din tabelele in care scrie benchmark-ul"""
+        from django.db.models import Max
+        from .models import ContainerType, DatabaseYear, Job, Pavilion, Ship
+
+        return {
+            'years': list(DatabaseYear.objects.values_list('pk', 'is_active', 'is_archived')),
+            'max_ids': {
+                model: model.objects.aggregate(Max('pk'))['pk__max'] or 0
+                for model in (ContainerType, Job, Pavilion, Ship)
+            },
+        }
+
+    def cleanup(self, snapshot):
+        """Sterge datele sintetice si restaureaza starea anilor (vezi run)"""
+        from .models import ContainerType, DatabaseYear, Job, Pavilion, Ship
+
+        max_ids = snapshot['max_ids']
+        # delete() pe fiecare an: intrarile sunt sterse in cascada, contoarele actualizate prin semnale
+        for database_year in DatabaseYear.objects.filter(pk__in=self.year_ids):
+            database_year.delete()
+        if self.template is not None:
+            self.template.delete()
+        Job.objects.filter(user=self.user, pk__gt=max_ids[Job]).delete()
+        if self.created_user:
+            self.user.delete()
+
+        # Doar randurile create in timpul rularii, cu valorile sintetice, ramase fara intrari
+        Ship.objects.filter(pk__gt=max_ids[Ship], nume__in=SHIP_NAMES, entries_count=0).delete()
+        Pavilion.objects.filter(pk__gt=max_ids[Pavilion], nume__in=FLAGS, ships_count=0).delete()
+        ContainerType.objects.filter(
+            pk__gt=max_ids[ContainerType], model_container__startswith=CONTAINER_OWNER, entries_count=0
+        ).delete()
+
+        # save() trimite post_save - anul activ e invalidat si in celelalte procese
+        for pk, is_active, is_archived in snapshot['years']:
+            database_year = DatabaseYear.objects.filter(pk=pk).first()
+            if database_year and (database_year.is_active, database_year.is_archived) != (is_active, is_archived):
+                database_year.is_active, database_year.is_archived = is_active, is_archived
+                database_year.save(update_fields=['is_active', 'is_archived'])
+
+    def create_template(self):
+        from .models import ImportTemplate
+
+        return ImportTemplate.objects.create(
+            nume=f'Benchmark {time.time_ns()}', mapare_coloane=TEMPLATE_MAPPING, rand_start=2,
+        )
+
+    def skip(self, count, file_format):
+        self.log(f'   - {file_format} {count}: omis (xlwt lipseste sau depaseste limita .xls)')
+        self.results.append({'name': 'custom_import_parse', 'rows': count, 'format': file_format, 'skipped': True})
+
+    def record(self, name, count, file_format, func, repeat=1):
+        """Masoara func (de repeat ori - timpul raportat e mediana)"""
+        timings = []
+        result = {'name': name, 'rows': count, 'format': file_format}
+        for _ in range(repeat):
+            run = {}
+            with measure(run, self.track_memory):
+                func()
+            timings.append(run['seconds'])
+            # Query-urile si memoria primei rulari (cache-urile sunt reci)
+            for key in ('queries', 'peak_memory_kb'):
+                result.setdefault(key, run.get(key))
+        result['seconds'] = round(statistics.median(timings), 4)
+        if repeat > 1:
+            result['repeat'] = repeat
+        self.results.append(result)
+        self.log(f'   - {name} [{file_format} {count}]: {result["seconds"]}s, {result["queries"]} query-uri')
+        return result
+
+    def run_dataset(self, year, count, file_format, content):
+        from django.core.management import call_command
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from . import jobs, lookups, search_cache
+        from .admin import ManifestEntryResource
+        from .models import DatabaseYear, Job, ManifestEntry
+
+        self.log(f'{file_format.upper()} {count} randuri (an {year})')
+        DatabaseYear.objects.update(is_active=False)
+        database_year = DatabaseYear.objects.create(year=year, is_active=True)
+        self.year_ids.append(database_year.pk)
+        lookups.clear_lookup_caches()
+
+        # Importul personalizat: pasul 1 (parsare + StagedImport), pasul 2 (jobul de import)
+        def parse():
+            upload = SimpleUploadedFile(f'manifest.{file_format}', content)
+            response = self.client.post('/admin/manifests/manifestentry/import-personalizat/', {
+                'template_id': self.template.id, 'file': upload,
+                'numar_manifest': f'B{year}', 'data_inregistrare': '2025-03-15',
+                'nume_nava': SHIP_NAMES[0], 'pavilion_nava': FLAGS[0],
+            }, secure=True)
+            if response.status_code != 302 or 'preview' not in response['Location']:
+                raise RuntimeError(f'Importul personalizat a esuat (HTTP {response.status_code})')
+        self.record('custom_import_parse', count, file_format, parse)
+
+        def confirm():
+            staged_id = self.client.session['import_staged_id']
+            self.client.post('/admin/manifests/manifestentry/import-personalizat/', {
+                'confirm_import': 'true', 'staged_id': staged_id,
+            }, secure=True)
+            job = jobs.run_job(Job.objects.filter(kind='custom_import').latest('id'))
+            if job.status != Job.STATUS_DONE:
+                raise RuntimeError(f'Jobul de import a esuat: {job.message[:500]}')
+        self.record('custom_import_confirm', count, file_format, confirm)
+
+        # import-export: aceleasi randuri, ca actualizari (acelasi numar manifest + pozitie + container)
+        dataset = resource_dataset(count, f'B{year}')
+
+        def resource_import():
+            result = ManifestEntryResource().import_data(dataset)
+            if result.has_errors():
+                raise RuntimeError('Importul import-export a raportat erori')
+        self.record('resource_import', count, file_format, resource_import)
+
+        self.record('sync_lookup_tables', count, file_format,
+                    lambda: call_command('sync_lookup_tables', stdout=io.StringIO()))
+
+        # Cautarea API: prima cerere cu cache-ul gol, apoi cereri servite din cache
+        container = container_number(count // 2)
+
+        def search_cold():
+            search_cache.get_cache().clear()
+            self.get(f'/api/manifests/search/?container={container}&year={year}')
+        self.record('search_api_cold', count, file_format, search_cold, self.repeat)
+        self.record('search_api_cached', count, file_format,
+                    lambda: self.get(f'/api/manifests/search/?container={container}&year={year}'), self.repeat)
+
+        self.record('admin_changelist', count, file_format,
+                    lambda: self.get(f'/admin/manifests/manifestentry/?database_year__id__exact={database_year.id}'), self.repeat)
+
+        if ManifestEntry.objects.filter(database_year=database_year).count() != count:
+            raise RuntimeError('Numarul de intrari importate nu corespunde')
+
+    def get(self, url):
+        response = self.client.get(url, secure=True)
+        if response.status_code != 200:
+            raise RuntimeError(f'GET {url}: HTTP {response.status_code}')
+        return response
+
+
+def environment(track_memory=True):
+    """Contextul rularii - pentru a compara doar rapoarte comparabile"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'commit': commit,
+        'database': connection.vendor,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'platform': platform.platform(),
+        # tracemalloc incetineste executia de cateva ori - timpii nu sunt comparabili intre cele doua moduri
+        'tracemalloc': track_memory,
+    }
+
+
+def result_key(result):
+    return result['name'], result['rows'], result['format']
+
+
+def compare(old_report, new_report):
+    """Linii text cu diferentele de timp si query-uri fata de un raport anterior"""
+    old_results = {result_key(result): result for result in old_report.get('results', []) if not result.get('skipped')}
+    lines = []
+    old_env, new_env = old_report.get('environment', {}), new_report['environment']
+    for key in ('database', 'tracemalloc'):
+        if old_env.get(key) != new_env.get(key):
+            lines.append(f'Atentie: {key} diferit ({old_env.get(key)} -> {new_env.get(key)}) - timpii nu sunt comparabili')
+    for result in new_report['results']:
+        old = old_results.get(result_key(result))
+        if result.get('skipped') or old is None:
+            continue
+        change = (result['seconds'] - old['seconds']) / old['seconds'] * 100 if old['seconds'] else 0
+        lines.append(
+            f'{result["name"]:<24} {result["format"]:<5} {result["rows"]:>7}  '
+            f'{old["seconds"]:>9.4f}s -> {result["seconds"]:>9.4f}s ({change:+.1f}%)  '
+            f'query-uri {old["queries"]} -> {result["queries"]}'
+        )
+    return lines
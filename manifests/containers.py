@@ -0,0 +1,80 @@
+"""
+Index de cautare pentru numerele de container.
+
+Numerele de container (ISO 6346: 3 litere proprietar + litera categorie,
+6 cifre serie + cifra de control, ex. MSCU1234565) sunt salvate normalizat in
+ManifestEntry.container_cod (doar litere mari si cifre) si
+ManifestEntry.container_cifre (doar cifrele). Cautarile exacte, dupa prefix si
+doar dupa cifre devin interogari pe interval peste aceste coloane indexate,
+in loc de LIKE '%...%' peste tot anul.
+"""
+import re
+
+from django.db.models import Q
+
+
+ISO_6346_RE = re.compile(r'^[A-Z]{4}\d{7}$')
+_SEARCH_RE = re.compile(r'^([A-Z]*)(\d+)$')
+_NON_ALNUM_RE = re.compile(r'[^A-Z0-9]')
+_NON_DIGIT_RE = re.compile(r'\D')
+
+# Ordinea caracterelor normalizate, aceeasi in colatiile binare si case-insensitive
+_ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def normalize_container(value):
+    """ABCU 123456-7 -> ABCU1234567"""
+    return _NON_ALNUM_RE.sub('', (value or '').upper())
+
+
+def container_digits(value):
+    """ABCU1234567 -> 1234567"""
+    return _NON_DIGIT_RE.sub('', value or '')
+
+
+def _prefix_upper_bound(prefix):
+    """Cel mai mic sir (din _ALPHABET) mai mare decat orice sir care incepe cu prefix, sau None"""
+    chars = list(prefix)
+    while chars:
+        position = _ALPHABET.find(chars[-1])
+        if 0 <= position < len(_ALPHABET) - 1:
+            chars[-1] = _ALPHABET[position + 1]
+            return ''.join(chars)
+        chars.pop()
+    return None
+
+
+def _prefix_q(field, prefix):
+    """Filtru 'incepe cu' scris ca interval, ca sa foloseasca indexul pe MySQL si SQLite"""
+    q = Q(**{f'{field}__gte': prefix})
+    upper = _prefix_upper_bound(prefix)
+    if upper:
+        q &= Q(**{f'{field}__lt': upper})
+    return q
+
+
+def container_search_q(query):
+    """
+    Construieste filtrul indexat pentru o cautare dupa container, sau None daca
+    textul cautat nu are forma litere + cifre (atunci se foloseste cautarea clasica).
+
+    - ABCU1234567 (cod complet) -> potrivire exacta pe container_cod
+    - ABCU123456..., ABCU12345678 -> prefix pe container_cod
+    - 1234567 (doar cifre) -> prefix pe container_cifre
+    - CU1234567 (litere partiale) -> prefix pe container_cifre + filtru pe container_cod
+    """
+    normalized = normalize_container(query)
+    match = _SEARCH_RE.match(normalized)
+    if not match:
+        return None
+
+    letters, digits = match.groups()
+    if ISO_6346_RE.match(normalized):
+        return Q(container_cod=normalized)
+    if len(letters) == 4:
+        return _prefix_q('container_cod', normalized)
+
+    q = _prefix_q('container_cifre', digits)
+    if letters:
+        q &= Q(container_cod__contains=normalized)
+    return q
@@ -0,0 +1,131 @@
+"""
+Contoare denormalizate pentru listari (admin, /api/years/).
+
+DatabaseYear.entries_count, Ship.entries_count, ContainerType.entries_count si
+Pavilion.ships_count sunt mentinute incremental:
+- ManifestEntry / Ship salvate, Ship sterse -> semnale (vezi signals.py)
+- ManifestEntry sterse -> rows_deleted(), o data per stergere (vezi deletion.py)
+- BulkImporter si importul import-export -> un UPDATE per valoare de delta, pe lot
+Actualizarile sunt UPDATE ... SET x = x + n in aceeasi tranzactie cu scrierea,
+deci raman corecte si la rollback. Operatiile care ocolesc semnalele
+(queryset.update, sync_lookup_tables) apeleaza rebuild(); comanda
+rebuild_counters recalculeaza totul de la zero.
+"""
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import DatabaseYear, ContainerType, Pavilion, Ship, ManifestEntry, ManifestEntryArchive
+
+
+# (model contor, camp contor, model sursa, camp FK in sursa)
+COUNTERS = (
+    (DatabaseYear, 'entries_count', ManifestEntry, 'database_year_id'),
+    (Ship, 'entries_count', ManifestEntry, 'ship_rel_id'),
+    (ContainerType, 'entries_count', ManifestEntry, 'container_type_rel_id'),
+    (Pavilion, 'ships_count', Ship, 'pavilion_id'),
+)
+
+# Intrarile arhivate (vezi archive.py) raman numarate: arhivarea muta randuri, nu le sterge
+ARCHIVE_SOURCES = {ManifestEntry: ManifestEntryArchive}
+
+
+def snapshot(instance):
+    """Valorile FK urmarite ale unei instante (pentru a detecta mutarea intre contoare)"""
+    return {fk: getattr(instance, fk) for fk in instance.COUNTED_RELATIONS}
+
+
+def apply_deltas(model, field, deltas):
+    """deltas: {pk: n} -> un UPDATE per valoare distincta a lui n"""
+    by_delta = defaultdict(list)
+    for pk, delta in deltas.items():
+        if pk is not None and delta:
+            by_delta[delta].append(pk)
+    for delta, pks in by_delta.items():
+        model.objects.filter(pk__in=pks).update(**{field: F(field) + delta})
+
+
+def _apply(source_model, deltas_by_fk):
+    for model, field, source, fk in COUNTERS:
+        if source is source_model and deltas_by_fk.get(fk):
+            apply_deltas(model, field, deltas_by_fk[fk])
+
+
+def instance_saved(instance, created):
+    """Dupa save(): +1 pe noile relatii, -1 pe cele vechi (daca s-au schimbat)"""
+    old = None if created else getattr(instance, '_counter_snapshot', None)
+    new = snapshot(instance)
+    if not created and old is None:
+        # Instanta nu a fost incarcata din baza de date - nu stim ce s-a schimbat
+        return
+    deltas = defaultdict(Counter)
+    for fk, value in new.items():
+        old_value = old.get(fk) if old else None
+        if old_value != value:
+            deltas[fk][value] += 1
+            deltas[fk][old_value] -= 1
+    _apply(type(instance), deltas)
+    instance._counter_snapshot = new
+
+
+def instance_deleted(instance):
+    deltas = {fk: {value: -1} for fk, value in snapshot(instance).items()}
+    _apply(type(instance), deltas)
+
+
+def rows_deleted(source_model, queryset, fks=None):
+    """
+    Inainte de queryset.delete() (fara semnale per rand): -n pe fiecare relatie,
+    dintr-un singur query grupat. queryset poate fi si din tabela de arhiva -
+    randurile arhivate sunt numarate la fel ca ale lui source_model.
+    """
+    fks = fks or source_model.COUNTED_RELATIONS
+    deltas = defaultdict(Counter)
+    for row in queryset.order_by().values(*fks).annotate(n=Count('pk')):
+        for fk in fks:
+            deltas[fk][row[fk]] -= row['n']
+    _apply(source_model, deltas)
+
+
+def rows_created(source_model, rows):
+    """Pentru bulk_create (fara semnale): actualizeaza contoarele pentru randurile noi"""
+    deltas = defaultdict(Counter)
+    for row in rows:
+        for fk in source_model.COUNTED_RELATIONS:
+            deltas[fk][getattr(row, fk)] += 1
+    _apply(source_model, deltas)
+
+
+def rows_updated(source_model, rows):
+    """Pentru bulk_update: muta contoarele randurilor ale caror relatii s-au schimbat"""
+    deltas = defaultdict(Counter)
+    for row in rows:
+        old = getattr(row, '_counter_snapshot', None)
+        if old is None:
+            continue
+        new = snapshot(row)
+        for fk, value in new.items():
+            if old.get(fk) != value:
+                deltas[fk][value] += 1
+                deltas[fk][old.get(fk)] -= 1
+        row._counter_snapshot = new
+    _apply(source_model, deltas)
+
+
+def rebuild(models=None):
+    """Recalculeaza contoarele (toate sau doar pentru modelele date) cu cate un UPDATE"""
+    for model, field, source, fk in COUNTERS:
+        if models is not None and model not in models:
+            continue
+        total = _count_subquery(source, fk)
+        if source in ARCHIVE_SOURCES:
+            total = total + _count_subquery(ARCHIVE_SOURCES[source], fk)
+        model.objects.update(**{field: total})
+
+
+def _count_subquery(source, fk):
+    counts = source.objects.filter(
+        **{fk: OuterRef('pk')}
+    ).order_by().values(fk).annotate(n=Count('pk')).values('n')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
@@ -0,0 +1,38 @@
+"""
+Stergerea intrarilor din registru.
+
+ManifestEntry nu are receivere pre_delete/post_delete: cu ele Django nu mai
+poate sterge cu un singur DELETE (fast-delete) si trece rand cu rand, cu
+cateva query-uri per intrare. Contoarele, rezumatele anilor si cache-ul de
+cautare sunt actualizate o data per stergere, nu per rand:
+- delete_entries(queryset): "sterge selectate" din admin, ManifestEntry.delete()
+- year_deleting(an): pre_delete pe DatabaseYear, inainte de stergerea in cascada
+"""
+from django.db import transaction
+
+from . import counters, search_cache, summaries
+from .models import ManifestEntry, ManifestEntryArchive
+
+
+def delete_entries(queryset):
+    """Sterge intrarile (un singur DELETE), apoi contoare, rezumat si cache per an; intoarce rezultatul delete()"""
+    with transaction.atomic():
+        year_ids = set(queryset.order_by().values_list('database_year_id', flat=True).distinct())
+        counters.rows_deleted(ManifestEntry, queryset)
+        result = queryset.delete()
+        for year_id in year_ids:
+            summaries.refresh(year_id, create=False)
+            search_cache.bump_year_version(year_id)
+    return result
+
+
+def year_deleting(database_year):
+    """
+    Inainte de stergerea unui an: intrarile lui (si cele arhivate) sunt sterse in
+    cascada, deci navele si tipurile de container pierd intrarile respective.
+    Rezumatul anului e sters si el in cascada - nu e recalculat.
+    """
+    relations = [fk for fk in ManifestEntry.COUNTED_RELATIONS if fk != 'database_year_id']
+    for model in (ManifestEntry, ManifestEntryArchive):
+        counters.rows_deleted(ManifestEntry, model.objects.filter(database_year=database_year), relations)
+    search_cache.bump_year_version(database_year.pk)
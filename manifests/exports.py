@@ -0,0 +1,132 @@
+"""
+Export in flux (CSV / XLSX) pentru intrarile din registru.
+
+Spre deosebire de exportul django-import-export (care construieste tot
+Dataset-ul in memorie), aici randurile sunt citite cu values_list() in
+loturi si scrise pe masura ce sunt citite:
+- CSV  -> generator pentru StreamingHttpResponse
+- XLSX -> openpyxl write_only intr-un fisier temporar, apoi FileResponse
+Memoria folosita nu depinde de numarul de intrari exportate.
+"""
+import csv
+import tempfile
+
+from django.db.models import Q
+
+from . import archive
+from .containers import container_search_q
+from .models import ManifestEntry
+
+
+# (camp, antet) - aceleasi antete ca in ManifestEntryResource
+EXPORT_COLUMNS = (
+    ('numar_curent', 'numar curent'),
+    ('numar_manifest', 'numar manifest'),
+    ('numar_permis', 'numar permis'),
+    ('numar_pozitie', 'numar pozitie'),
+    ('cerere_operatiune', 'cerere operatiune'),
+    ('data_inregistrare', 'data inregistrare'),
+    ('container', 'container'),
+    ('numar_colete', 'numar colete'),
+    ('greutate_bruta', 'greutate bruta'),
+    ('descriere_marfa', 'descriere marfa'),
+    ('tip_operatiune', 'tip operatiune'),
+    ('nume_nava', 'nume nava'),
+    ('pavilion_nava', 'pavilion nava'),
+    ('numar_sumara', 'numar sumara'),
+    ('tip_container', 'tip container'),
+    ('linie_maritima', 'linie maritima'),
+    ('model_container', 'model container'),
+    ('observatii', 'observatii'),
+)
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+DEFAULT_CHUNK_SIZE = 2000
+
+_DATE_INDEX = [name for name, _ in EXPORT_COLUMNS].index('data_inregistrare')
+
+
+def export_queryset(year_id=None, numar_manifest=None, nume_nava=None, container=None, data_de=None, data_pana=None):
+    """
+    Intrarile de exportat, filtrate, in ordinea numarului curent. Fara an,
+    doar anii nearhivati; un an arhivat este citit din tabela de arhiva.
+    """
+    queryset = ManifestEntry.objects.all()
+    if year_id:
+        queryset = archive.entries_for_year(year_id)
+    if numar_manifest:
+        queryset = queryset.filter(numar_manifest=numar_manifest)
+    if nume_nava:
+        queryset = queryset.filter(nume_nava__iexact=nume_nava)
+    if container:
+        queryset = queryset.filter(container_search_q(container) or Q(container__icontains=container))
+    if data_de:
+        queryset = queryset.filter(data_inregistrare__gte=data_de)
+    if data_pana:
+        queryset = queryset.filter(data_inregistrare__lte=data_pana)
+    return queryset.order_by('numar_curent', 'id')
+
+
+def iter_rows(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Tupluri de valori (fara instante de model), cu data in format DD.MM.YYYY.
+    Citirea e pe loturi keyset dupa (numar_curent, id) - driverele MySQL nu
+    fac streaming pentru iterator(), deci un singur SELECT ar incarca tot anul.
+    """
+    fields = [name for name, _ in EXPORT_COLUMNS]
+    numar_index = fields.index('numar_curent')
+    queryset = queryset.order_by('numar_curent', 'id')
+    last = None
+    while True:
+        chunk = queryset
+        if last is not None:
+            chunk = chunk.filter(Q(numar_curent__gt=last[0]) | Q(numar_curent=last[0], id__gt=last[1]))
+        rows = list(chunk.values_list('id', *fields)[:chunk_size])
+        if not rows:
+            return
+        for row in rows:
+            values = row[1:]
+            date = values[_DATE_INDEX]
+            if date is not None:
+                values = values[:_DATE_INDEX] + (date.strftime('%d.%m.%Y'),) + values[_DATE_INDEX + 1:]
+            yield values
+        last = (rows[-1][1 + numar_index], rows[-1][0])
+
+
+def headers():
+    return [header for _, header in EXPORT_COLUMNS]
+
+
+class _Echo:
+    """Obiect 'fisier' care doar intoarce ce i se scrie (pentru csv.writer in streaming)"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    """Liniile CSV ca string-uri; incepe cu BOM ca Excel sa recunoasca UTF-8"""
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow(headers())
+    for row in rows:
+        yield writer.writerow(['' if value is None else value for value in row])
+
+
+def write_xlsx(rows, file):
+    """Scrie un XLSX in modul write_only al openpyxl (randurile nu raman in memorie)"""
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('Registru')
+    sheet.append(headers())
+    for row in rows:
+        sheet.append(row)
+    workbook.save(file)
+
+
+def xlsx_tempfile(rows):
+    """XLSX intr-un fisier temporar (sters automat la inchidere), pozitionat la inceput"""
+    file = tempfile.TemporaryFile(suffix='.xlsx')
+    write_xlsx(rows, file)
+    file.seek(0)
+    return file
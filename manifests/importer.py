@@ -0,0 +1,168 @@
+"""
+Motor de import in masa pentru ManifestEntry.
+
+Inlocuieste bucla create() rand-cu-rand din importul personalizat: numerele
+curente se rezerva in bloc din YearSequence, tabelele de referinta (ContainerType,
+Pavilion, Ship) se rezolva in masa pe fiecare lot, iar intrarile se insereaza
+cu bulk_create - totul intr-o singura tranzactie, cu un numar fix de query-uri
+pe lot.
+"""
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from . import archive, counters, search_cache, summaries
+from .models import ManifestEntry, ContainerType, Pavilion, Ship, YearSequence
+
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class BulkImporter:
+    """Insereaza intrari de manifest in loturi, cu relatiile rezolvate in masa"""
+
+    def __init__(self, database_year, batch_size=DEFAULT_BATCH_SIZE):
+        self.database_year = database_year
+        self.batch_size = batch_size
+        self.entries_created = 0
+        self.relations = RelationResolver()
+
+    def run(self, entries_data, progress=None):
+        """
+        Importa intrarile dintr-un iterabil de dict-uri (camp -> valoare).
+        progress (optional) este apelat cu numarul de intrari create dupa fiecare lot.
+        Returneaza numarul de intrari create.
+        """
+        archive.check_writable(self.database_year.pk)
+        with transaction.atomic():
+            batch = []
+            for entry_dict in entries_data:
+                batch.append(ManifestEntry(database_year=self.database_year, **entry_dict))
+                if len(batch) >= self.batch_size:
+                    self._flush(batch)
+                    batch = []
+                    if progress:
+                        progress(self.entries_created)
+            if batch:
+                self._flush(batch)
+                if progress:
+                    progress(self.entries_created)
+
+            # bulk_create nu trimite semnale - actualizam explicit rezumatul anului si cache-ul de cautare
+            if self.entries_created:
+                summaries.refresh(self.database_year.pk, imported=True)
+                search_cache.bump_year_version(self.database_year.pk)
+
+        return self.entries_created
+
+    def _flush(self, batch):
+        """Rezolva relatiile pentru un lot si il insereaza cu un singur bulk_create"""
+        # Secventa anului ramane blocata pana la commit, deci importurile simultane nu se suprapun
+        numbers = YearSequence.reserve(self.database_year, len(batch))
+        for entry, numar in zip(batch, numbers):
+            entry.populate_derived_fields()
+            entry.numar_curent = numar
+
+        self.relations.resolve(batch)
+
+        ManifestEntry.objects.bulk_create(batch, batch_size=self.batch_size)
+        counters.rows_created(ManifestEntry, batch)
+        self.entries_created += len(batch)
+
+
+class RelationResolver:
+    """
+    Leaga ManifestEntry de ContainerType si Ship (cu Pavilion) pentru un lot
+    intreg: cateva query-uri pe lot, creand in masa ce lipseste.
+    """
+
+    def __init__(self):
+        # Cache-uri locale pe durata importului: cheie -> id
+        self._container_types = {}
+        self._pavilions = {}
+        self._ships = {}
+
+    def resolve(self, batch):
+        """Seteaza container_type_rel si ship_rel pe intrarile din lot"""
+        self._resolve_container_types(batch)
+        self._resolve_ships(batch)
+
+    def _resolve_container_types(self, batch):
+        missing = {}
+        for entry in batch:
+            if entry.model_container and entry.model_container not in self._container_types:
+                missing.setdefault(entry.model_container, entry.tip_container or '')
+
+        if missing:
+            self._container_types.update(
+                ContainerType.objects.filter(model_container__in=missing).values_list('model_container', 'id')
+            )
+            to_create = [
+                ContainerType(model_container=model, tip_container=tip)
+                for model, tip in missing.items() if model not in self._container_types
+            ]
+            if to_create:
+                ContainerType.objects.bulk_create(to_create, ignore_conflicts=True)
+                # bulk_create nu intoarce id-urile pe MySQL, deci le recitim
+                self._container_types.update(
+                    ContainerType.objects.filter(
+                        model_container__in=[ct.model_container for ct in to_create]
+                    ).values_list('model_container', 'id')
+                )
+
+        for entry in batch:
+            if entry.model_container:
+                entry.container_type_rel_id = self._container_types.get(entry.model_container)
+
+    def _resolve_pavilions(self, names):
+        missing = {name for name in names if name not in self._pavilions}
+        if not missing:
+            return
+
+        self._pavilions.update(Pavilion.objects.filter(nume__in=missing).values_list('nume', 'id'))
+        to_create = [Pavilion(nume=name) for name in missing if name not in self._pavilions]
+        if to_create:
+            Pavilion.objects.bulk_create(to_create, ignore_conflicts=True)
+            self._pavilions.update(
+                Pavilion.objects.filter(nume__in=[p.nume for p in to_create]).values_list('nume', 'id')
+            )
+
+    def _resolve_ships(self, batch):
+        # Navele se cauta case-insensitive, la fel ca in ManifestEntry.save()
+        missing = {}
+        pavilion_names = set()
+        for entry in batch:
+            if not entry.nume_nava:
+                continue
+            nume = entry.nume_nava.strip()
+            pavilion = (entry.pavilion_nava or '').strip()
+            if pavilion:
+                pavilion_names.add(pavilion)
+            if nume.lower() not in self._ships:
+                missing.setdefault(nume.lower(), (nume, entry.linie_maritima or '', pavilion))
+
+        self._resolve_pavilions(pavilion_names)
+
+        if missing:
+            self._ships.update(
+                Ship.objects.annotate(nume_lower=Lower('nume'))
+                .filter(nume_lower__in=missing)
+                .values_list('nume_lower', 'id')
+            )
+            to_create = [
+                Ship(nume=nume, linie_maritima=linie, pavilion_id=self._pavilions.get(pavilion))
+                for key, (nume, linie, pavilion) in missing.items() if key not in self._ships
+            ]
+            if to_create:
+                Ship.objects.bulk_create(to_create, ignore_conflicts=True)
+                # +n doar pe pavilioanele navelor noi (o nava creata in paralel de alt
+                # proces ar fi numarata de doua ori - rebuild_counters o corecteaza)
+                counters.rows_created(Ship, to_create)
+                self._ships.update(
+                    Ship.objects.annotate(nume_lower=Lower('nume'))
+                    .filter(nume_lower__in=[s.nume.lower() for s in to_create])
+                    .values_list('nume_lower', 'id')
+                )
+
+        for entry in batch:
+            if entry.nume_nava:
+                entry.ship_rel_id = self._ships.get(entry.nume_nava.strip().lower())
@@ -0,0 +1,166 @@
+"""
+Masurarea cererilor: numar de query-uri, timp in baza de date, serializare.
+
+RequestTimingMiddleware (activ doar cu REQUEST_TIMING_ENABLED=True) instaleaza
+un execute_wrapper pe conexiunile la baza de date pe durata cererii si adauga
+raspunsului un header Server-Timing, vizibil in tab-ul Network din browser:
+
+    Server-Timing: db;dur=12.4;desc="7 queries", render;dur=3.1, total;dur=25.0
+
+O parte din cereri (REQUEST_TIMING_SAMPLE_RATE), plus toate cele mai lente de
+REQUEST_TIMING_SLOW_MS, sunt salvate in RequestTiming si pastrate
+REQUEST_TIMING_RETENTION_DAYS zile. Sumarul pe endpoint (p95, query-uri per
+cerere) e in admin: Masuratori Cereri -> Sumar.
+
+Nu sunt masurate: query-urile facute dupa ce raspunsul a plecat din middleware
+(ex: exporturile StreamingHttpResponse, generate in timpul trimiterii).
+"""
+import logging
+import math
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection, connections
+from django.db.models import Avg, Count, F, Max, Window
+from django.db.models.functions import Ceil, RowNumber
+
+
+logger = logging.getLogger(__name__)
+
+# Cat de des (secunde) sterge un proces masuratorile mai vechi de REQUEST_TIMING_RETENTION_DAYS
+CLEANUP_INTERVAL = 3600
+
+
+class QueryRecorder:
+    """execute_wrapper care numara query-urile si retine cel mai lent"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_sql = ''
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.total += elapsed
+            if elapsed >= self.slowest:
+                self.slowest = elapsed
+                self.slowest_sql = sql
+
+
+class RequestTimingMiddleware:
+    """Server-Timing pe fiecare raspuns si masuratori esantionate in RequestTiming"""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_TIMING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.REQUEST_TIMING_SAMPLE_RATE
+        self.slow_ms = settings.REQUEST_TIMING_SLOW_MS
+        self._cleaned_at = None
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        request._render_ms = None
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        db_ms = recorder.total * 1000
+        timings = [f'db;dur={db_ms:.1f};desc="{recorder.count} queries"']
+        if request._render_ms is not None:
+            timings.append(f'render;dur={request._render_ms:.1f}')
+        timings.append(f'total;dur={duration_ms:.1f}')
+        response['Server-Timing'] = ', '.join(timings)
+
+        if duration_ms >= self.slow_ms or random.random() < self.sample_rate:
+            self.save(request, response, duration_ms, db_ms, recorder)
+        return response
+
+    def process_template_response(self, request, response):
+        """Timpul de randare (template-uri admin, serializare JSON a raspunsurilor DRF)"""
+        start = time.perf_counter()
+
+        def rendered(response):
+            request._render_ms = (time.perf_counter() - start) * 1000
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def save(self, request, response, duration_ms, db_ms, recorder):
+        """Scrie masuratoarea; o eroare aici nu trebuie sa strice raspunsul"""
+        from .models import RequestTiming
+
+        # Ruta, nu calea: /api/manifests/<pk>/ e un singur endpoint (fara ancorele regex ale router-ului DRF)
+        match = request.resolver_match
+        endpoint = '/' + match.route.replace('^', '').replace('$', '') if match else '(nerezolvat)'
+        try:
+            RequestTiming.objects.create(
+                endpoint=endpoint[:255],
+                method=request.method[:10],
+                status_code=response.status_code,
+                duration_ms=duration_ms,
+                db_ms=db_ms,
+                render_ms=request._render_ms,
+                queries=recorder.count,
+                slowest_sql=recorder.slowest_sql[:RequestTiming.MAX_SQL_LENGTH],
+                slowest_sql_ms=recorder.slowest * 1000,
+            )
+            # Tabela nu creste nelimitat: prima scriere a procesului, apoi o data pe interval
+            now = time.monotonic()
+            if self._cleaned_at is None or now - self._cleaned_at >= CLEANUP_INTERVAL:
+                self._cleaned_at = now
+                RequestTiming.delete_stale()
+        except Exception:
+            logger.warning('Nu s-a putut salva masuratoarea pentru %s', endpoint, exc_info=True)
+
+
+def summarize(queryset):
+    """
+    Sumar per (endpoint, metoda) pentru masuratorile din queryset: numar de
+    cereri, medii si maxime agregate in SQL, plus p95 (nearest-rank). Sortat
+    descrescator dupa p95.
+    """
+    rows = {
+        (row['endpoint'], row['method']): row
+        for row in queryset.order_by().values('endpoint', 'method').annotate(
+            count=Count('id'),
+            avg_ms=Avg('duration_ms'),
+            max_ms=Max('duration_ms'),
+            avg_db_ms=Avg('db_ms'),
+            avg_queries=Avg('queries'),
+            max_queries=Max('queries'),
+        )
+    }
+    for endpoint, method, duration_ms in _p95(queryset, rows):
+        rows[(endpoint, method)]['p95_ms'] = duration_ms
+    return sorted(rows.values(), key=lambda row: row.get('p95_ms') or 0, reverse=True)
+
+
+def _p95(queryset, groups):
+    """(endpoint, metoda, durata p95): un query cu functii fereastra, altfel un query per grup"""
+    if connection.features.supports_over_clause:
+        partition = [F('endpoint'), F('method')]
+        ranked = queryset.order_by().annotate(
+            position=Window(RowNumber(), partition_by=partition, order_by=[F('duration_ms').asc(), F('id').asc()]),
+            total=Window(Count('id'), partition_by=partition),
+        ).filter(position=Ceil(F('total') * 0.95))
+        return ranked.values_list('endpoint', 'method', 'duration_ms')
+
+    return [
+        (endpoint, method, queryset.filter(endpoint=endpoint, method=method).order_by('duration_ms').values_list(
+            'duration_ms', flat=True
+        )[math.ceil(0.95 * group['count']) - 1])
+        for (endpoint, method), group in groups.items()
+    ]
@@ -0,0 +1,301 @@
+"""
+Joburi in fundal pentru operatiile lungi din admin.
+
+Admin-ul doar inregistreaza un Job (enqueue) si redirectioneaza catre pagina
+de progres; munca propriu-zisa e facuta de comanda `manage.py run_jobs`
+(proces separat, pornit din cron sau ca serviciu - fara Redis/Celery).
+Un job e preluat printr-un UPDATE conditionat (pending -> running), deci mai
+multe procese run_jobs pot rula simultan fara sa execute acelasi job de doua ori.
+"""
+import io
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+from .models import Job
+
+
+logger = logging.getLogger(__name__)
+
+# kind -> functie(job, progress) care intoarce mesajul final
+HANDLERS = {}
+
+# Un job "running" fara niciun semn de viata de atata timp e considerat abandonat
+# (doar daca nu putem verifica direct procesul worker - vezi fail_stale_jobs)
+STALE_AFTER = timedelta(hours=1)
+
+
+def register(kind):
+    """Decorator: inregistreaza functia care executa joburile de tipul kind"""
+    def decorator(func):
+        HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def enqueue(kind, user=None, **params):
+    """Creeaza un job in asteptare; il va executa urmatorul run_jobs"""
+    if kind not in HANDLERS:
+        raise ValueError(f'Tip de job necunoscut: {kind}')
+    return Job.objects.create(kind=kind, user=user, params=params)
+
+
+def claim_next():
+    """Preia cel mai vechi job in asteptare, sau None daca nu exista"""
+    while True:
+        job_id = Job.objects.filter(status=Job.STATUS_PENDING).order_by('created_at', 'id').values_list('id', flat=True).first()
+        if job_id is None:
+            return None
+        # Doar un singur proces reuseste tranzitia pending -> running
+        claimed = Job.objects.filter(id=job_id, status=Job.STATUS_PENDING).update(
+            status=Job.STATUS_RUNNING, worker=worker_id(), started_at=timezone.now(), updated_at=timezone.now()
+        )
+        if claimed:
+            return Job.objects.select_related('user').get(id=job_id)
+
+
+def run_job(job):
+    """Executa un job preluat si salveaza rezultatul (finalizat sau esuat)"""
+    progress = ProgressReporter(job)
+    try:
+        handler = HANDLERS[job.kind]
+        job.message = handler(job, progress) or ''
+        job.status = Job.STATUS_DONE
+    except Exception as e:
+        logger.exception('Job #%s (%s) esuat', job.pk, job.kind)
+        job.message = f'Eroare: {e}\n\n{traceback.format_exc()}'
+        job.status = Job.STATUS_FAILED
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'message', 'progress_current', 'progress_total', 'finished_at', 'updated_at'])
+    return job
+
+
+def worker_id():
+    """Identitatea procesului curent, salvata pe jobul preluat (host:pid)"""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def worker_alive(worker):
+    """
+    True/False daca procesul worker ruleaza, None daca nu se poate verifica
+    (alt host, job fara worker sau sistem fara os.kill(pid, 0)).
+    """
+    host, _, pid = worker.rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit() or os.name != 'posix':
+        return None
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Procesul exista, dar apartine altui utilizator
+        return True
+    return True
+
+
+def fail_stale_jobs():
+    """
+    Marcheaza ca esuate joburile ramase 'running' dupa oprirea brusca a unui worker.
+
+    Pe SQLite progresul nu poate fi scris cat timp importul are tranzactia deschisa,
+    deci updated_at nu e un semn de viata de incredere: un job al carui worker
+    ruleaza pe acest host e judecat dupa proces (oprit -> esuat imediat, in viata ->
+    lasat in pace). Doar joburile de pe alte hosturi raman pe limita STALE_AFTER.
+    """
+    stale_before = timezone.now() - STALE_AFTER
+    failed_ids = []
+    for job_id, worker, updated_at in Job.objects.filter(status=Job.STATUS_RUNNING).values_list('id', 'worker', 'updated_at'):
+        alive = worker_alive(worker)
+        if alive is False or (alive is None and updated_at < stale_before):
+            failed_ids.append(job_id)
+    if not failed_ids:
+        return 0
+    return Job.objects.filter(id__in=failed_ids, status=Job.STATUS_RUNNING).update(
+        status=Job.STATUS_FAILED, finished_at=timezone.now(),
+        message='Job abandonat (procesul run_jobs a fost oprit in timpul executiei).'
+    )
+
+
+class ProgressReporter:
+    """
+    Scrie progresul unui job in baza de date, cel mult o data pe interval.
+
+    Importurile ruleaza intr-o singura tranzactie, iar un UPDATE facut pe aceeasi
+    conexiune nu ar fi vizibil pana la commit - de aceea, in interiorul unei
+    tranzactii, progresul e scris pe o conexiune separata (autocommit).
+    """
+
+    def __init__(self, job, interval=1.0):
+        self.job = job
+        self.interval = interval
+        self._last_write = 0
+
+    def __call__(self, current, total=None, message=None, force=False):
+        self.job.progress_current = current
+        if total is not None:
+            self.job.progress_total = total
+        if message is not None:
+            self.job.message = message
+
+        now = time.monotonic()
+        if not force and now - self._last_write < self.interval:
+            return
+        self._last_write = now
+
+        fields = {
+            'progress_current': self.job.progress_current,
+            'progress_total': self.job.progress_total,
+            'message': self.job.message,
+            'updated_at': timezone.now(),
+        }
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            self._write_outside_transaction(fields)
+        else:
+            Job.objects.filter(pk=self.job.pk).update(**fields)
+
+    def _write_outside_transaction(self, fields):
+        connection = connections.create_connection(DEFAULT_DB_ALIAS)
+        try:
+            # SQLite blocheaza toata baza pe durata tranzactiei - progresul apare doar la final
+            if connection.vendor == 'sqlite':
+                return
+            qn = connection.ops.quote_name
+            fields['updated_at'] = connection.ops.adapt_datetimefield_value(fields['updated_at'])
+            assignments = ', '.join(f'{qn(name)} = %s' for name in fields)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'UPDATE {qn(Job._meta.db_table)} SET {assignments} WHERE {qn("id")} = %s',
+                    [*fields.values(), self.job.pk],
+                )
+        except Exception:
+            # Progresul e informativ - nu oprim jobul daca nu poate fi scris
+            logger.warning('Nu s-a putut actualiza progresul jobului #%s', self.job.pk, exc_info=True)
+        finally:
+            connection.close()
+
+
+class JobOutput(io.StringIO):
+    """stdout pentru comenzi rulate ca job: textul scris apare in mesajul jobului"""
+
+    def __init__(self, progress):
+        super().__init__()
+        self.progress = progress
+
+    def write(self, text):
+        written = super().write(text)
+        self.progress(self.progress.job.progress_current, message=self.getvalue())
+        return written
+
+
+@register('sync_lookup_tables')
+def run_sync_lookup_tables(job, progress):
+    from django.core.management import call_command
+
+    out = JobOutput(progress)
+    call_command('sync_lookup_tables', stdout=out, **job.params)
+    return out.getvalue()
+
+
+@register('custom_import')
+def run_custom_import(job, progress):
+    """Step 2 al importului personalizat: StagedImport -> ManifestEntry"""
+    from datetime import datetime
+    from .importer import BulkImporter
+    from .models import StagedImport
+
+    staged = StagedImport.objects.select_related('database_year').filter(pk=job.params['staged_id']).first()
+    if staged is None:
+        raise ValueError('Importul pregătit nu mai există (a expirat sau a fost deja procesat).')
+
+    progress(0, total=staged.total_rows, force=True)
+
+    def deserialize_entries():
+        for entry_dict in staged.iter_rows():
+            # Convertește înapoi data dacă există
+            if 'data_inregistrare' in entry_dict and entry_dict['data_inregistrare']:
+                entry_dict['data_inregistrare'] = datetime.strptime(entry_dict['data_inregistrare'], '%Y-%m-%d').date()
+
+            # Convertește Decimal pentru greutate_bruta
+            if 'greutate_bruta' in entry_dict and entry_dict['greutate_bruta']:
+                entry_dict['greutate_bruta'] = Decimal(str(entry_dict['greutate_bruta']))
+
+            yield entry_dict
+
+    # Creează înregistrările în baza de date (bulk, într-o singură tranzacție)
+    entries_created = BulkImporter(staged.database_year).run(deserialize_entries(), progress=progress)
+
+    # Șterge importul pregătit
+    staged.delete()
+
+    return f'Import finalizat cu succes! {entries_created} înregistrări au fost create.'
+
+
+@register('batch_import')
+def run_batch_import(job, progress):
+    """Import in lot: mai multe fisiere parsate in paralel, inserate impreuna (vezi batch_import.py)"""
+    from . import batch_import
+
+    return batch_import.run(job.params, progress)
+
+
+@register('resource_import')
+def run_resource_import(job, progress):
+    """Confirmarea importului django-import-export (fisierul e in tmp storage-ul admin-ului)"""
+    from django.contrib import admin
+    from import_export.results import RowResult
+    from import_export.signals import post_import
+    from .models import ManifestEntry
+
+    model_admin = admin.site.get_model_admin(ManifestEntry)
+    params = job.params
+
+    input_format = model_admin.get_import_formats()[params['format']](encoding=model_admin.from_encoding)
+    tmp_storage = model_admin.get_tmp_storage_class()(
+        name=params['import_file_name'],
+        encoding=None if input_format.is_binary() else model_admin.from_encoding,
+        read_mode=input_format.get_read_mode(),
+        **model_admin.get_tmp_storage_class_kwargs(),
+    )
+    try:
+        dataset = input_format.create_dataset(tmp_storage.read())
+        progress(0, total=len(dataset), force=True)
+
+        resource = model_admin.resource_class()
+        result = resource.import_data(
+            dataset,
+            dry_run=False,
+            # Fara asta, randurile valide ar fi salvate chiar daca altele au erori de validare
+            rollback_on_validation_errors=True,
+            file_name=params.get('original_file_name'),
+            user=job.user,
+            retain_instance_in_row_result=True,
+            progress=progress,
+        )
+
+        if result.has_errors() or result.has_validation_errors():
+            details = [f'Rând {number}: {errors[0].error}' for number, errors in result.row_errors()[:5]]
+            details += [f'Rând {row.number}: {row.error}' for row in result.invalid_rows[:5]]
+            raise ValueError('Importul a fost anulat: fișierul conține erori.\n' + '\n'.join(details))
+    finally:
+        # Abia dupa verificarea rezultatului: nimic nu a fost salvat daca am ajuns aici cu o eroare
+        tmp_storage.remove()
+
+    if job.user is not None:
+        model_admin.generate_log_entries(result, SimpleNamespace(user=job.user))
+    post_import.send(sender=None, model=ManifestEntry)
+
+    totals = result.totals
+    return (
+        f'Import finalizat: {totals[RowResult.IMPORT_TYPE_NEW]} noi, '
+        f'{totals[RowResult.IMPORT_TYPE_UPDATE]} actualizate, '
+        f'{totals[RowResult.IMPORT_TYPE_DELETE]} șterse și '
+        f'{totals[RowResult.IMPORT_TYPE_SKIP]} sărite.'
+    )
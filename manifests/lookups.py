@@ -0,0 +1,242 @@
+"""
+Rezolvarea tabelelor de referinta (DatabaseYear, ContainerType, Pavilion, Ship)
+cu cache-uri in memorie, marginite si invalidabile.
+
+ManifestEntry.save() foloseste aceste functii pentru a lega relatiile inainte
+de INSERT/UPDATE, astfel incat o salvare sa fie un singur statement. Cache-urile
+sunt golite de semnalele post_save/post_delete ale modelelor de referinta
+(vezi signals.py), iar TTL-ul limiteaza cat poate ramane invechit un worker
+care nu a primit semnalul (ex: alt proces gunicorn/Passenger).
+Anul activ si anii arhivati au provideri proprii (SharedValue), invalidati
+si intre procese printr-o versiune in cache-ul partajat.
+"""
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from . import search_cache
+from .models import DatabaseYear, ContainerType, Pavilion, Ship
+
+
+class LookupCache:
+    """Cache LRU marginit, thread-safe, cu expirare dupa TTL"""
+
+    def __init__(self, maxsize=None, ttl=None):
+        self.maxsize = maxsize or getattr(settings, 'LOOKUP_CACHE_SIZE', 2048)
+        self.ttl = ttl or getattr(settings, 'LOOKUP_CACHE_TTL', 300)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+year_cache = LookupCache()
+container_type_cache = LookupCache()
+pavilion_cache = LookupCache()
+ship_cache = LookupCache()
+
+
+class SharedValue:
+    """
+    O valoare calculata din baza de date, pastrata per proces pana la
+    invalidare. Invalidarea goleste valoarea locala si incrementeaza o versiune
+    in cache-ul partajat 'versions' (vezi search_cache.py); celelalte procese
+    compara versiunea cel mult o data la ACTIVE_YEAR_CHECK_INTERVAL secunde.
+    Subclasele definesc VERSION_SCOPE si load().
+    """
+
+    VERSION_SCOPE = None
+
+    def __init__(self, check_interval=None, ttl=None):
+        self.check_interval = check_interval if check_interval is not None else getattr(settings, 'ACTIVE_YEAR_CHECK_INTERVAL', 5)
+        self.ttl = ttl or getattr(settings, 'LOOKUP_CACHE_TTL', 300)
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._value = None
+        self._version = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+        # Incrementat la invalidare: o incarcare inceputa inainte nu mai e pastrata
+        self._generation = 0
+
+    def get(self):
+        now = time.monotonic()
+        with self._lock:
+            loaded, value, version, generation = self._loaded, self._value, self._version, self._generation
+            fresh = loaded and now - self._loaded_at < self.ttl
+            if fresh and now - self._checked_at < self.check_interval:
+                return value
+
+        shared_version = search_cache.get_version(self.VERSION_SCOPE)
+        if fresh and shared_version == version:
+            with self._lock:
+                self._checked_at = now
+            return value
+
+        value = self.load()
+        with self._lock:
+            if self._generation == generation:
+                self._loaded, self._value, self._version = True, value, shared_version
+                self._loaded_at = self._checked_at = now
+        return value
+
+    def load(self):
+        raise NotImplementedError
+
+    def clear(self):
+        """Goleste doar valoarea din procesul curent"""
+        with self._lock:
+            self._loaded = False
+            self._value = None
+            self._generation += 1
+
+    def invalidate(self):
+        """Valoarea s-a schimbat: aici imediat, in celelalte procese prin versiunea partajata"""
+        self.clear()
+        search_cache.bump_version(self.VERSION_SCOPE)
+        # Un proces care a citit intre timp (inainte de commit) ar fi vazut valoarea veche
+        transaction.on_commit(self.clear)
+
+
+# Anul activ: (id, an, is_active); is_active=False inseamna fallback pe cel mai recent an nearhivat
+ActiveYear = namedtuple('ActiveYear', ['id', 'year', 'is_active'])
+
+
+class ActiveYearProvider(SharedValue):
+    """Anul activ, incarcat o singura data per proces (un query) si pastrat pana la invalidare"""
+
+    VERSION_SCOPE = 'active-year'
+
+    def load(self):
+        """
+        Anul activ (cel mai recent, daca sunt mai multe) sau, daca niciunul nu e activ,
+        cel mai recent an nearhivat (intrarile noi nu pot fi scrise intr-un an arhivat)
+        """
+        row = (
+            DatabaseYear.objects.filter(Q(is_active=True) | Q(is_archived=False))
+            .order_by('-is_active', '-year').values_list('id', 'year', 'is_active').first()
+        )
+        return ActiveYear(*row) if row else None
+
+
+class ArchivedYearsProvider(SharedValue):
+    """Id-urile anilor ale caror intrari sunt in tabela de arhiva (vezi archive.py)"""
+
+    VERSION_SCOPE = 'archived-years'
+
+    def load(self):
+        return frozenset(DatabaseYear.objects.filter(is_archived=True).values_list('id', flat=True))
+
+
+active_year_provider = ActiveYearProvider()
+archived_years_provider = ArchivedYearsProvider()
+
+
+def active_year():
+    """Anul activ (sau cel mai recent an) ca ActiveYear(id, year, is_active), ori None"""
+    return active_year_provider.get()
+
+
+def resolve_active_year_id():
+    """Returneaza id-ul anului activ (sau al celui mai recent an nearhivat daca niciunul nu e activ)"""
+    current = active_year_provider.get()
+    return current.id if current else None
+
+
+def is_archived_year(year_id):
+    """True daca intrarile anului au fost mutate in tabela de arhiva"""
+    return bool(year_id) and year_id in archived_years_provider.get()
+
+
+def resolve_year_id(year=None):
+    """
+    Id-ul DatabaseYear pentru un an dat, sau al anului activ daca year lipseste.
+    Returneaza None daca anul nu exista (fara fallback pe cel mai recent an).
+    """
+    if not year:
+        current = active_year_provider.get()
+        return current.id if current and current.is_active else None
+
+    key = ('year', year)
+    year_id = year_cache.get(key)
+    if year_id is None:
+        # 0 = anul nu exista; se pastreaza in cache ca sa nu repetam query-ul
+        year_id = DatabaseYear.objects.filter(year=year).values_list('id', flat=True).first() or 0
+        year_cache.set(key, year_id)
+    return year_id or None
+
+
+def resolve_container_type_id(model_container, tip_container=''):
+    """Returneaza id-ul ContainerType pentru model_container, creandu-l daca nu exista"""
+    ct_id = container_type_cache.get(model_container)
+    if ct_id is None:
+        ct_id = ContainerType.objects.filter(model_container=model_container).values_list('id', flat=True).first()
+        if ct_id is None:
+            ct_id = ContainerType.objects.create(
+                model_container=model_container,
+                tip_container=tip_container or ''
+            ).id
+        # Un rand creat (sau citit) intr-o tranzactie anulata - ex: dry-run-ul
+        # import-export - nu trebuie sa ajunga in cache
+        transaction.on_commit(lambda: container_type_cache.set(model_container, ct_id))
+    return ct_id
+
+
+def resolve_pavilion_id(nume):
+    """Returneaza id-ul Pavilion dupa nume, creandu-l daca nu exista"""
+    nume = nume.strip()
+    pavilion_id = pavilion_cache.get(nume)
+    if pavilion_id is None:
+        pavilion_id = Pavilion.objects.get_or_create(nume=nume)[0].id
+        transaction.on_commit(lambda: pavilion_cache.set(nume, pavilion_id))
+    return pavilion_id
+
+
+def resolve_ship_id(nume, linie_maritima='', pavilion_id=None):
+    """Returneaza id-ul Ship (cautare case-insensitive), creandu-l daca nu exista"""
+    nume = nume.strip()
+    key = nume.lower()
+    ship_id = ship_cache.get(key)
+    if ship_id is None:
+        ship_id = Ship.objects.filter(nume__iexact=nume).values_list('id', flat=True).first()
+        if ship_id is None:
+            ship_id = Ship.objects.create(
+                nume=nume,
+                linie_maritima=linie_maritima or '',
+                pavilion_id=pavilion_id
+            ).id
+        transaction.on_commit(lambda: ship_cache.set(key, ship_id))
+    return ship_id
+
+
+def clear_lookup_caches():
+    """Goleste toate cache-urile de referinta"""
+    for cache in (year_cache, container_type_cache, pavilion_cache, ship_cache):
+        cache.clear()
+    active_year_provider.clear()
+    archived_years_provider.clear()
@@ -0,0 +1,42 @@
+"""
+Management command pentru arhivarea unui an inchis (vezi manifests/archive.py).
+
+Intrarile anului sunt mutate in tabela de arhiva, astfel incat cautarile si
+importurile anului curent sa nu mai parcurga indexurile anilor vechi.
+
+Utilizare:
+    python manage.py archive_year 2023
+    python manage.py archive_year 2023 --restore     # readuce intrarile in tabela curenta
+"""
+from django.core.management.base import BaseCommand, CommandError
+from manifests import archive
+from manifests.models import DatabaseYear
+
+
+class Command(BaseCommand):
+    help = 'Muta intrarile unui an inchis in tabela de arhiva (sau inapoi cu --restore)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('year', type=int, help='Anul (ex: 2023)')
+        parser.add_argument('--restore', action='store_true', help='Readuce intrarile anului in tabela curenta')
+        parser.add_argument('--batch-size', type=int, default=archive.MOVE_BATCH_SIZE,
+                            help=f'Randuri mutate per statement (implicit {archive.MOVE_BATCH_SIZE})')
+
+    def handle(self, *args, **options):
+        database_year = DatabaseYear.objects.filter(year=options['year']).first()
+        if database_year is None:
+            raise CommandError(f'Anul {options["year"]} nu exista')
+
+        def progress(moved):
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'   > {moved} intrari mutate')
+
+        try:
+            if options['restore']:
+                moved = archive.restore_year(database_year, options['batch_size'], progress)
+                self.stdout.write(self.style.SUCCESS(f'{database_year}: {moved} intrari readuse in tabela curenta'))
+            else:
+                moved = archive.archive_year(database_year, options['batch_size'], progress)
+                self.stdout.write(self.style.SUCCESS(f'{database_year}: {moved} intrari arhivate'))
+        except archive.ArchiveError as e:
+            raise CommandError(str(e))
@@ -0,0 +1,87 @@
+"""
+Management command pentru benchmark-urile importului si cautarii
+(vezi manifests/benchmarks.py).
+
+Utilizare:
+    python manage.py benchmark                                   # 1k si 10k randuri, XLSX si XLS
+    python manage.py benchmark --rows 1000 10000 100000 --output bench.json
+    python manage.py benchmark --compare bench.json              # diferente fata de un raport anterior
+    DB_ENGINE=mysql python manage.py benchmark                   # pe MySQL local
+
+Datele sunt scrise intr-o baza de date de test (creata si stearsa de comanda);
+--use-current-db ruleaza pe baza de date configurata: anii sintetici (>3000) sunt
+stersi la final si anul activ e restaurat, dar in timpul rularii anul activ este
+cel sintetic - nu rulati pe baza de productie in timpul programului.
+
+Fisierele .xls sunt generate cu xlwt (in requirements.txt); fara el formatul XLS e omis.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from manifests import benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Masoara importul, sincronizarea, cautarea API si lista din admin pe manifeste sintetice'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000],
+                            help='Dimensiunile manifestelor generate (implicit 1000 10000)')
+        parser.add_argument('--formats', nargs='+', choices=benchmarks.FORMATS, default=list(benchmarks.FORMATS),
+                            help='Formatele fisierelor generate (implicit xlsx xls)')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Repetari pentru cererile de citire - se raporteaza mediana (implicit 5)')
+        parser.add_argument('--no-memory', action='store_true',
+                            help='Fara tracemalloc (timpi mai apropiati de productie, fara memorie maxima)')
+        parser.add_argument('--output', help='Fisierul JSON pentru raport (implicit doar afisat)')
+        parser.add_argument('--compare', help='Raport JSON anterior cu care se compara rezultatele')
+        parser.add_argument('--use-current-db', action='store_true',
+                            help='Ruleaza pe baza de date curenta, fara baza de test. Datele sintetice sunt sterse '
+                                 'si anul activ restaurat la final, dar in timpul rularii anul activ este cel sintetic')
+
+    def handle(self, *args, **options):
+        previous = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as f:
+                    previous = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Raportul {options["compare"]} nu poate fi citit: {e}')
+
+        runner = benchmarks.Runner(
+            sizes=options['rows'],
+            formats=options['formats'],
+            repeat=options['repeat'],
+            track_memory=not options['no_memory'],
+            log=self.stdout.write if options['verbosity'] >= 1 else None,
+        )
+
+        if options['use_current_db']:
+            results = runner.run()
+        else:
+            results = self.run_in_test_database(runner)
+
+        report = {'environment': benchmarks.environment(not options['no_memory']), 'results': results}
+        text = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(text + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Raport scris in {options["output"]}'))
+        elif options['verbosity'] >= 1:
+            self.stdout.write(text)
+
+        if previous is not None:
+            self.stdout.write('\nComparatie cu ' + options['compare'] + ':')
+            for line in benchmarks.compare(previous, report):
+                self.stdout.write(line)
+
+    def run_in_test_database(self, runner):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            return runner.run()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
@@ -0,0 +1,109 @@
+"""
+Management command care verifica planurile de executie ale interogarilor frecvente.
+
+Ruleaza EXPLAIN (pe backend-ul configurat: SQLite, MySQL sau PostgreSQL) pentru
+cautarea dupa container, ultimul manifest, lista din admin si numarul de
+duplicate, si se termina cu eroare daca vreuna citeste tot tabelul.
+Pe tabele aproape goale optimizatorul poate alege oricum o scanare completa -
+comanda e relevanta pe o baza de date cu date reale.
+
+Utilizare:
+    python manage.py check_query_plans
+    python manage.py check_query_plans -v 2      # afiseaza si planurile
+"""
+import json
+import re
+
+from django.contrib import admin
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from manifests import lookups
+from manifests.containers import container_search_q
+from manifests.models import ManifestEntry
+
+
+# SQLite: "SCAN manifests_manifestentry" (sau "SCAN TABLE ..." in versiunile vechi). Si un
+# "SCAN ... USING INDEX" parcurge toate randurile - doar SEARCH inseamna acces prin index
+_SQLITE_SCAN_RE = re.compile(r'\bSCAN (?:TABLE )?(\w+)')
+
+
+class Command(BaseCommand):
+    help = 'Ruleaza EXPLAIN pentru interogarile frecvente si esueaza la scanari complete de tabel'
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        sample = self.sample_values()
+
+        full_scans = []
+        for name, queryset in self.hot_queries(sample):
+            plan = self.explain(queryset)
+            if self.verbosity >= 2:
+                self.stdout.write(f'\n{name}:\n{plan}\n')
+            if self.is_full_scan(plan):
+                full_scans.append(name)
+                self.stdout.write(self.style.ERROR(f'✗ {name}: scanare completă de tabel'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'✓ {name}: folosește index'))
+
+        if full_scans:
+            raise CommandError(f'{len(full_scans)} interogări fac scanare completă: {", ".join(full_scans)}')
+
+    def sample_values(self):
+        """Valori reale din anul activ (daca exista), ca planurile sa fie cele obisnuite"""
+        year_id = lookups.resolve_year_id() or 0
+        entry = ManifestEntry.objects.filter(database_year_id=year_id).exclude(container_cod='').first()
+        return {
+            'year_id': year_id,
+            'container': entry.container if entry else 'MSCU1234565',
+            'container_cod': entry.container_cod if entry else 'MSCU1234565',
+        }
+
+    def hot_queries(self, sample):
+        """(nume, queryset) - aceleasi forme ca in views.py si admin.py"""
+        year_id = sample['year_id']
+        entries = ManifestEntry.objects.filter(database_year_id=year_id)
+        code = sample['container_cod']
+
+        yield 'cautare container (cod complet)', entries.filter(container_search_q(code))[:50]
+        yield 'cautare container (prefix)', entries.filter(container_search_q(code[:6]))[:50]
+        yield 'cautare container (doar cifre)', entries.filter(container_search_q(code[4:]))[:50]
+        yield 'ultimul manifest', entries.filter(
+            data_inregistrare__isnull=False
+        ).order_by('-data_inregistrare', '-numar_manifest')[:1]
+
+        # Lista din admin, cu subquery-ul pentru duplicate
+        model_admin = admin.site.get_model_admin(ManifestEntry)
+        changelist = model_admin.get_queryset(RequestFactory().get('/'))
+        yield 'lista admin (an, numar curent)', changelist.filter(database_year_id=year_id).order_by('numar_curent')[:100]
+        yield 'duplicate container în an', entries.filter(container=sample['container']).values('container')
+
+    def explain(self, queryset):
+        if connection.vendor == 'mysql':
+            return queryset.explain(format='json')
+        return queryset.explain()
+
+    def is_full_scan(self, plan):
+        vendor = connection.vendor
+        if vendor == 'sqlite':
+            return any(name != 'CONSTANT' for name in _SQLITE_SCAN_RE.findall(plan))
+        if vendor == 'mysql':
+            return 'ALL' in _access_types(json.loads(plan))
+        if vendor == 'postgresql':
+            return 'Seq Scan' in plan
+        raise CommandError(f'Backend nesuportat pentru verificare: {vendor}')
+
+
+def _access_types(node):
+    """Toate valorile access_type din planul JSON MySQL"""
+    found = []
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == 'access_type':
+                found.append(value)
+            else:
+                found.extend(_access_types(value))
+    elif isinstance(node, list):
+        for item in node:
+            found.extend(_access_types(item))
+    return found
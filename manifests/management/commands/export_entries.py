@@ -0,0 +1,72 @@
+"""
+Management command pentru exportul intrarilor din registru in CSV sau XLSX,
+in memorie constanta (vezi manifests/exports.py)
+"""
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from manifests import exports
+from manifests.models import DatabaseYear
+
+
+def parse_date(value):
+    for fmt in ('%d.%m.%Y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise CommandError(f'Data invalida: {value} (format DD.MM.YYYY sau YYYY-MM-DD)')
+
+
+class Command(BaseCommand):
+    help = 'Exporta intrarile din registru (un an intreg sau filtrate) in CSV sau XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Fisierul de iesire (.csv sau .xlsx)')
+        parser.add_argument('--year', type=int, help='Anul exportat (implicit toti anii nearhivati)')
+        parser.add_argument('--format', choices=exports.EXPORT_FORMATS,
+                            help='Formatul (implicit dupa extensia fisierului)')
+        parser.add_argument('--numar-manifest', help='Doar intrarile acestui manifest')
+        parser.add_argument('--nava', help='Doar intrarile acestei nave')
+        parser.add_argument('--data-de', type=parse_date, help='Data inregistrare minima')
+        parser.add_argument('--data-pana', type=parse_date, help='Data inregistrare maxima')
+        parser.add_argument('--chunk-size', type=int, default=exports.DEFAULT_CHUNK_SIZE,
+                            help=f'Randuri citite per query (implicit {exports.DEFAULT_CHUNK_SIZE})')
+
+    def handle(self, *args, **options):
+        output = options['output']
+        export_format = options['format'] or output.rsplit('.', 1)[-1].lower()
+        if export_format not in exports.EXPORT_FORMATS:
+            raise CommandError('Formatul trebuie sa fie csv sau xlsx (folositi --format)')
+
+        year_id = None
+        if options['year']:
+            year_id = DatabaseYear.objects.filter(year=options['year']).values_list('id', flat=True).first()
+            if year_id is None:
+                raise CommandError(f'Anul {options["year"]} nu exista')
+
+        queryset = exports.export_queryset(
+            year_id=year_id,
+            numar_manifest=options['numar_manifest'],
+            nume_nava=options['nava'],
+            data_de=options['data_de'],
+            data_pana=options['data_pana'],
+        )
+
+        count = 0
+
+        def counted(rows):
+            nonlocal count
+            for row in rows:
+                count += 1
+                yield row
+
+        rows = counted(exports.iter_rows(queryset, chunk_size=options['chunk_size']))
+        if export_format == 'xlsx':
+            with open(output, 'wb') as file:
+                exports.write_xlsx(rows, file)
+        else:
+            with open(output, 'w', encoding='utf-8', newline='') as file:
+                file.writelines(exports.iter_csv(rows))
+
+        self.stdout.write(self.style.SUCCESS(f'{count} intrari exportate in {output}'))
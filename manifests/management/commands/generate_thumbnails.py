@@ -0,0 +1,28 @@
+"""
+Management command pentru generarea miniaturilor imaginilor existente
+(ContainerType, Ship, Pavilion) - vezi manifests/thumbnails.py.
+
+Utilizare:
+    python manage.py generate_thumbnails
+    python manage.py generate_thumbnails --force     # regenereaza si miniaturile existente
+"""
+from django.core.management.base import BaseCommand
+from manifests import thumbnails
+from manifests.models import ContainerType, Pavilion, Ship
+
+
+class Command(BaseCommand):
+    help = 'Genereaza miniaturile imaginilor pentru containere, nave si pavilioane'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenereaza si miniaturile existente')
+
+    def handle(self, *args, **options):
+        for model in (ContainerType, Ship, Pavilion):
+            count = 0
+            for obj in model.objects.exclude(imagine='').only('pk', 'imagine').iterator():
+                thumbnails.generate_all(obj.imagine, force=options['force'])
+                count += 1
+            self.stdout.write(f'   > {model._meta.verbose_name_plural}: {count} imagini')
+
+        self.stdout.write(self.style.SUCCESS('Gata!'))
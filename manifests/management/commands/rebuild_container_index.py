@@ -0,0 +1,46 @@
+"""
+Management command pentru reconstruirea campurilor de cautare container
+(container_cod, container_cifre) pe intrarile existente
+"""
+from django.core.management.base import BaseCommand
+from manifests.containers import normalize_container, container_digits
+from manifests.models import ManifestEntry
+
+
+class Command(BaseCommand):
+    help = 'Recalculeaza container_cod si container_cifre pentru toate intrarile din ManifestEntry'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000,
+                            help='Numarul de intrari actualizate per lot (implicit 2000)')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        self.stdout.write(self.style.SUCCESS('Incep reconstruirea indexului de containere...'))
+
+        last_pk = 0
+        updated = 0
+        while True:
+            batch = list(
+                ManifestEntry.objects.filter(pk__gt=last_pk).order_by('pk')
+                .only('pk', 'container', 'container_cod', 'container_cifre')[:batch_size]
+            )
+            if not batch:
+                break
+
+            changed = []
+            for entry in batch:
+                cod = normalize_container(entry.container)
+                cifre = container_digits(cod)
+                if entry.container_cod != cod or entry.container_cifre != cifre:
+                    entry.container_cod = cod
+                    entry.container_cifre = cifre
+                    changed.append(entry)
+
+            if changed:
+                ManifestEntry.objects.bulk_update(changed, ['container_cod', 'container_cifre'])
+                updated += len(changed)
+            last_pk = batch[-1].pk
+            self.stdout.write(f'   > procesat pana la id {last_pk}')
+
+        self.stdout.write(self.style.SUCCESS(f'Gata! {updated} intrari actualizate'))
@@ -0,0 +1,21 @@
+"""
+Management command pentru recalcularea contoarelor denormalizate
+(DatabaseYear/Ship/ContainerType.entries_count, Pavilion.ships_count)
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from manifests import counters
+
+
+class Command(BaseCommand):
+    help = 'Recalculeaza contoarele de intrari/nave din ManifestEntry si Ship'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('Recalculez contoarele...'))
+
+        with transaction.atomic():
+            for model, field, _, _ in counters.COUNTERS:
+                counters.rebuild([model])
+                self.stdout.write(f'   > {model._meta.verbose_name_plural}.{field}')
+
+        self.stdout.write(self.style.SUCCESS('Gata!'))
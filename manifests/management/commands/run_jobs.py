@@ -0,0 +1,52 @@
+"""
+Management command care executa joburile in fundal (vezi manifests/jobs.py).
+
+Poate rula continuu (serviciu) sau din cron cu --once, de exemplu pe cPanel:
+    * * * * * cd /home/.../Registru-RE1 && python manage.py run_jobs --once
+"""
+import time
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from manifests import jobs, search_cache
+
+
+class Command(BaseCommand):
+    help = 'Executa joburile in asteptare (importuri, sincronizari) pornite din admin'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Executa joburile in asteptare si se opreste (pentru cron)')
+        parser.add_argument('--sleep', type=float, default=2.0,
+                            help='Secunde intre verificari cand nu sunt joburi (implicit 2)')
+
+    def handle(self, *args, **options):
+        if isinstance(search_cache.get_version_cache(), LocMemCache):
+            # Invalidarile facute de joburi (versiunile din cache) nu ar ajunge la procesele web
+            raise CommandError(
+                "Cache-ul 'versions' (locmem) nu e partajat cu procesele web; "
+                'folositi un backend file sau db pentru a rula joburi in fundal'
+            )
+
+        stale = jobs.fail_stale_jobs()
+        if stale:
+            self.stdout.write(self.style.WARNING(f'{stale} joburi abandonate marcate ca esuate'))
+
+        self.stdout.write(self.style.SUCCESS('Astept joburi...'))
+        try:
+            while True:
+                close_old_connections()
+                job = jobs.claim_next()
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+                    continue
+
+                self.stdout.write(f'Job #{job.id} ({job.kind}) pornit')
+                job = jobs.run_job(job)
+                style = self.style.SUCCESS if job.status == job.STATUS_DONE else self.style.ERROR
+                self.stdout.write(style(f'Job #{job.id} ({job.kind}): {job.get_status_display()}'))
+        except KeyboardInterrupt:
+            self.stdout.write('Oprit.')
@@ -1,38 +1,45 @@
 """
 Management command pentru sincronizarea automata a tabelelor de referinta
-(ContainerType, Ship, Pavilion) cu valorile din ManifestEntry
+(ContainerType, Ship, Pavilion) cu valorile din ManifestEntry.
+
+Sincronizarea se face pe seturi: valorile distincte din ManifestEntry sunt
+comparate cu tabelele existente, lipsurile se creeaza cu bulk_create, iar
+relatiile se completeaza cu UPDATE-uri in masa (subquery corelat), pe
+intervale de id-uri - fara get_or_create sau save() rand cu rand.
 """
 from django.core.management.base import BaseCommand
-from django.db import models
+from django.db import transaction
+from django.db.models import Exists, Max, Min, OuterRef, Q, Subquery
+from django.db.models.functions import Lower, Trim
+from manifests import counters, search_cache
 from manifests.models import ManifestEntry, ContainerType, Ship, Pavilion
 
 
+DEFAULT_BATCH_SIZE = 5000
+
+
 class Command(BaseCommand):
     help = 'Sincronizeaza automat tabelele ContainerType, Ship si Pavilion cu valorile din ManifestEntry'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Doar numara ce s-ar crea/actualiza, fara sa scrie in baza de date')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help=f'Numarul de id-uri ManifestEntry per UPDATE (implicit {DEFAULT_BATCH_SIZE})')
+
     def handle(self, *args, **options):
+        self.dry_run = options['dry_run']
+        self.batch_size = options['batch_size']
+
+        if self.dry_run:
+            self.stdout.write(self.style.WARNING('Mod --dry-run: nu se scrie nimic in baza de date'))
         self.stdout.write(self.style.SUCCESS('Incep sincronizarea tabelelor de referinta...'))
 
         # 1. Sincronizeaza ContainerType
         self.stdout.write('\n1. Sincronizare ContainerType...')
-        unique_containers = ManifestEntry.objects.exclude(
-            model_container=''
-        ).values('model_container', 'tip_container').distinct()
-
-        container_created = 0
-        for item in unique_containers:
-            model = item['model_container']
-            tip = item['tip_container'] or ''
-            if model:
-                _, created = ContainerType.objects.get_or_create(
-                    model_container=model,
-                    defaults={'tip_container': tip}
-                )
-                if created:
-                    container_created += 1
-
+        container_created = self.sync_container_types()
         self.stdout.write(self.style.SUCCESS(
-            f'   > {container_created} tipuri de containere noi create'
+            f'   > {container_created} tipuri de containere noi {self.verb_created}'
         ))
         self.stdout.write(self.style.SUCCESS(
             f'   > Total ContainerType: {ContainerType.objects.count()}'
@@ -40,21 +47,9 @@ class Command(BaseCommand):
 
         # 2. Sincronizeaza Pavilion
         self.stdout.write('\n2. Sincronizare Pavilion...')
-        unique_pavilions = ManifestEntry.objects.exclude(
-            pavilion_nava=''
-        ).values_list('pavilion_nava', flat=True).distinct()
-
-        pavilion_created = 0
-        for pavilion_name in unique_pavilions:
-            if pavilion_name and pavilion_name.strip():
-                _, created = Pavilion.objects.get_or_create(
-                    nume=pavilion_name.strip()
-                )
-                if created:
-                    pavilion_created += 1
-
+        pavilion_created = self.sync_pavilions()
         self.stdout.write(self.style.SUCCESS(
-            f'   > {pavilion_created} pavilioane noi create'
+            f'   > {pavilion_created} pavilioane noi {self.verb_created}'
         ))
         self.stdout.write(self.style.SUCCESS(
             f'   > Total Pavilion: {Pavilion.objects.count()}'
@@ -62,34 +57,9 @@ class Command(BaseCommand):
 
         # 3. Sincronizeaza Ship
         self.stdout.write('\n3. Sincronizare Ship...')
-        unique_ships = ManifestEntry.objects.exclude(
-            nume_nava=''
-        ).values('nume_nava', 'linie_maritima', 'pavilion_nava').distinct()
-
-        ship_created = 0
-        for item in unique_ships:
-            nume = item['nume_nava']
-            if nume and nume.strip():
-                # Gaseste pavilion daca exista
-                pavilion_obj = None
-                if item['pavilion_nava']:
-                    try:
-                        pavilion_obj = Pavilion.objects.get(nume=item['pavilion_nava'].strip())
-                    except Pavilion.DoesNotExist:
-                        pass
-
-                _, created = Ship.objects.get_or_create(
-                    nume=nume.strip(),
-                    defaults={
-                        'linie_maritima': item['linie_maritima'] or '',
-                        'pavilion': pavilion_obj
-                    }
-                )
-                if created:
-                    ship_created += 1
-
+        ship_created = self.sync_ships()
         self.stdout.write(self.style.SUCCESS(
-            f'   > {ship_created} nave noi create'
+            f'   > {ship_created} nave noi {self.verb_created}'
         ))
         self.stdout.write(self.style.SUCCESS(
             f'   > Total Ship: {Ship.objects.count()}'
@@ -97,41 +67,122 @@ class Command(BaseCommand):
 
         # 4. Actualizeaza relatiile in ManifestEntry
         self.stdout.write('\n4. Actualizare relatii in ManifestEntry...')
-
-        entries_updated = 0
-        entries_to_update = ManifestEntry.objects.filter(
-            models.Q(container_type_rel__isnull=True) | models.Q(ship_rel__isnull=True)
-        )
-
-        for entry in entries_to_update:
-            updated = False
-
-            # Leaga ContainerType
-            if entry.model_container and not entry.container_type_rel:
-                try:
-                    container_type = ContainerType.objects.get(model_container=entry.model_container)
-                    entry.container_type_rel = container_type
-                    updated = True
-                except ContainerType.DoesNotExist:
-                    pass
-
-            # Leaga Ship
-            if entry.nume_nava and not entry.ship_rel:
-                try:
-                    ship = Ship.objects.get(nume__iexact=entry.nume_nava)
-                    entry.ship_rel = ship
-                    updated = True
-                except Ship.DoesNotExist:
-                    pass
-
-            if updated:
-                entry.save()
-                entries_updated += 1
-
+        if self.dry_run:
+            container_links, ship_links = self.count_missing_relations()
+        else:
+            container_links, ship_links = self.backfill_relations()
+            # UPDATE-urile in masa nu trimit semnale - recalculam contoarele si invalidam cache-ul API
+            counters.rebuild()
+            search_cache.bump_global_version()
+
+        verb = 'de actualizat' if self.dry_run else 'actualizate'
         self.stdout.write(self.style.SUCCESS(
-            f'   > {entries_updated} intrari ManifestEntry actualizate cu relatii'
+            f'   > {container_links} intrari ManifestEntry {verb} cu ContainerType'
+        ))
+        self.stdout.write(self.style.SUCCESS(
+            f'   > {ship_links} intrari ManifestEntry {verb} cu Ship'
         ))
 
         self.stdout.write(self.style.SUCCESS(
             f'\n> Sincronizare completa!'
         ))
+
+    @property
+    def verb_created(self):
+        return 'de creat' if self.dry_run else 'create'
+
+    def sync_container_types(self):
+        missing = {}
+        distinct = ManifestEntry.objects.exclude(
+            model_container=''
+        ).values_list('model_container', 'tip_container').distinct()
+        for model, tip in distinct.iterator():
+            missing.setdefault(model, tip or '')
+
+        existing = set(ContainerType.objects.filter(model_container__in=missing).values_list('model_container', flat=True))
+        to_create = [
+            ContainerType(model_container=model, tip_container=tip)
+            for model, tip in missing.items() if model not in existing
+        ]
+        if to_create and not self.dry_run:
+            ContainerType.objects.bulk_create(to_create, batch_size=1000, ignore_conflicts=True)
+        return len(to_create)
+
+    def sync_pavilions(self):
+        names = {
+            name.strip()
+            for name in ManifestEntry.objects.exclude(pavilion_nava='').values_list('pavilion_nava', flat=True).distinct().iterator()
+            if name and name.strip()
+        }
+        existing = set(Pavilion.objects.filter(nume__in=names).values_list('nume', flat=True))
+        to_create = [Pavilion(nume=name) for name in names if name not in existing]
+        if to_create and not self.dry_run:
+            Pavilion.objects.bulk_create(to_create, batch_size=1000, ignore_conflicts=True)
+        return len(to_create)
+
+    def sync_ships(self):
+        # Navele se compara case-insensitive, la fel ca la legarea relatiilor
+        missing = {}
+        distinct = ManifestEntry.objects.exclude(
+            nume_nava=''
+        ).values_list('nume_nava', 'linie_maritima', 'pavilion_nava').distinct()
+        for nume, linie, pavilion in distinct.iterator():
+            nume = (nume or '').strip()
+            if nume:
+                missing.setdefault(nume.lower(), (nume, linie or '', (pavilion or '').strip()))
+
+        existing = set(
+            Ship.objects.annotate(nume_lower=Lower('nume'))
+            .filter(nume_lower__in=missing).values_list('nume_lower', flat=True)
+        )
+        pavilions = dict(Pavilion.objects.values_list('nume', 'id'))
+        to_create = [
+            Ship(nume=nume, linie_maritima=linie, pavilion_id=pavilions.get(pavilion))
+            for key, (nume, linie, pavilion) in missing.items() if key not in existing
+        ]
+        if to_create and not self.dry_run:
+            Ship.objects.bulk_create(to_create, batch_size=1000, ignore_conflicts=True)
+        return len(to_create)
+
+    def container_type_match(self):
+        return ContainerType.objects.filter(model_container=OuterRef('model_container'))
+
+    def ship_match(self):
+        return Ship.objects.annotate(nume_lower=Lower('nume')).filter(nume_lower=Lower(Trim(OuterRef('nume_nava'))))
+
+    def count_missing_relations(self):
+        """Pentru --dry-run: cate intrari fara relatie au o valoare de legat"""
+        container_links = ManifestEntry.objects.filter(container_type_rel__isnull=True).exclude(model_container='').count()
+        ship_links = ManifestEntry.objects.filter(ship_rel__isnull=True).exclude(nume_nava='').count()
+        return container_links, ship_links
+
+    def backfill_relations(self):
+        """UPDATE in masa pe intervale de id-uri, cate o tranzactie scurta per interval"""
+        bounds = ManifestEntry.objects.filter(
+            Q(container_type_rel__isnull=True) | Q(ship_rel__isnull=True)
+        ).aggregate(min_pk=Min('pk'), max_pk=Max('pk'))
+        if bounds['min_pk'] is None:
+            return 0, 0
+
+        container_links = 0
+        ship_links = 0
+        start = bounds['min_pk']
+        end = bounds['max_pk']
+        while start <= end:
+            chunk = ManifestEntry.objects.filter(pk__gte=start, pk__lt=start + self.batch_size)
+            with transaction.atomic():
+                container_links += chunk.filter(
+                    container_type_rel__isnull=True
+                ).filter(Exists(self.container_type_match())).update(
+                    container_type_rel=Subquery(self.container_type_match().values('id')[:1])
+                )
+                ship_links += chunk.filter(
+                    ship_rel__isnull=True
+                ).filter(Exists(self.ship_match())).update(
+                    ship_rel=Subquery(self.ship_match().values('id')[:1])
+                )
+            start += self.batch_size
+            self.stdout.write(f'   > procesat pana la id {min(start - 1, end)} din {end}')
+
+        return container_links, ship_links
+
@@ -0,0 +1,139 @@
+"""
+Plan compilat pentru maparea coloanelor unui ImportTemplate.
+
+mapare_coloane ({"camp_baza": "litera_coloana"}) este interpretat o singura
+data: literele devin indecsi, iar fiecare camp primeste functia de conversie.
+Parsarea unui rand devine o simpla bucla peste lista compilata, folosita la
+fel de cititoarele .xlsx, .xls si CSV.
+"""
+import threading
+from datetime import datetime
+from decimal import Decimal
+
+
+# Campurile completate manual in formularul de import - nu se iau din Excel
+MANUAL_FIELDS = ('numar_manifest', 'numar_permis', 'data_inregistrare', 'cerere_operatiune', 'nume_nava', 'pavilion_nava')
+
+
+class InvalidCellValue(ValueError):
+    """Valoare invalida care invalideaza intregul rand (nu doar campul)"""
+
+
+def excel_col_to_index(col_letter):
+    """Convertește literă coloană Excel (A, B, AA, etc.) în index numeric (A=1, B=2, etc.)"""
+    col_letter = col_letter.upper().strip()
+    result = 0
+    for char in col_letter:
+        result = result * 26 + (ord(char) - ord('A') + 1)
+    return result
+
+
+def to_int(value):
+    return int(float(value))
+
+
+def to_decimal(value):
+    if isinstance(value, str):
+        # Din CSV greutatea poate veni cu virgula zecimala (1234,5)
+        value = value.strip().replace(',', '.')
+    return Decimal(str(value))
+
+
+def to_str(value):
+    return str(value).strip()
+
+
+def to_tip_operatiune(value):
+    """Conversie tip operațiune: IMP -> I, TRS -> T"""
+    tip_op = str(value).strip().upper()
+    if tip_op == 'IMP':
+        return 'I'
+    if tip_op == 'TRS':
+        return 'T'
+    if tip_op in ('I', 'T'):
+        return tip_op
+    # Validare: doar I sau T sunt permise
+    raise InvalidCellValue(f"Tip operațiune invalid: '{tip_op}'. Doar I, T, IMP sau TRS sunt permise.")
+
+
+FIELD_CONVERTERS = {
+    'numar_colete': to_int,
+    'numar_pozitie': to_int,
+    'greutate_bruta': to_decimal,
+    'tip_operatiune': to_tip_operatiune,
+}
+
+
+def manual_values(manual_fields):
+    """
+    Valorile campurilor manuale (string-uri din formular) care se aplica pe
+    fiecare rand importat. Nava si pavilionul se aplica doar daca sunt completate,
+    data (HTML date input, YYYY-MM-DD) doar daca e valida.
+    """
+    values = {name: manual_fields.get(name, '') for name in ('numar_manifest', 'numar_permis', 'cerere_operatiune')}
+    for name in ('nume_nava', 'pavilion_nava'):
+        if manual_fields.get(name):
+            values[name] = manual_fields[name]
+    if manual_fields.get('data_inregistrare'):
+        try:
+            values['data_inregistrare'] = datetime.strptime(manual_fields['data_inregistrare'], '%Y-%m-%d').date()
+        except ValueError:
+            pass
+    return values
+
+
+class ColumnPlan:
+    """Maparea compilata: lista de (index 0-based, camp, conversie)"""
+
+    def __init__(self, mapare_coloane):
+        self.columns = []
+        for db_field, excel_col_letter in mapare_coloane.items():
+            # Sari peste câmpurile manuale - acestea nu se iau din Excel
+            if db_field in MANUAL_FIELDS or not excel_col_letter:
+                continue
+            col_idx = excel_col_to_index(excel_col_letter) - 1
+            self.columns.append((col_idx, db_field, FIELD_CONVERTERS.get(db_field, to_str)))
+
+        # Numarul de coloane care trebuie citite dintr-un rand
+        self.max_col = max((col_idx for col_idx, _, _ in self.columns), default=-1) + 1
+
+    def parse(self, values):
+        """
+        Construieste dict-ul de date pentru un rand din valorile celulelor.
+        Celulele goale sau neconvertibile sunt ignorate; InvalidCellValue se propaga.
+        """
+        entry_data = {}
+        row_len = len(values)
+        for col_idx, db_field, convert in self.columns:
+            if col_idx >= row_len:
+                continue
+            cell_value = values[col_idx]
+            if cell_value is None or cell_value == '':
+                continue
+            try:
+                entry_data[db_field] = convert(cell_value)
+            except InvalidCellValue:
+                raise
+            except ValueError:
+                continue
+        return entry_data
+
+
+_plans = {}
+_plans_lock = threading.Lock()
+
+
+def get_plan(template):
+    """Planul compilat pentru un template, refolosit cat timp template-ul nu a fost modificat"""
+    key = (template.pk, template.updated_at)
+    plan = _plans.get(template.pk)
+    if plan is None or plan[0] != key:
+        plan = (key, ColumnPlan(template.mapare_coloane))
+        with _plans_lock:
+            _plans[template.pk] = plan
+    return plan[1]
+
+
+def invalidate_plan(template_pk):
+    with _plans_lock:
+        _plans.pop(template_pk, None)
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manifests', '0008_manifestentry_observatii'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StagedImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('template_name', models.CharField(max_length=200, verbose_name='Template')),
+                ('manual_fields', models.JSONField(default=dict, verbose_name='Campuri Manuale')),
+                ('total_rows', models.IntegerField(default=0, verbose_name='Total Randuri')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Creat la')),
+                ('database_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='staged_imports', to='manifests.databaseyear', verbose_name='An Baza Date')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='staged_imports', to=settings.AUTH_USER_MODEL, verbose_name='Utilizator')),
+            ],
+            options={
+                'verbose_name': 'Import In Asteptare',
+                'verbose_name_plural': 'Importuri In Asteptare',
+            },
+        ),
+        migrations.CreateModel(
+            name='StagedRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pozitie', models.IntegerField(verbose_name='Pozitie')),
+                ('data', models.JSONField(verbose_name='Date')),
+                ('staged_import', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rows', to='manifests.stagedimport', verbose_name='Import')),
+            ],
+            options={
+                'verbose_name': 'Rand Import In Asteptare',
+                'verbose_name_plural': 'Randuri Import In Asteptare',
+                'ordering': ['pozitie'],
+                'constraints': [models.UniqueConstraint(fields=('staged_import', 'pozitie'), name='unique_staged_row_pozitie')],
+            },
+        ),
+    ]
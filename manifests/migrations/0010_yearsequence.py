@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def seed_sequences(apps, schema_editor):
+    """Porneste secventa fiecarui an de la cel mai mare numar_curent existent"""
+    DatabaseYear = apps.get_model('manifests', 'DatabaseYear')
+    ManifestEntry = apps.get_model('manifests', 'ManifestEntry')
+    YearSequence = apps.get_model('manifests', 'YearSequence')
+
+    for year in DatabaseYear.objects.all():
+        max_curent = ManifestEntry.objects.filter(
+            database_year=year
+        ).aggregate(models.Max('numar_curent'))['numar_curent__max'] or 0
+        YearSequence.objects.create(database_year=year, last_value=max_curent)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manifests', '0009_stagedimport_stagedrow'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='YearSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_value', models.IntegerField(default=0, verbose_name='Ultimul Numar Curent')),
+                ('database_year', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sequence', to='manifests.databaseyear', verbose_name='An Baza Date')),
+            ],
+            options={
+                'verbose_name': 'Secventa Numar Curent',
+                'verbose_name_plural': 'Secvente Numar Curent',
+            },
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
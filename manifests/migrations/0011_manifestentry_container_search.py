@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:57
+
+import re
+
+from django.db import migrations, models
+
+
+def backfill_container_search(apps, schema_editor):
+    """Completeaza container_cod / container_cifre pentru intrarile existente"""
+    ManifestEntry = apps.get_model('manifests', 'ManifestEntry')
+    last_pk = 0
+    while True:
+        batch = list(ManifestEntry.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', 'container')[:2000])
+        if not batch:
+            break
+        for entry in batch:
+            entry.container_cod = re.sub(r'[^A-Z0-9]', '', (entry.container or '').upper())
+            entry.container_cifre = re.sub(r'\D', '', entry.container_cod)
+        ManifestEntry.objects.bulk_update(batch, ['container_cod', 'container_cifre'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manifests', '0010_yearsequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='manifestentry',
+            name='container_cifre',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=50, verbose_name='Cifre Container'),
+        ),
+        migrations.AddField(
+            model_name='manifestentry',
+            name='container_cod',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=50, verbose_name='Cod Container Normalizat'),
+        ),
+        migrations.RunPython(backfill_container_search, migrations.RunPython.noop),
+    ]
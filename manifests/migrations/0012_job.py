@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manifests', '0011_manifestentry_container_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=50, verbose_name='Tip')),
+                ('status', models.CharField(choices=[('pending', 'In asteptare'), ('running', 'In lucru'), ('done', 'Finalizat'), ('failed', 'Esuat')], default='pending', max_length=10, verbose_name='Status')),
+                ('params', models.JSONField(blank=True, default=dict, verbose_name='Parametri')),
+                ('progress_current', models.IntegerField(default=0, verbose_name='Progres')),
+                ('progress_total', models.IntegerField(default=0, verbose_name='Total')),
+                ('message', models.TextField(blank=True, verbose_name='Mesaj')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Creat la')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Pornit la')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Terminat la')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Actualizat la')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to=settings.AUTH_USER_MODEL, verbose_name='Utilizator')),
+            ],
+            options={
+                'verbose_name': 'Job',
+                'verbose_name_plural': 'Joburi',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='job_status_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:06
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def rebuild_counters(apps, schema_editor):
+    """Valorile initiale ale contoarelor (aceeasi logica ca counters.rebuild)"""
+    ManifestEntry = apps.get_model('manifests', 'ManifestEntry')
+    Ship = apps.get_model('manifests', 'Ship')
+    counters = (
+        ('DatabaseYear', 'entries_count', ManifestEntry, 'database_year_id'),
+        ('Ship', 'entries_count', ManifestEntry, 'ship_rel_id'),
+        ('ContainerType', 'entries_count', ManifestEntry, 'container_type_rel_id'),
+        ('Pavilion', 'ships_count', Ship, 'pavilion_id'),
+    )
+    for model_name, field, source, fk in counters:
+        counts = source.objects.filter(**{fk: OuterRef('pk')}).order_by().values(fk).annotate(n=Count('pk')).values('n')
+        apps.get_model('manifests', model_name).objects.update(**{
+            field: Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+        })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manifests', '0012_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='containertype',
+            name='entries_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Intrari'),
+        ),
+        migrations.AddField(
+            model_name='databaseyear',
+            name='entries_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Numar Intrari'),
+        ),
+        migrations.AddField(
+            model_name='pavilion',
+            name='ships_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Numar Nave'),
+        ),
+        migrations.AddField(
+            model_name='ship',
+            name='entries_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Intrari'),
+        ),
+        migrations.RunPython(rebuild_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manifests', '0013_denormalized_counters'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='manifestentry',
+            name='manifests_m_numar_c_216534_idx',
+        ),
+        migrations.AddIndex(
+            model_name='manifestentry',
+            index=models.Index(fields=['database_year', 'container_cod'], name='manifest_year_cont_cod_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='manifestentry',
+            index=models.Index(fields=['database_year', 'container_cifre'], name='manifest_year_cont_cifre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='manifestentry',
+            index=models.Index(fields=['database_year', 'container'], name='manifest_year_container_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='manifestentry',
+            index=models.Index(fields=['database_year', 'data_inregistrare', 'numar_manifest'], name='manifest_year_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='manifestentry',
+            index=models.Index(fields=['database_year', 'numar_curent'], name='manifest_year_numar_idx'),
+        ),
+    ]
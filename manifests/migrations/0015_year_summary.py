@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def build_summaries(apps, schema_editor):
+    """Rezumatul initial al fiecarui an (aceeasi logica ca summaries.refresh)"""
+    DatabaseYear = apps.get_model('manifests', 'DatabaseYear')
+    ManifestEntry = apps.get_model('manifests', 'ManifestEntry')
+    YearSummary = apps.get_model('manifests', 'YearSummary')
+    for year_id in DatabaseYear.objects.values_list('id', flat=True):
+        latest = ManifestEntry.objects.filter(
+            database_year_id=year_id, data_inregistrare__isnull=False
+        ).order_by('-data_inregistrare', '-numar_manifest').values(
+            'numar_manifest', 'data_inregistrare', 'nume_nava'
+        ).first() or {}
+        YearSummary.objects.create(
+            database_year_id=year_id,
+            latest_numar_manifest=latest.get('numar_manifest', ''),
+            latest_data_inregistrare=latest.get('data_inregistrare'),
+            latest_nume_nava=latest.get('nume_nava') or '',
+            updated_at=timezone.now(),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manifests', '0014_year_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='YearSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('latest_numar_manifest', models.CharField(blank=True, max_length=100, verbose_name='Ultimul Manifest')),
+                ('latest_data_inregistrare', models.DateField(blank=True, null=True, verbose_name='Data Ultimului Manifest')),
+                ('latest_nume_nava', models.CharField(blank=True, max_length=200, verbose_name='Nava Ultimului Manifest')),
+                ('last_import_at', models.DateTimeField(blank=True, null=True, verbose_name='Ultimul Import')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Actualizat la')),
+                ('database_year', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='summary', to='manifests.databaseyear', verbose_name='An Baza Date')),
+            ],
+            options={
+                'verbose_name': 'Rezumat An',
+                'verbose_name_plural': 'Rezumate Ani',
+            },
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:23
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manifests', '0015_year_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='databaseyear',
+            name='is_archived',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Arhivat'),
+        ),
+        migrations.CreateModel(
+            name='ManifestEntryArchive',
+            fields=[
+                ('numar_curent', models.IntegerField(db_index=True, default=0, verbose_name='Numar Curent')),
+                ('numar_manifest', models.CharField(db_index=True, max_length=100, verbose_name='Numar Manifest')),
+                ('numar_permis', models.CharField(blank=True, max_length=100, verbose_name='Numar Permis')),
+                ('numar_pozitie', models.CharField(blank=True, max_length=50, verbose_name='Numar Pozitie')),
+                ('cerere_operatiune', models.CharField(blank=True, max_length=100, verbose_name='Cerere Operatiune')),
+                ('data_inregistrare', models.DateField(blank=True, null=True, verbose_name='Data Inregistrare')),
+                ('container', models.CharField(db_index=True, max_length=50, verbose_name='Container')),
+                ('numar_colete', models.IntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Numar Colete')),
+                ('greutate_bruta', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True, verbose_name='Greutate Bruta (kg)')),
+                ('descriere_marfa', models.TextField(blank=True, verbose_name='Descriere Marfa')),
+                ('tip_operatiune', models.CharField(blank=True, max_length=1, verbose_name='Tip Operatiune')),
+                ('nume_nava', models.CharField(blank=True, max_length=200, verbose_name='Nume Nava')),
+                ('pavilion_nava', models.CharField(blank=True, max_length=100, verbose_name='Pavilion Nava')),
+                ('numar_sumara', models.CharField(blank=True, max_length=100, null=True, verbose_name='Numar Sumara')),
+                ('tip_container', models.CharField(blank=True, max_length=50, verbose_name='Tip Container')),
+                ('linie_maritima', models.CharField(blank=True, max_length=200, verbose_name='Linie Maritima')),
+                ('observatii', models.TextField(blank=True, verbose_name='Observatii')),
+                ('model_container', models.CharField(blank=True, editable=False, max_length=100, verbose_name='Model Container')),
+                ('container_cod', models.CharField(blank=True, db_index=True, editable=False, max_length=50, verbose_name='Cod Container Normalizat')),
+                ('container_cifre', models.CharField(blank=True, db_index=True, editable=False, max_length=50, verbose_name='Cifre Container')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Creat la')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Actualizat la')),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('container_type_rel', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_entries', to='manifests.containertype', verbose_name='Tip Container (Relatie)')),
+                ('database_year', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_entries', to='manifests.databaseyear', verbose_name='An Baza Date')),
+                ('ship_rel', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_entries', to='manifests.ship', verbose_name='Nava (Relatie)')),
+            ],
+            options={
+                'verbose_name': 'Intrare Arhivata',
+                'verbose_name_plural': 'Registru Import Arhivat',
+                'ordering': ['numar_curent'],
+                'indexes': [models.Index(fields=['database_year', 'container_cod'], name='archive_year_cont_cod_idx'), models.Index(fields=['database_year', 'container_cifre'], name='archive_year_cont_cifre_idx'), models.Index(fields=['database_year', 'container'], name='archive_year_container_idx'), models.Index(fields=['database_year', 'data_inregistrare', 'numar_manifest'], name='archive_year_data_idx'), models.Index(fields=['database_year', 'numar_curent'], name='archive_year_numar_idx')],
+            },
+        ),
+    ]
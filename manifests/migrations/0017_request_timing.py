@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manifests', '0016_year_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestTiming',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('endpoint', models.CharField(max_length=255, verbose_name='Endpoint')),
+                ('method', models.CharField(max_length=10, verbose_name='Metoda')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='Status')),
+                ('duration_ms', models.FloatField(verbose_name='Durata (ms)')),
+                ('db_ms', models.FloatField(verbose_name='Baza de date (ms)')),
+                ('render_ms', models.FloatField(blank=True, null=True, verbose_name='Serializare (ms)')),
+                ('queries', models.PositiveIntegerField(verbose_name='Query-uri')),
+                ('slowest_sql', models.TextField(blank=True, verbose_name='Cel mai lent query')),
+                ('slowest_sql_ms', models.FloatField(default=0, verbose_name='Cel mai lent query (ms)')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Creat la')),
+            ],
+            options={
+                'verbose_name': 'Masuratoare Cerere',
+                'verbose_name_plural': 'Masuratori Cereri',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['endpoint', 'created_at'], name='timing_endpoint_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manifests', '0017_request_timing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='worker',
+            field=models.CharField(blank=True, help_text='host:pid al procesului run_jobs care executa jobul', max_length=255, verbose_name='Worker'),
+        ),
+    ]
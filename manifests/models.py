@@ -1,13 +1,51 @@
-from django.db import models
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
 from django.core.validators import MinValueValidator
+from django.utils import timezone
+
+
+class CounterFieldsMixin:
+    """
+    Modele cu contoare denormalizate (vezi counters.py). Contoarele se modifica
+    doar prin UPDATE atomic, deci save() pe o instanta existenta nu le scrie -
+    altfel o editare din admin ar suprascrie valorile actualizate intre timp.
+    """
+    COUNTER_FIELDS = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
 
+class CountedRelationsMixin:
+    """Modele care alimenteaza contoare: retine valorile FK incarcate din baza de date"""
+    COUNTED_RELATIONS = ()
 
-class DatabaseYear(models.Model):
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if all(attname in instance.__dict__ for attname in cls.COUNTED_RELATIONS):
+            instance._counter_snapshot = {attname: instance.__dict__[attname] for attname in cls.COUNTED_RELATIONS}
+        return instance
+
+
+class DatabaseYear(CounterFieldsMixin, models.Model):
     """Model pentru gestionarea bazelor de date pe ani"""
     year = models.IntegerField(unique=True, verbose_name="An")
     is_active = models.BooleanField(default=False, verbose_name="Activ")
+    # Intrarile anului sunt in tabela de arhiva (vezi archive.py)
+    is_archived = models.BooleanField(default=False, editable=False, verbose_name="Arhivat")
+    entries_count = models.IntegerField(default=0, editable=False, verbose_name="Numar Intrari")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Creat la")
 
+    COUNTER_FIELDS = ('entries_count',)
+
     class Meta:
         verbose_name = "An Baza Date"
         verbose_name_plural = "Ani Baze Date"
@@ -17,15 +55,18 @@ class DatabaseYear(models.Model):
         return f"Registru {self.year}"
 
 
-class ContainerType(models.Model):
+class ContainerType(CounterFieldsMixin, models.Model):
     """Model pentru tipuri de containere cu imagini"""
     model_container = models.CharField(max_length=100, unique=True, verbose_name="Model Container")
     tip_container = models.CharField(max_length=50, verbose_name="Tip Container")
     imagine = models.ImageField(upload_to='container_types/', null=True, blank=True, verbose_name="Imagine Container")
     descriere = models.TextField(blank=True, verbose_name="Descriere")
+    entries_count = models.IntegerField(default=0, editable=False, verbose_name="Intrari")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Creat la")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Actualizat la")
 
+    COUNTER_FIELDS = ('entries_count',)
+
     class Meta:
         verbose_name = "Tip Container"
         verbose_name_plural = "Tipuri Containere"
@@ -35,14 +76,17 @@ class ContainerType(models.Model):
         return f"{self.model_container} - {self.tip_container}"
 
 
-class Pavilion(models.Model):
+class Pavilion(CounterFieldsMixin, models.Model):
     """Model pentru pavilioane nave cu imagini"""
     nume = models.CharField(max_length=100, unique=True, verbose_name="Nume Pavilion")
     nume_tara = models.CharField(max_length=100, blank=True, verbose_name="Nume Țară")
     imagine = models.ImageField(upload_to='pavilions/', null=True, blank=True, verbose_name="Imagine Pavilion")
+    ships_count = models.IntegerField(default=0, editable=False, verbose_name="Numar Nave")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Creat la")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Actualizat la")
 
+    COUNTER_FIELDS = ('ships_count',)
+
     class Meta:
         verbose_name = "Pavilion"
         verbose_name_plural = "Pavilioane"
@@ -52,16 +96,20 @@ class Pavilion(models.Model):
         return self.nume
 
 
-class Ship(models.Model):
+class Ship(CounterFieldsMixin, CountedRelationsMixin, models.Model):
     """Model pentru nave cu imagini"""
     nume = models.CharField(max_length=200, unique=True, verbose_name="Nume Nava")
     linie_maritima = models.CharField(max_length=200, blank=True, verbose_name="Linie Maritima")
     pavilion = models.ForeignKey(Pavilion, on_delete=models.SET_NULL, null=True, blank=True, related_name='ships', verbose_name="Pavilion")
     imagine = models.ImageField(upload_to='ships/', null=True, blank=True, verbose_name="Imagine Nava")
     descriere = models.TextField(blank=True, verbose_name="Descriere")
+    entries_count = models.IntegerField(default=0, editable=False, verbose_name="Intrari")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Creat la")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Actualizat la")
 
+    COUNTER_FIELDS = ('entries_count',)
+    COUNTED_RELATIONS = ('pavilion_id',)
+
     class Meta:
         verbose_name = "Nava"
         verbose_name_plural = "Nave"
@@ -71,11 +119,12 @@ class Ship(models.Model):
         return self.nume
 
 
-class ManifestEntry(models.Model):
-    """Model pentru intrari din manifestele de marfa"""
-
-    # An baza de date
-    database_year = models.ForeignKey(DatabaseYear, on_delete=models.CASCADE, related_name='entries', null=True, blank=True, verbose_name="An Baza Date")
+class ManifestEntryBase(models.Model):
+    """
+    Coloanele unei intrari din manifest, comune tabelei curente (ManifestEntry)
+    si tabelei de arhiva (ManifestEntryArchive, vezi archive.py). Relatiile sunt
+    definite in fiecare model, cu related_name propriu.
+    """
 
     # Numar curent (generat automat)
     numar_curent = models.IntegerField(default=0, db_index=True, verbose_name="Numar Curent")
@@ -101,14 +150,49 @@ class ManifestEntry(models.Model):
     # Coloana generata automat
     model_container = models.CharField(max_length=100, blank=True, editable=False, verbose_name="Model Container")
 
-    # Relatii cu tabelele noi
-    container_type_rel = models.ForeignKey(ContainerType, on_delete=models.SET_NULL, null=True, blank=True, related_name='entries', verbose_name="Tip Container (Relatie)")
-    ship_rel = models.ForeignKey(Ship, on_delete=models.SET_NULL, null=True, blank=True, related_name='entries', verbose_name="Nava (Relatie)")
+    # Index de cautare container (generat automat, vezi containers.py)
+    container_cod = models.CharField(max_length=50, blank=True, editable=False, db_index=True, verbose_name="Cod Container Normalizat")
+    container_cifre = models.CharField(max_length=50, blank=True, editable=False, db_index=True, verbose_name="Cifre Container")
 
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Creat la")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Actualizat la")
 
+    class Meta:
+        abstract = True
+
+    @staticmethod
+    def build_model_container(container, tip_container):
+        """Construieste model_container din prefixul containerului si tipul acestuia"""
+        if container and tip_container:
+            prefix = container[:4] if len(container) >= 4 else container
+            return f"{prefix}{tip_container}"
+        return ""
+
+    def populate_derived_fields(self):
+        """Genereaza model_container si coloanele indexului de cautare container"""
+        from .containers import normalize_container, container_digits
+
+        self.model_container = self.build_model_container(self.container, self.tip_container)
+        self.container_cod = normalize_container(self.container)
+        self.container_cifre = container_digits(self.container_cod)
+
+    def __str__(self):
+        return f"{self.numar_manifest} - {self.container}"
+
+
+class ManifestEntry(CountedRelationsMixin, ManifestEntryBase):
+    """Model pentru intrari din manifestele de marfa"""
+
+    COUNTED_RELATIONS = ('database_year_id', 'ship_rel_id', 'container_type_rel_id')
+
+    # An baza de date
+    database_year = models.ForeignKey(DatabaseYear, on_delete=models.CASCADE, related_name='entries', null=True, blank=True, verbose_name="An Baza Date")
+
+    # Relatii cu tabelele noi
+    container_type_rel = models.ForeignKey(ContainerType, on_delete=models.SET_NULL, null=True, blank=True, related_name='entries', verbose_name="Tip Container (Relatie)")
+    ship_rel = models.ForeignKey(Ship, on_delete=models.SET_NULL, null=True, blank=True, related_name='entries', verbose_name="Nava (Relatie)")
+
     class Meta:
         verbose_name = "Intrare Registru Import"
         verbose_name_plural = "Registru Import 2025"
@@ -116,73 +200,181 @@ class ManifestEntry(models.Model):
         indexes = [
             models.Index(fields=['numar_manifest', 'container']),
             models.Index(fields=['data_inregistrare']),
-            models.Index(fields=['numar_curent']),
+            # Interogarile frecvente sunt in interiorul unui an - anul e prima coloana
+            # (verificare: python manage.py check_query_plans)
+            models.Index(fields=['database_year', 'container_cod'], name='manifest_year_cont_cod_idx'),
+            models.Index(fields=['database_year', 'container_cifre'], name='manifest_year_cont_cifre_idx'),
+            models.Index(fields=['database_year', 'container'], name='manifest_year_container_idx'),
+            models.Index(fields=['database_year', 'data_inregistrare', 'numar_manifest'], name='manifest_year_data_idx'),
+            models.Index(fields=['database_year', 'numar_curent'], name='manifest_year_numar_idx'),
         ]
 
     def save(self, *args, **kwargs):
         """Override save pentru a genera automat model_container si a lega relatiile"""
-        # Genereaza model_container
-        if self.container and self.tip_container:
-            prefix = self.container[:4] if len(self.container) >= 4 else self.container
-            self.model_container = f"{prefix}{self.tip_container}"
-        else:
-            self.model_container = ""
+        # Genereaza model_container si indexul de cautare
+        self.populate_derived_fields()
+
+        # Leaga relatiile inainte de scriere, astfel incat salvarea sa fie un singur INSERT/UPDATE
+        linked_fields = self.resolve_relations()
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields) | linked_fields
+            if 'container' in update_fields:
+                update_fields |= {'container_cod', 'container_cifre'}
+            kwargs['update_fields'] = update_fields
+
+        # Intrarile unui an arhivat sunt citite din ManifestEntryArchive
+        from .archive import check_writable
+        check_writable(self.database_year_id)
+
+        super().save(*args, **kwargs)
+
+    def clean(self):
+        """Formularele (admin) raporteaza anul arhivat ca eroare de validare, nu la salvare"""
+        from django.core.exceptions import ValidationError
+        from .archive import ArchiveError, check_writable
+
+        super().clean()
+        try:
+            check_writable(self.database_year_id)
+        except ArchiveError as e:
+            raise ValidationError({'database_year': str(e)})
+
+    def delete(self, using=None, keep_parents=False):
+        """Stergere prin deletion.delete_entries: contoarele si cache-ul sunt actualizate fara semnale"""
+        from . import deletion
+
+        result = deletion.delete_entries(type(self).objects.using(using or self._state.db).filter(pk=self.pk))
+        self.pk = None
+        return result
+
+    def resolve_relations(self):
+        """
+        Seteaza database_year, container_type_rel si ship_rel folosind cache-urile
+        din lookups.py (AUTO-CREARE ContainerType, Pavilion si Ship daca nu exista).
+        Returneaza numele campurilor setate.
+        """
+        from . import lookups
+
+        linked_fields = set()
 
         # Seteaza database_year daca nu e setat (pentru backwards compatibility)
         if not self.database_year_id:
-            try:
-                # Incearca sa gaseasca anul activ sau cel mai recent
-                active_year = DatabaseYear.objects.filter(is_active=True).first()
-                if not active_year:
-                    active_year = DatabaseYear.objects.order_by('-year').first()
-                if active_year:
-                    self.database_year = active_year
-            except DatabaseYear.DoesNotExist:
-                pass
+            # Anul activ sau cel mai recent
+            year_id = lookups.resolve_active_year_id()
+            if year_id:
+                self.database_year_id = year_id
+                linked_fields.add('database_year')
 
-        super().save(*args, **kwargs)
+        if self.model_container and not self.container_type_rel_id:
+            self.container_type_rel_id = lookups.resolve_container_type_id(self.model_container, self.tip_container)
+            linked_fields.add('container_type_rel')
+
+        if self.nume_nava and not self.ship_rel_id:
+            # Mai intai verifica/creeaza Pavilion, apoi Ship
+            pavilion_id = None
+            if self.pavilion_nava and self.pavilion_nava.strip():
+                pavilion_id = lookups.resolve_pavilion_id(self.pavilion_nava)
+
+            self.ship_rel_id = lookups.resolve_ship_id(self.nume_nava, self.linie_maritima, pavilion_id)
+            linked_fields.add('ship_rel')
+
+        return linked_fields
 
-        # AUTO-CREARE ContainerType daca nu exista
-        if self.model_container and not self.container_type_rel:
-            try:
-                container_type = ContainerType.objects.get(model_container=self.model_container)
-                self.container_type_rel = container_type
-                super().save(update_fields=['container_type_rel'])
-            except ContainerType.DoesNotExist:
-                # Creeaza automat ContainerType nou
-                container_type = ContainerType.objects.create(
-                    model_container=self.model_container,
-                    tip_container=self.tip_container or ''
-                )
-                self.container_type_rel = container_type
-                super().save(update_fields=['container_type_rel'])
-
-        # AUTO-CREARE Pavilion si Ship daca nu exista
-        if self.nume_nava and not self.ship_rel:
-            # Mai intai verifica/creeaza Pavilion
-            pavilion_obj = None
-            if self.pavilion_nava:
-                pavilion_obj, _ = Pavilion.objects.get_or_create(
-                    nume=self.pavilion_nava.strip()
-                )
-
-            # Apoi verifica/creeaza Ship
-            try:
-                ship = Ship.objects.get(nume__iexact=self.nume_nava)
-                self.ship_rel = ship
-                super().save(update_fields=['ship_rel'])
-            except Ship.DoesNotExist:
-                # Creeaza automat Ship nou
-                ship = Ship.objects.create(
-                    nume=self.nume_nava.strip(),
-                    linie_maritima=self.linie_maritima or '',
-                    pavilion=pavilion_obj
-                )
-                self.ship_rel = ship
-                super().save(update_fields=['ship_rel'])
+
+class ManifestEntryArchive(ManifestEntryBase):
+    """
+    Intrarile anilor inchisi, mutate din ManifestEntry de comanda archive_year.
+    Cautarile si importurile anului curent nu mai parcurg indexurile acestor
+    randuri; citirile pentru un an arhivat sunt directionate aici (archive.py).
+    Id-urile sunt pastrate, deci un an poate fi readus in tabela curenta.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+
+    database_year = models.ForeignKey(DatabaseYear, on_delete=models.CASCADE, related_name='archived_entries', null=True, blank=True, verbose_name="An Baza Date")
+    container_type_rel = models.ForeignKey(ContainerType, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_entries', verbose_name="Tip Container (Relatie)")
+    ship_rel = models.ForeignKey(Ship, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_entries', verbose_name="Nava (Relatie)")
+
+    class Meta:
+        verbose_name = "Intrare Arhivata"
+        verbose_name_plural = "Registru Import Arhivat"
+        ordering = ['numar_curent']
+        indexes = [
+            models.Index(fields=['database_year', 'container_cod'], name='archive_year_cont_cod_idx'),
+            models.Index(fields=['database_year', 'container_cifre'], name='archive_year_cont_cifre_idx'),
+            models.Index(fields=['database_year', 'container'], name='archive_year_container_idx'),
+            models.Index(fields=['database_year', 'data_inregistrare', 'numar_manifest'], name='archive_year_data_idx'),
+            models.Index(fields=['database_year', 'numar_curent'], name='archive_year_numar_idx'),
+        ]
+
+
+class YearSequence(models.Model):
+    """Secventa numar_curent pentru un an - ultimul numar alocat"""
+
+    database_year = models.OneToOneField(DatabaseYear, on_delete=models.CASCADE, related_name='sequence', verbose_name="An Baza Date")
+    last_value = models.IntegerField(default=0, verbose_name="Ultimul Numar Curent")
+
+    class Meta:
+        verbose_name = "Secventa Numar Curent"
+        verbose_name_plural = "Secvente Numar Curent"
 
     def __str__(self):
-        return f"{self.numar_manifest} - {self.container}"
+        return f"{self.database_year}: {self.last_value}"
+
+    @classmethod
+    def reserve(cls, database_year, count=1):
+        """
+        Rezerva count numere curente consecutive pentru anul dat si intoarce
+        range-ul lor. Blocheaza un singur rand (SELECT ... FOR UPDATE) pana la
+        sfarsitul tranzactiei, deci importurile simultane nu primesc numere duplicate.
+        """
+        year_id = getattr(database_year, 'pk', database_year)
+        with transaction.atomic():
+            sequence = cls.objects.select_for_update().filter(database_year_id=year_id).first()
+            if sequence is None:
+                sequence = cls._create_for_year(year_id)
+            start = sequence.last_value + 1
+            sequence.last_value += count
+            sequence.save(update_fields=['last_value'])
+        return range(start, start + count)
+
+    @classmethod
+    def _create_for_year(cls, year_id):
+        """Creeaza secventa pornind de la cel mai mare numar_curent existent in an"""
+        max_curent = ManifestEntry.objects.filter(
+            database_year_id=year_id
+        ).aggregate(models.Max('numar_curent'))['numar_curent__max'] or 0
+        try:
+            with transaction.atomic():
+                cls.objects.create(database_year_id=year_id, last_value=max_curent)
+        except IntegrityError:
+            # Creata intre timp de alt proces
+            pass
+        return cls.objects.select_for_update().get(database_year_id=year_id)
+
+
+class YearSummary(models.Model):
+    """
+    Rezumatul unui an pentru antetul aplicatiei (/api/latest-manifest/): ultimul
+    manifest si ultimul import. Mentinut de summaries.py, in aceeasi tranzactie
+    cu scrierea intrarilor.
+    """
+
+    database_year = models.OneToOneField(DatabaseYear, on_delete=models.CASCADE, related_name='summary', verbose_name="An Baza Date")
+    latest_numar_manifest = models.CharField(max_length=100, blank=True, verbose_name="Ultimul Manifest")
+    latest_data_inregistrare = models.DateField(null=True, blank=True, verbose_name="Data Ultimului Manifest")
+    latest_nume_nava = models.CharField(max_length=200, blank=True, verbose_name="Nava Ultimului Manifest")
+    last_import_at = models.DateTimeField(null=True, blank=True, verbose_name="Ultimul Import")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Actualizat la")
+
+    class Meta:
+        verbose_name = "Rezumat An"
+        verbose_name_plural = "Rezumate Ani"
+
+    def __str__(self):
+        return f"{self.database_year}: {self.latest_numar_manifest or '-'}"
 
 
 class ImportTemplate(models.Model):
@@ -210,3 +402,164 @@ class ImportTemplate(models.Model):
 
     def __str__(self):
         return self.nume
+
+    def save(self, *args, **kwargs):
+        """Invalideaza planul compilat al maparii la fiecare salvare"""
+        from .mapping import invalidate_plan
+
+        super().save(*args, **kwargs)
+        invalidate_plan(self.pk)
+
+    def get_plan(self):
+        """Planul compilat (ColumnPlan) pentru mapare_coloane"""
+        from .mapping import get_plan
+
+        return get_plan(self)
+
+
+class StagedImport(models.Model):
+    """Import personalizat in asteptarea confirmarii (Step 1 -> Step 2)"""
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='staged_imports', verbose_name="Utilizator")
+    database_year = models.ForeignKey(DatabaseYear, on_delete=models.CASCADE, related_name='staged_imports', verbose_name="An Baza Date")
+    template_name = models.CharField(max_length=200, verbose_name="Template")
+    manual_fields = models.JSONField(default=dict, verbose_name="Campuri Manuale")
+    total_rows = models.IntegerField(default=0, verbose_name="Total Randuri")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Creat la")
+
+    class Meta:
+        verbose_name = "Import In Asteptare"
+        verbose_name_plural = "Importuri In Asteptare"
+
+    # Importurile neconfirmate mai vechi de atat sunt sterse automat
+    MAX_AGE = timedelta(days=1)
+
+    def __str__(self):
+        return f"Import #{self.pk} ({self.template_name}, {self.total_rows} randuri)"
+
+    @classmethod
+    def delete_stale(cls):
+        """Sterge importurile in asteptare abandonate"""
+        cls.objects.filter(created_at__lt=timezone.now() - cls.MAX_AGE).delete()
+
+    def add_rows(self, rows, chunk_size=500):
+        """Salveaza randurile (dict-uri serializabile JSON) in loturi si actualizeaza total_rows"""
+        batch = []
+        for data in rows:
+            self.total_rows += 1
+            batch.append(StagedRow(staged_import=self, pozitie=self.total_rows, data=data))
+            if len(batch) >= chunk_size:
+                StagedRow.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            StagedRow.objects.bulk_create(batch)
+        self.save(update_fields=['total_rows'])
+
+    def page_rows(self, page, per_page=50):
+        """Randurile unei pagini de preview (pagina incepe de la 1)"""
+        start = (page - 1) * per_page
+        return self.rows.filter(pozitie__gt=start, pozitie__lte=start + per_page)
+
+    def iter_rows(self, chunk_size=1000):
+        """Itereaza datele randurilor in ordine, in loturi dupa pozitie (fara a incarca tot importul)"""
+        for start in range(0, self.total_rows, chunk_size):
+            yield from self.rows.filter(
+                pozitie__gt=start, pozitie__lte=start + chunk_size
+            ).values_list('data', flat=True)
+
+
+class StagedRow(models.Model):
+    """Rand parsat dintr-un import in asteptare (date serializabile JSON)"""
+
+    staged_import = models.ForeignKey(StagedImport, on_delete=models.CASCADE, related_name='rows', verbose_name="Import")
+    pozitie = models.IntegerField(verbose_name="Pozitie")
+    data = models.JSONField(verbose_name="Date")
+
+    class Meta:
+        verbose_name = "Rand Import In Asteptare"
+        verbose_name_plural = "Randuri Import In Asteptare"
+        ordering = ['pozitie']
+        constraints = [
+            models.UniqueConstraint(fields=['staged_import', 'pozitie'], name='unique_staged_row_pozitie'),
+        ]
+
+
+class Job(models.Model):
+    """Operatie lunga (import, sincronizare) rulata in fundal de comanda run_jobs"""
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'In asteptare'),
+        (STATUS_RUNNING, 'In lucru'),
+        (STATUS_DONE, 'Finalizat'),
+        (STATUS_FAILED, 'Esuat'),
+    ]
+
+    kind = models.CharField(max_length=50, verbose_name="Tip")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="Status")
+    params = models.JSONField(default=dict, blank=True, verbose_name="Parametri")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs', verbose_name="Utilizator")
+    progress_current = models.IntegerField(default=0, verbose_name="Progres")
+    progress_total = models.IntegerField(default=0, verbose_name="Total")
+    message = models.TextField(blank=True, verbose_name="Mesaj")
+    worker = models.CharField(max_length=255, blank=True, verbose_name="Worker", help_text="host:pid al procesului run_jobs care executa jobul")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Creat la")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Pornit la")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Terminat la")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Actualizat la")
+
+    class Meta:
+        verbose_name = "Job"
+        verbose_name_plural = "Joburi"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='job_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Job #{self.pk} {self.kind} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+
+class RequestTiming(models.Model):
+    """
+    Masuratoare (esantionata) a unei cereri: durata, timpul in baza de date,
+    numarul de query-uri si cel mai lent query. Scrisa de RequestTimingMiddleware
+    (vezi instrumentation.py) doar daca REQUEST_TIMING_ENABLED este activ.
+    """
+
+    MAX_AGE = timedelta(days=getattr(settings, 'REQUEST_TIMING_RETENTION_DAYS', 14))
+    MAX_SQL_LENGTH = 2000
+
+    endpoint = models.CharField(max_length=255, verbose_name="Endpoint")
+    method = models.CharField(max_length=10, verbose_name="Metoda")
+    status_code = models.PositiveSmallIntegerField(verbose_name="Status")
+    duration_ms = models.FloatField(verbose_name="Durata (ms)")
+    db_ms = models.FloatField(verbose_name="Baza de date (ms)")
+    render_ms = models.FloatField(null=True, blank=True, verbose_name="Serializare (ms)")
+    queries = models.PositiveIntegerField(verbose_name="Query-uri")
+    slowest_sql = models.TextField(blank=True, verbose_name="Cel mai lent query")
+    slowest_sql_ms = models.FloatField(default=0, verbose_name="Cel mai lent query (ms)")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Creat la")
+
+    class Meta:
+        verbose_name = "Masuratoare Cerere"
+        verbose_name_plural = "Masuratori Cereri"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['endpoint', 'created_at'], name='timing_endpoint_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.endpoint} ({self.duration_ms:.0f} ms)"
+
+    @classmethod
+    def delete_stale(cls):
+        """Sterge masuratorile mai vechi decat MAX_AGE"""
+        cls.objects.filter(created_at__lt=timezone.now() - cls.MAX_AGE).delete()
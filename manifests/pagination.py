@@ -0,0 +1,170 @@
+"""
+Paginare keyset (cursor) pentru listarile ManifestEntry.
+
+PageNumberPagination face COUNT(*) la fiecare pagina si OFFSET crescator, deci
+parcurgerea tuturor paginilor (ex: exporturi) devine patratica. Aici pozitia
+e data de valorile ultimului rand, (cheie, id), iar pagina urmatoare e un
+WHERE pe acele valori - costul unei pagini nu depinde de cat de departe e.
+
+Activare per request:  ?pagination=cursor&order=data|numar[&count=1]
+- order=data  -> data_inregistrare descrescator (fara data la final), id descrescator
+- order=numar -> numar_curent crescator, id crescator
+- count=1     -> include numarul total (un COUNT(*) in plus); implicit count e null
+"""
+import base64
+import binascii
+import datetime
+import json
+from collections import OrderedDict
+
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Paginare dupa (cheie, id), inainte si inapoi, fara OFFSET si fara COUNT implicit"""
+
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    order_query_param = 'order'
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+
+    # order -> (camp cheie, descrescator, tip valoare)
+    ORDERINGS = {
+        'data': ('data_inregistrare', True, 'date'),
+        'numar': ('numar_curent', False, 'int'),
+    }
+    default_order = 'data'
+
+    invalid_cursor_message = 'Cursor invalid'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.order = request.query_params.get(self.order_query_param, self.default_order)
+        if self.order not in self.ORDERINGS:
+            self.order = self.default_order
+        self.field, self.descending, self.value_type = self.ORDERINGS[self.order]
+        self.page_size = self.get_page_size(request)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ('1', 'true'):
+            self.count = queryset.count()
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor['reverse'])
+
+        queryset = queryset.order_by(*self.get_ordering(reverse))
+        if cursor:
+            queryset = queryset.filter(self.after_q(cursor['value'], cursor['id'], reverse))
+
+        # Un rand in plus ne spune daca mai exista o pagina in directia parcursa
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.page = rows
+        if reverse:
+            self.has_next = cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_ordering(self, reverse=False):
+        descending = self.descending != reverse
+        key = F(self.field).desc(nulls_last=True) if descending else F(self.field).asc(nulls_first=True)
+        return [key, '-id' if descending else 'id']
+
+    def after_q(self, value, pk, reverse=False):
+        """
+        Randurile de dupa (value, pk) in ordinea paginii. NULL-urile (doar pentru
+        data) sunt la final in ordinea descrescatoare, deci la inceput in cea inversa.
+        """
+        descending = self.descending != reverse
+        field = self.field
+        nulls_after = descending  # NULL-urile vin dupa toate valorile
+        if value is None:
+            if nulls_after:
+                return Q(**{f'{field}__isnull': True, 'id__lt' if descending else 'id__gt': pk})
+            return Q(**{f'{field}__isnull': False}) | Q(**{f'{field}__isnull': True, 'id__lt' if descending else 'id__gt': pk})
+
+        compare = 'lt' if descending else 'gt'
+        q = Q(**{f'{field}__{compare}': value}) | Q(**{field: value, f'id__{compare}': pk})
+        if nulls_after:
+            q |= Q(**{f'{field}__isnull': True})
+        return q
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            value = data['v']
+            if value is not None and self.value_type == 'date':
+                value = datetime.date.fromisoformat(value)
+            elif value is not None:
+                value = int(value)
+            if data['o'] != self.order:
+                raise ValueError
+            return {'value': value, 'id': int(data['i']), 'reverse': bool(data.get('r'))}
+        except (TypeError, ValueError, KeyError, binascii.Error, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, reverse=False):
+        value = getattr(row, self.field)
+        if isinstance(value, datetime.date):
+            value = value.isoformat()
+        data = {'o': self.order, 'v': value, 'i': row.pk}
+        if reverse:
+            data['r'] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer', 'nullable': True},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
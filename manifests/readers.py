@@ -0,0 +1,200 @@
+"""
+Cititoare de fisiere pentru importul personalizat.
+
+Formatul este detectat dupa primii octeti ai fisierului, nu dupa extensie:
+- PK\\x03\\x04 (arhiva ZIP)        -> .xlsx, openpyxl in modul streaming
+- D0 CF 11 E0 (document OLE2)    -> .xls vechi, xlrd
+- text (UTF-8 sau Windows-1250, fara octeti NUL sau de control, cu separator
+  sau rand nou in primii CSV_SAMPLE_SIZE octeti) -> CSV (separator ; , sau TAB
+  detectat automat). PNG, PDF, HTML etc. sunt respinse, nu importate ca randuri.
+Un .xls care e de fapt .xlsx (sau CSV) este citit direct cu cititorul potrivit,
+fara o prima incercare esuata. Fisierul e citit o singura data, dintr-un singur
+buffer; fiecare cititor produce randuri de celule, iar iter_rows le trece prin
+planul compilat al maparii (vezi mapping.py) si emite ParsedRow. Randurile fara
+nicio celula mapata (linii goale, randuri goale la finalul foii) sunt omise.
+"""
+import codecs
+import csv
+import io
+import tempfile
+from collections import namedtuple
+from os import PathLike
+
+import openpyxl
+
+
+# Rand citit din fisier: numarul randului in Excel, datele parsate si eroarea (daca exista)
+ParsedRow = namedtuple('ParsedRow', ['row_idx', 'data', 'error'])
+
+FORMAT_XLSX = 'xlsx'
+FORMAT_XLS = 'xls'
+FORMAT_CSV = 'csv'
+
+XLSX_MAGIC = b'PK\x03\x04'
+XLS_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+# Fisierele incarcate care nu pot fi repozitionate sunt copiate intr-un buffer
+# care trece pe disc peste aceasta dimensiune
+SPOOL_MAX_SIZE = 10 * 1024 * 1024
+
+# Cat text se foloseste pentru detectarea formatului, a codarii si a separatorului CSV
+CSV_SAMPLE_SIZE = 64 * 1024
+
+# Fisiere text care nu sunt CSV (HTML/XML, PDF, RTF)
+NOT_CSV_PREFIXES = ('<', '%PDF', '{\\rtf')
+
+
+class UnsupportedFormat(ValueError):
+    """Fisierul nu este .xlsx, .xls sau CSV"""
+
+
+def sniff_format(head):
+    """Formatul dupa inceputul fisierului (pana la CSV_SAMPLE_SIZE octeti), sau None daca nu e recunoscut"""
+    if head.startswith(XLSX_MAGIC):
+        return FORMAT_XLSX
+    if head.startswith(XLS_MAGIC):
+        return FORMAT_XLS
+    if _looks_like_csv(head):
+        return FORMAT_CSV
+    return None
+
+
+def _decode_sample(sample):
+    """(text, codare): UTF-8 (cu sau fara BOM), altfel Windows-1250; (None, None) daca nu e text"""
+    try:
+        # Decodor incremental: un caracter taiat la capatul esantionului nu e o eroare
+        return codecs.getincrementaldecoder('utf-8-sig')().decode(sample), 'utf-8-sig'
+    except UnicodeDecodeError:
+        pass
+    try:
+        return sample.decode('cp1250'), 'cp1250'
+    except UnicodeDecodeError:
+        return None, None
+
+
+def _looks_like_csv(sample):
+    """Text decodabil, fara caractere binare, care nu e markup/PDF si are separator sau rand nou"""
+    if not sample or b'\x00' in sample:
+        return False
+    text, _ = _decode_sample(sample)
+    if text is None or text.lstrip().startswith(NOT_CSV_PREFIXES):
+        return False
+    controls = sum(1 for char in text if char < ' ' and char not in '\t\r\n')
+    if controls > len(text) // 100:
+        return False
+    return any(char in text for char in ';,\t\n')
+
+
+def iter_rows(source, template):
+    """
+    Deschide un fisier (cale sau obiect fisier, ex: UploadedFile) si intoarce un
+    generator de ParsedRow pentru fiecare rand incepand cu template.rand_start.
+    Erorile de deschidere (format nerecunoscut, fisier corupt) sunt ridicate
+    imediat, nu la primul rand citit.
+    """
+    buffer, owned = _open_buffer(source)
+    try:
+        file_format = sniff_format(buffer.read(CSV_SAMPLE_SIZE))
+        buffer.seek(0)
+        if file_format is None:
+            raise UnsupportedFormat('Format de fișier nerecunoscut. Sunt acceptate fișiere .xlsx, .xls și CSV.')
+
+        plan = template.get_plan()
+        cells = CELL_READERS[file_format](buffer, template.rand_start, max(plan.max_col, 1))
+    except Exception:
+        if owned:
+            buffer.close()
+        raise
+    return _parse_rows(cells, plan, template.rand_start, buffer if owned else None)
+
+
+def _open_buffer(source):
+    """
+    Bufferul din care se citeste fisierul (o singura data): fisierul de pe disc,
+    fisierul incarcat daca poate fi repozitionat, altfel o copie intr-un
+    SpooledTemporaryFile. Intoarce (buffer, True daca trebuie inchis de noi).
+    """
+    if isinstance(source, (str, PathLike)):
+        return open(source, 'rb'), True
+
+    seekable = getattr(source, 'seekable', None)
+    if seekable is not None and seekable():
+        source.seek(0)
+        return source, False
+
+    buffer = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    chunks = source.chunks() if hasattr(source, 'chunks') else iter(lambda: source.read(1024 * 1024), b'')
+    for chunk in chunks:
+        buffer.write(chunk)
+    buffer.seek(0)
+    return buffer, True
+
+
+def _parse_rows(cells, plan, first_row, buffer=None):
+    try:
+        for row_idx, values in enumerate(cells, first_row):
+            try:
+                data = plan.parse(values)
+            except Exception as e:
+                yield ParsedRow(row_idx, None, str(e))
+                continue
+            # Altfel campurile manuale ar crea o intrare fara container
+            if data:
+                yield ParsedRow(row_idx, data, None)
+    finally:
+        if buffer is not None:
+            buffer.close()
+
+
+def _xlsx_cells(buffer, min_row, max_col):
+    """Randurile .xlsx in modul streaming - doar primele max_col coloane"""
+    workbook = openpyxl.load_workbook(buffer, read_only=True, data_only=True)
+
+    def cells():
+        try:
+            yield from workbook.active.iter_rows(min_row=min_row, max_col=max_col, values_only=True)
+        finally:
+            # In modul read_only fisierul ramane deschis pana la close()
+            workbook.close()
+    return cells()
+
+
+def _xls_cells(buffer, min_row, max_col):
+    """Randurile unui .xls vechi (xlrd citeste tot fisierul din memorie)"""
+    import xlrd
+
+    workbook = xlrd.open_workbook(file_contents=buffer.read())
+    sheet = workbook.sheet_by_index(0)
+    end_col = min(max_col, sheet.ncols)
+    return (sheet.row_values(row_idx, 0, end_col) for row_idx in range(min_row - 1, sheet.nrows))
+
+
+def _csv_cells(buffer, min_row, max_col):
+    """Randurile unui CSV; codarea e UTF-8 (cu sau fara BOM) sau, altfel, Windows-1250"""
+    sample = buffer.read(CSV_SAMPLE_SIZE)
+    buffer.seek(0)
+    # Esantionul a fost deja verificat de sniff_format
+    text, encoding = _decode_sample(sample)
+
+    try:
+        dialect = csv.Sniffer().sniff(text.split('\n', 1)[0], delimiters=';,\t')
+    except csv.Error:
+        dialect = csv.excel
+
+    def cells():
+        stream = io.TextIOWrapper(buffer, encoding=encoding, errors='replace', newline='')
+        try:
+            for row_idx, row in enumerate(csv.reader(stream, dialect), 1):
+                if row_idx >= min_row:
+                    yield row[:max_col]
+        finally:
+            # Bufferul ramane al apelantului
+            stream.detach()
+    return cells()
+
+
+CELL_READERS = {
+    FORMAT_XLSX: _xlsx_cells,
+    FORMAT_XLS: _xls_cells,
+    FORMAT_CSV: _csv_cells,
+}
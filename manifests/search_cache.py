@@ -0,0 +1,110 @@
+"""
+Cache pentru raspunsurile API-ului public de cautare.
+
+Rezultatele /api/manifests/search/ si /api/latest-manifest/ sunt pastrate in
+cache-ul 'search' (vezi CACHES in settings: file implicit, db sau locmem).
+Cheile contin o versiune per an si o versiune globala; orice
+scriere in ManifestEntry pentru un an incrementeaza versiunea acelui an, iar
+modificarile tabelelor de referinta (nave, tipuri container - apar in
+raspuns) incrementeaza versiunea globala. Intrarile vechi nu mai sunt
+citite si expira singure dupa SEARCH_CACHE_TIMEOUT.
+Versiunile sunt in cache-ul 'versions' (partajat intre procese, vezi
+settings), impreuna cu alte versiuni partajate (ex: anul activ, vezi
+lookups.ActiveYearProvider).
+"""
+import hashlib
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+
+
+CACHE_ALIAS = 'search'
+# Versiunile sunt intr-un cache partajat intre procese (file sau db), chiar daca
+# raspunsurile sunt in locmem: o invalidare din run_jobs ajunge la toate procesele web
+VERSION_CACHE_ALIAS = 'versions'
+_GLOBAL = 'all'
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def get_version_cache():
+    return caches[VERSION_CACHE_ALIAS]
+
+
+def _version_key(scope):
+    return f'manifests:v:{scope}'
+
+
+def _initial_version():
+    # Daca cheia de versiune a fost evacuata, noua versiune nu trebuie sa refoloseasca una veche
+    return time.time_ns()
+
+
+def get_versions(year_id):
+    """Versiunea globala si versiunea anului (se creeaza daca lipsesc)"""
+    cache = get_version_cache()
+    keys = [_version_key(_GLOBAL), _version_key(year_id)]
+    found = cache.get_many(keys)
+    return [_ensure_version(cache, key, found.get(key)) for key in keys]
+
+
+def get_version(scope):
+    """Versiunea curenta a unui domeniu (se creeaza daca lipseste)"""
+    cache = get_version_cache()
+    key = _version_key(scope)
+    return _ensure_version(cache, key, cache.get(key))
+
+
+def _ensure_version(cache, key, version):
+    if version is None:
+        version = _initial_version()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def _bump(scope):
+    cache = get_version_cache()
+    key = _version_key(scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Cheia nu exista - orice versiune noua invalideaza intrarile vechi
+        cache.set(key, _initial_version(), timeout=None)
+
+
+def bump_year_version(year_id):
+    """Invalideaza raspunsurile pentru un an, dupa commit-ul tranzactiei curente"""
+    def bump():
+        _bump(year_id)
+        # Raspunsurile fara filtru de an (year_id None) includ si anul acesta
+        _bump(None)
+    transaction.on_commit(bump)
+
+
+def bump_version(scope):
+    """Incrementeaza versiunea unui domeniu, dupa commit-ul tranzactiei curente"""
+    transaction.on_commit(lambda: _bump(scope))
+
+
+def bump_global_version():
+    """Invalideaza toate raspunsurile (ex: s-au modificat tabelele de referinta)"""
+    transaction.on_commit(lambda: _bump(_GLOBAL))
+
+
+def make_key(kind, year_id, *parts):
+    """Cheie de cache pentru un raspuns, legata de versiunile curente"""
+    global_version, year_version = get_versions(year_id)
+    digest = hashlib.md5('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f'manifests:{kind}:{year_id}:{global_version}:{year_version}:{digest}'
+
+
+def get_response(key):
+    return get_cache().get(key)
+
+
+def set_response(key, data):
+    get_cache().set(key, data)
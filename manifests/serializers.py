@@ -1,24 +1,25 @@
 from rest_framework import serializers
+from . import thumbnails
 from .models import ManifestEntry, DatabaseYear, ContainerType, Ship, Pavilion
 
 
 class DatabaseYearSerializer(serializers.ModelSerializer):
     """Serializer pentru DatabaseYear"""
-    entries_count = serializers.IntegerField(source='entries.count', read_only=True)
 
     class Meta:
         model = DatabaseYear
-        fields = ['id', 'year', 'is_active', 'entries_count', 'created_at']
-        read_only_fields = ['id', 'created_at']
+        fields = ['id', 'year', 'is_active', 'is_archived', 'entries_count', 'created_at']
+        read_only_fields = ['id', 'is_archived', 'entries_count', 'created_at']
 
 
 class PavilionSerializer(serializers.ModelSerializer):
     """Serializer pentru Pavilion"""
     imagine_url = serializers.SerializerMethodField()
+    thumb_url = serializers.SerializerMethodField()
 
     class Meta:
         model = Pavilion
-        fields = ['id', 'nume', 'nume_tara', 'imagine', 'imagine_url', 'created_at']
+        fields = ['id', 'nume', 'nume_tara', 'imagine', 'imagine_url', 'thumb_url', 'created_at']
         read_only_fields = ['id', 'created_at']
 
     def get_imagine_url(self, obj):
@@ -29,15 +30,23 @@ class PavilionSerializer(serializers.ModelSerializer):
             return obj.imagine.url
         return None
 
+    def get_thumb_url(self, obj):
+        if obj.imagine:
+            url = thumbnails.thumbnail_url(obj.imagine, 'small')
+            request = self.context.get('request')
+            return request.build_absolute_uri(url) if request else url
+        return None
+
 
 class ShipSerializer(serializers.ModelSerializer):
     """Serializer pentru Ship"""
     imagine_url = serializers.SerializerMethodField()
+    thumb_url = serializers.SerializerMethodField()
     pavilion_data = PavilionSerializer(source='pavilion', read_only=True)
 
     class Meta:
         model = Ship
-        fields = ['id', 'nume', 'linie_maritima', 'pavilion', 'pavilion_data', 'imagine', 'imagine_url', 'descriere', 'created_at']
+        fields = ['id', 'nume', 'linie_maritima', 'pavilion', 'pavilion_data', 'imagine', 'imagine_url', 'thumb_url', 'descriere', 'created_at']
         read_only_fields = ['id', 'created_at']
 
     def get_imagine_url(self, obj):
@@ -48,14 +57,22 @@ class ShipSerializer(serializers.ModelSerializer):
             return obj.imagine.url
         return None
 
+    def get_thumb_url(self, obj):
+        if obj.imagine:
+            url = thumbnails.thumbnail_url(obj.imagine, 'large')
+            request = self.context.get('request')
+            return request.build_absolute_uri(url) if request else url
+        return None
+
 
 class ContainerTypeSerializer(serializers.ModelSerializer):
     """Serializer pentru ContainerType"""
     imagine_url = serializers.SerializerMethodField()
+    thumb_url = serializers.SerializerMethodField()
 
     class Meta:
         model = ContainerType
-        fields = ['id', 'model_container', 'tip_container', 'imagine', 'imagine_url', 'descriere', 'created_at']
+        fields = ['id', 'model_container', 'tip_container', 'imagine', 'imagine_url', 'thumb_url', 'descriere', 'created_at']
         read_only_fields = ['id', 'created_at']
 
     def get_imagine_url(self, obj):
@@ -66,6 +83,13 @@ class ContainerTypeSerializer(serializers.ModelSerializer):
             return obj.imagine.url
         return None
 
+    def get_thumb_url(self, obj):
+        if obj.imagine:
+            url = thumbnails.thumbnail_url(obj.imagine, 'large')
+            request = self.context.get('request')
+            return request.build_absolute_uri(url) if request else url
+        return None
+
 
 class ManifestEntrySerializer(serializers.ModelSerializer):
     """Serializer pentru ManifestEntry API cu imagini"""
@@ -114,3 +138,117 @@ class ManifestSearchSerializer(serializers.Serializer):
     container = serializers.CharField(required=False, allow_blank=True)
     numar_manifest = serializers.CharField(required=False, allow_blank=True)
     year = serializers.IntegerField(required=False)
+
+
+class ManifestExportSerializer(serializers.Serializer):
+    """Parametrii pentru exportul in flux (vezi exports.py)"""
+    export_format = serializers.ChoiceField(choices=['csv', 'xlsx'], default='csv')
+    year = serializers.IntegerField(required=False)
+    numar_manifest = serializers.CharField(required=False, allow_blank=True)
+    nava = serializers.CharField(required=False, allow_blank=True)
+    container = serializers.CharField(required=False, allow_blank=True)
+    data_de = serializers.DateField(required=False, input_formats=['%d.%m.%Y', '%Y-%m-%d'])
+    data_pana = serializers.DateField(required=False, input_formats=['%d.%m.%Y', '%Y-%m-%d'])
+
+
+class CompactManifestEntrySerializer:
+    """
+    Serializare compacta (?compact=1) pentru listari mari de ManifestEntry.
+
+    Intrarile refera nava, pavilionul si tipul de container prin id, iar
+    obiectele de referinta apar o singura data in `included`. Randurile sunt
+    construite direct ca dict-uri (fara introspectia campurilor DRF per rand);
+    formatul valorilor este acelasi ca in ManifestEntrySerializer.
+    """
+
+    ENTRY_FIELDS = (
+        'id', 'numar_curent', 'numar_manifest', 'numar_permis', 'numar_pozitie',
+        'cerere_operatiune', 'container', 'numar_colete', 'descriere_marfa', 'tip_operatiune',
+        'nume_nava', 'pavilion_nava', 'numar_sumara', 'tip_container', 'linie_maritima', 'model_container',
+    )
+
+    _decimal = serializers.DecimalField(max_digits=12, decimal_places=2)
+    _datetime = serializers.DateTimeField()
+
+    def __init__(self, instance=None, many=False, context=None, **kwargs):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+        self._data = None
+        self._included = {'container_types': {}, 'ships': {}, 'pavilions': {}}
+
+    @property
+    def data(self):
+        if self._data is None:
+            if self.many:
+                self._data = [self.entry_to_dict(entry) for entry in self.instance]
+            else:
+                self._data = self.entry_to_dict(self.instance)
+        return self._data
+
+    @property
+    def included(self):
+        """Obiectele de referinta, dupa serializarea intrarilor"""
+        if self._data is None:
+            self.data
+        return self._included
+
+    def image_url(self, image):
+        if not image:
+            return None
+        request = self.context.get('request')
+        return request.build_absolute_uri(image.url) if request else image.url
+
+    def thumb_url(self, image, size):
+        if not image:
+            return None
+        url = thumbnails.thumbnail_url(image, size)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+    def entry_to_dict(self, entry):
+        data = {name: getattr(entry, name) for name in self.ENTRY_FIELDS}
+        data['database_year'] = entry.database_year_id
+        data['data_inregistrare'] = entry.data_inregistrare.isoformat() if entry.data_inregistrare else None
+        data['data_inregistrare_formatted'] = entry.data_inregistrare.strftime('%d.%m.%Y') if entry.data_inregistrare else None
+        data['greutate_bruta'] = self._decimal.to_representation(entry.greutate_bruta) if entry.greutate_bruta is not None else None
+        data['created_at'] = self._datetime.to_representation(entry.created_at)
+        data['updated_at'] = self._datetime.to_representation(entry.updated_at)
+        data['container_type'] = entry.container_type_rel_id
+        data['ship'] = entry.ship_rel_id
+
+        if entry.container_type_rel_id and entry.container_type_rel_id not in self._included['container_types']:
+            self.include_container_type(entry.container_type_rel)
+        if entry.ship_rel_id and entry.ship_rel_id not in self._included['ships']:
+            self.include_ship(entry.ship_rel)
+        return data
+
+    def include_container_type(self, container_type):
+        self._included['container_types'][container_type.id] = {
+            'id': container_type.id,
+            'model_container': container_type.model_container,
+            'tip_container': container_type.tip_container,
+            'imagine_url': self.image_url(container_type.imagine),
+            'thumb_url': self.thumb_url(container_type.imagine, 'large'),
+            'descriere': container_type.descriere,
+        }
+
+    def include_ship(self, ship):
+        self._included['ships'][ship.id] = {
+            'id': ship.id,
+            'nume': ship.nume,
+            'linie_maritima': ship.linie_maritima,
+            'pavilion': ship.pavilion_id,
+            'imagine_url': self.image_url(ship.imagine),
+            'thumb_url': self.thumb_url(ship.imagine, 'large'),
+            'descriere': ship.descriere,
+        }
+        if ship.pavilion_id and ship.pavilion_id not in self._included['pavilions']:
+            pavilion = ship.pavilion
+            self._included['pavilions'][pavilion.id] = {
+                'id': pavilion.id,
+                'nume': pavilion.nume,
+                'nume_tara': pavilion.nume_tara,
+                'imagine_url': self.image_url(pavilion.imagine),
+                'thumb_url': self.thumb_url(pavilion.imagine, 'small'),
+            }
@@ -0,0 +1,79 @@
+"""
+Semnale pentru aplicatia manifests.
+Conectate in ManifestsConfig.ready().
+"""
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from .models import ManifestEntry, DatabaseYear, ContainerType, Pavilion, Ship, YearSummary
+from . import counters, deletion, lookups, search_cache, summaries, thumbnails
+
+
+@receiver([post_save, post_delete], sender=DatabaseYear)
+def invalidate_year_cache(sender, **kwargs):
+    """Anul activ sau anii arhivati se pot fi schimbat - goleste cache-urile (in toate procesele)"""
+    lookups.year_cache.clear()
+    lookups.active_year_provider.invalidate()
+    lookups.archived_years_provider.invalidate()
+
+
+@receiver(pre_delete, sender=DatabaseYear)
+def update_counters_on_year_delete(sender, instance, **kwargs):
+    """Intrarile anului sunt sterse in cascada, fara semnale per rand"""
+    deletion.year_deleting(instance)
+
+
+@receiver(post_save, sender=DatabaseYear)
+def create_year_summary(sender, instance, created, **kwargs):
+    if created:
+        YearSummary.objects.get_or_create(database_year=instance)
+
+
+@receiver([post_save, post_delete], sender=ContainerType)
+def invalidate_container_type_cache(sender, **kwargs):
+    lookups.container_type_cache.clear()
+    search_cache.bump_global_version()
+
+
+@receiver([post_save, post_delete], sender=Pavilion)
+def invalidate_pavilion_cache(sender, **kwargs):
+    lookups.pavilion_cache.clear()
+    search_cache.bump_global_version()
+
+
+@receiver([post_save, post_delete], sender=Ship)
+def invalidate_ship_cache(sender, **kwargs):
+    lookups.ship_cache.clear()
+    search_cache.bump_global_version()
+
+
+@receiver(post_save, sender=ContainerType)
+@receiver(post_save, sender=Pavilion)
+@receiver(post_save, sender=Ship)
+def generate_thumbnails(sender, instance, **kwargs):
+    """Miniaturile imaginii incarcate (cele existente nu sunt regenerate)"""
+    thumbnails.generate_all(instance.imagine)
+
+
+# Fara receivere post_delete pe ManifestEntry (ar dezactiva fast-delete) - vezi deletion.py
+@receiver(post_save, sender=ManifestEntry)
+def invalidate_search_cache(sender, instance, **kwargs):
+    """Raspunsurile API din cache pentru anul intrarii nu mai sunt valide"""
+    search_cache.bump_year_version(instance.database_year_id)
+
+
+# Inainte de contoare: counters.instance_saved inlocuieste instantaneul relatiilor vechi
+@receiver(post_save, sender=ManifestEntry)
+def update_summary_on_save(sender, instance, created, **kwargs):
+    summaries.entry_saved(instance, created)
+
+
+@receiver(post_save, sender=ManifestEntry)
+@receiver(post_save, sender=Ship)
+def update_counters_on_save(sender, instance, created, **kwargs):
+    counters.instance_saved(instance, created)
+
+
+@receiver(post_delete, sender=Ship)
+def update_counters_on_delete(sender, instance, **kwargs):
+    counters.instance_deleted(instance)
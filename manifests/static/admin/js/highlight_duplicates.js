@@ -1,4 +1,4 @@
-// Evidențiază containerele duplicate cu galben și containerele cu observații cu roșu în tabelul admin
+// Evidențiază containerele duplicate (marcate de server) cu galben și containerele cu observații cu roșu în tabelul admin
 (function() {
     'use strict';
 
@@ -33,35 +33,8 @@
             return;
         }
 
-        // Colectează toate valorile din coloana Container
+        // Numărul de duplicate vine de la server (atributul data-duplicate-count), nu se mai recalculează din DOM
         const rows = table.querySelectorAll('tbody tr');
-        const containerValues = [];
-        const containerCells = [];
-
-        rows.forEach(function(row) {
-            const cells = row.querySelectorAll('td');
-            if (cells.length > containerColumnIndex) {
-                const cell = cells[containerColumnIndex];
-                const value = cell.textContent.trim();
-
-                if (value) {
-                    containerValues.push(value);
-                    containerCells.push(cell);
-                }
-            }
-        });
-
-        // Găsește valorile duplicate
-        const valueCounts = {};
-        containerValues.forEach(function(value) {
-            valueCounts[value] = (valueCounts[value] || 0) + 1;
-        });
-
-        // Găsește care sunt duplicate
-        const duplicates = Object.keys(valueCounts).filter(function(value) {
-            return valueCounts[value] > 1;
-        });
-
 
         // Evidențiază celulele cu valori duplicate și celulele cu observații
         let highlightedCount = 0;
@@ -72,7 +45,8 @@
             if (cells.length <= containerColumnIndex) return;
 
             const containerCell = cells[containerColumnIndex];
-            const value = containerCell.textContent.trim();
+            const duplicateSpan = containerCell.querySelector('span[data-duplicate-count]');
+            const duplicateCount = duplicateSpan ? parseInt(duplicateSpan.getAttribute('data-duplicate-count'), 10) : 0;
 
             // Resetează stilul anterior
             containerCell.style.backgroundColor = '';
@@ -101,11 +75,11 @@
                 containerCell.style.borderLeft = 'none';
                 containerCell.setAttribute('title', 'Container cu observații');
                 observationsCount++;
-            } else if (valueCounts[value] > 1) {
+            } else if (duplicateCount > 1) {
                 containerCell.classList.add('duplicate-container');
                 containerCell.style.backgroundColor = '#fff3cd';  // Galben deschis
                 containerCell.style.borderLeft = 'none';
-                containerCell.setAttribute('title', 'Container duplicat (apare de ' + valueCounts[value] + ' ori)');
+                containerCell.setAttribute('title', 'Container duplicat (apare de ' + duplicateCount + ' ori)');
                 highlightedCount++;
             }
         });
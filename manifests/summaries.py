@@ -0,0 +1,82 @@
+"""
+Rezumatul per an (YearSummary) servit de /api/latest-manifest/.
+
+In loc de un ORDER BY peste intrarile anului la fiecare incarcare a
+aplicatiei, ultimul manifest (dupa data_inregistrare, apoi numar_manifest)
+este pastrat in YearSummary si actualizat in aceeasi tranzactie cu scrierea:
+- intrare noua -> un UPDATE conditionat (doar daca e mai recenta)
+- intrare modificata -> recalculare (un query pe indexul an + data)
+- intrari sterse -> recalculare o data per an afectat (vezi deletion.py)
+- importuri in masa -> recalculare o data la final, cu last_import_at
+Rezumatul e creat odata cu anul (vezi signals.py); daca lipseste, get() il calculeaza.
+"""
+from django.db.models import Q
+from django.utils import timezone
+
+from . import archive
+from .models import YearSummary
+
+
+def refresh(year_id, imported=False, create=True):
+    """
+    Recalculeaza rezumatul anului; imported=True marcheaza si momentul importului.
+    create=False: doar actualizeaza un rezumat existent (ex: la stergerea in
+    cascada a unui an, rezumatul nu trebuie recreat).
+    """
+    if not year_id:
+        return
+    latest = archive.entries_for_year(year_id).filter(
+        data_inregistrare__isnull=False
+    ).order_by('-data_inregistrare', '-numar_manifest').values(
+        'numar_manifest', 'data_inregistrare', 'nume_nava'
+    ).first() or {}
+
+    values = {
+        'latest_numar_manifest': latest.get('numar_manifest', ''),
+        'latest_data_inregistrare': latest.get('data_inregistrare'),
+        'latest_nume_nava': latest.get('nume_nava') or '',
+    }
+    if imported:
+        values['last_import_at'] = timezone.now()
+    if create:
+        YearSummary.objects.update_or_create(database_year_id=year_id, defaults=values)
+    else:
+        YearSummary.objects.filter(database_year_id=year_id).update(updated_at=timezone.now(), **values)
+
+
+def entry_created(entry):
+    """Intrare noua: devine ultimul manifest daca e mai recenta decat cel curent"""
+    date = entry.data_inregistrare
+    if not entry.database_year_id or date is None:
+        return
+    newer = (
+        Q(latest_data_inregistrare__isnull=True)
+        | Q(latest_data_inregistrare__lt=date)
+        | Q(latest_data_inregistrare=date, latest_numar_manifest__lt=entry.numar_manifest)
+    )
+    YearSummary.objects.filter(newer, database_year_id=entry.database_year_id).update(
+        latest_numar_manifest=entry.numar_manifest,
+        latest_data_inregistrare=date,
+        latest_nume_nava=entry.nume_nava or '',
+        updated_at=timezone.now(),
+    )
+
+
+def entry_saved(entry, created):
+    if created:
+        entry_created(entry)
+        return
+    # Intrarea modificata poate sa fi fost ultimul manifest - si poate sa fi schimbat anul
+    old = getattr(entry, '_counter_snapshot', None) or {}
+    refresh(entry.database_year_id)
+    if old.get('database_year_id') not in (None, entry.database_year_id):
+        refresh(old['database_year_id'])
+
+
+def get(year_id):
+    """Rezumatul anului (creat la nevoie), cu anul incarcat"""
+    summary = YearSummary.objects.select_related('database_year').filter(database_year_id=year_id).first()
+    if summary is None:
+        refresh(year_id)
+        summary = YearSummary.objects.select_related('database_year').get(database_year_id=year_id)
+    return summary
@@ -1,3 +1,906 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import os
+import socket
+import subprocess
+import tempfile
+import zipfile
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import openpyxl
+import tablib
+import xlwt
+from PIL import Image
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from import_export.results import RowResult
+
+from . import (
+    archive, batch_import, benchmarks, counters, deletion, exports, instrumentation, jobs, lookups, mapping, readers,
+    search_cache, thumbnails,
+)
+from .admin import ManifestEntryResource
+from .containers import container_search_q
+from .importer import BulkImporter
+from .models import (
+    ContainerType, DatabaseYear, ImportTemplate, Job, ManifestEntry, ManifestEntryArchive, Pavilion, Ship,
+    RequestTiming, YearSequence, YearSummary,
+)
+
+
+class CacheResetMixin:
+    """Cache-ul de cautare (file/db) si cache-urile de referinta supravietuiesc intre teste"""
+
+    def setUp(self):
+        super().setUp()
+        search_cache.get_cache().clear()
+        search_cache.get_version_cache().clear()
+        lookups.clear_lookup_caches()
+
+
+def counter_values():
+    """Toate contoarele denormalizate, pentru comparatie cu counters.rebuild()"""
+    return {
+        'years': dict(DatabaseYear.objects.values_list('year', 'entries_count')),
+        'ships': dict(Ship.objects.values_list('nume', 'entries_count')),
+        'container_types': dict(ContainerType.objects.values_list('model_container', 'entries_count')),
+        'pavilions': dict(Pavilion.objects.values_list('nume', 'ships_count')),
+    }
+
+
+def entry_rows(count, start=0, **fields):
+    """Randuri pentru BulkImporter.run"""
+    return [
+        {'numar_manifest': str(100 + i), 'container': 'MSCU%07d' % i, 'tip_container': '45G1', **fields}
+        for i in range(start, start + count)
+    ]
+
+
+class BenchmarkSmokeTest(CacheResetMixin, TestCase):
+    """Comanda benchmark ruleaza cap-coada pe un manifest mic si scrie un raport valid"""
+
+    def test_benchmark_report(self):
+        active = DatabaseYear.objects.create(year=2025, is_active=True)
+        closed = DatabaseYear.objects.create(year=2023)
+        archive.archive_year(closed)
+        ship = Ship.objects.create(nume=benchmarks.SHIP_NAMES[0])
+        before = counter_values()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'bench.json')
+            call_command(
+                'benchmark', rows=[20], formats=['xlsx', 'xls'], repeat=1,
+                no_memory=True, use_current_db=True, output=output, verbosity=0,
+            )
+            with open(output, encoding='utf-8') as f:
+                report = json.load(f)
+
+            # Comparatia cu el insusi nu trebuie sa esueze
+            call_command('benchmark', rows=[20], formats=['xlsx'], repeat=1, no_memory=True,
+                         use_current_db=True, compare=output, output=os.path.join(tmp, 'second.json'), verbosity=0)
+
+        names = {(result['name'], result['format']) for result in report['results'] if not result.get('skipped')}
+        self.assertEqual(names, {
+            (name, file_format)
+            for name in ('custom_import_parse', 'custom_import_confirm', 'resource_import', 'sync_lookup_tables',
+                         'search_api_cold', 'search_api_cached', 'admin_changelist')
+            for file_format in ('xlsx', 'xls')
+        })
+        for result in report['results']:
+            if result.get('skipped'):
+                continue
+            self.assertGreaterEqual(result['seconds'], 0)
+            self.assertGreater(result['queries'], 0)
+        self.assertEqual(report['environment']['database'], 'sqlite')
+
+        # Baza de date curenta ramane cum era: fara date sintetice, acelasi an activ
+        self.assertEqual(
+            list(DatabaseYear.objects.order_by('year').values_list('year', 'is_active', 'is_archived')),
+            [(2023, False, True), (2025, True, False)],
+        )
+        self.assertEqual(lookups.resolve_active_year_id(), active.pk)
+        self.assertFalse(ManifestEntry.objects.exists())
+        self.assertTrue(Ship.objects.filter(pk=ship.pk).exists())
+        self.assertEqual(counter_values(), before)
+        self.assertFalse(User.objects.filter(username='benchmark').exists())
+        self.assertFalse(ImportTemplate.objects.exists())
+        self.assertFalse(Job.objects.exists())
+
+    def test_failed_run_restores_database(self):
+        active = DatabaseYear.objects.create(year=2025, is_active=True)
+        runner = benchmarks.Runner(sizes=[5], formats=['xlsx'], repeat=1, track_memory=False)
+
+        with mock.patch.object(runner, 'record', side_effect=RuntimeError('oprit')):
+            with self.assertRaises(RuntimeError):
+                runner.run()
+
+        self.assertEqual(list(DatabaseYear.objects.values_list('pk', 'is_active')), [(active.pk, True)])
+        self.assertEqual(lookups.resolve_active_year_id(), active.pk)
+        self.assertFalse(User.objects.filter(username='benchmark').exists())
+
+
+class YearSequenceTest(CacheResetMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.year = DatabaseYear.objects.create(year=2025, is_active=True)
+
+    def test_reserve_returns_consecutive_ranges(self):
+        self.assertEqual(list(YearSequence.reserve(self.year, 3)), [1, 2, 3])
+        self.assertEqual(list(YearSequence.reserve(self.year.pk, 2)), [4, 5])
+        self.assertEqual(YearSequence.objects.get(database_year=self.year).last_value, 5)
+
+    def test_new_sequence_continues_after_existing_entries(self):
+        ManifestEntry.objects.create(database_year=self.year, numar_manifest='1', container='MSCU1234565', numar_curent=41)
+        other = DatabaseYear.objects.create(year=2024)
+
+        self.assertEqual(list(YearSequence.reserve(self.year)), [42])
+        self.assertEqual(list(YearSequence.reserve(other)), [1])
+
+
+class BulkImporterTest(CacheResetMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.year = DatabaseYear.objects.create(year=2025, is_active=True)
+
+    def test_counters_and_summary(self):
+        rows = entry_rows(3, nume_nava='ALPHA', pavilion_nava='PANAMA', data_inregistrare=datetime.date(2025, 3, 1))
+        rows += entry_rows(2, start=3, nume_nava='BETA', pavilion_nava='PANAMA', data_inregistrare=datetime.date(2025, 3, 2))
+
+        created = BulkImporter(self.year, batch_size=2).run(rows)
+
+        self.assertEqual(created, 5)
+        self.assertEqual(
+            list(ManifestEntry.objects.order_by('numar_curent').values_list('numar_curent', flat=True)),
+            [1, 2, 3, 4, 5],
+        )
+        values = counter_values()
+        self.assertEqual(values['years'][2025], 5)
+        self.assertEqual(values['ships'], {'ALPHA': 3, 'BETA': 2})
+        self.assertEqual(values['container_types'], {'MSCU45G1': 5})
+        self.assertEqual(values['pavilions'], {'PANAMA': 2})
+        counters.rebuild()
+        self.assertEqual(counter_values(), values)
+
+        summary = YearSummary.objects.get(database_year=self.year)
+        self.assertEqual(summary.latest_numar_manifest, '104')
+        self.assertEqual(summary.latest_data_inregistrare, datetime.date(2025, 3, 2))
+        self.assertEqual(summary.latest_nume_nava, 'BETA')
+        self.assertIsNotNone(summary.last_import_at)
+
+    def test_second_import_continues_numbering(self):
+        BulkImporter(self.year).run(entry_rows(2))
+        BulkImporter(self.year).run(entry_rows(2, start=2))
+
+        self.assertEqual(
+            list(ManifestEntry.objects.order_by('numar_curent').values_list('numar_curent', flat=True)),
+            [1, 2, 3, 4],
+        )
+
+    def test_delete_updates_counters_and_summary(self):
+        BulkImporter(self.year).run(
+            entry_rows(4, nume_nava='ALPHA', data_inregistrare=datetime.date(2025, 3, 1))
+            + entry_rows(1, start=4, nume_nava='BETA', data_inregistrare=datetime.date(2025, 3, 9))
+        )
+
+        deletion.delete_entries(ManifestEntry.objects.filter(nume_nava='BETA'))
+        ManifestEntry.objects.filter(nume_nava='ALPHA').first().delete()
+
+        values = counter_values()
+        self.assertEqual(values['years'][2025], 3)
+        self.assertEqual(values['ships'], {'ALPHA': 3, 'BETA': 0})
+        counters.rebuild()
+        self.assertEqual(counter_values(), values)
+        self.assertEqual(YearSummary.objects.get(database_year=self.year).latest_data_inregistrare, datetime.date(2025, 3, 1))
+
+        self.year.delete()
+        self.assertEqual(counter_values()['ships'], {'ALPHA': 0, 'BETA': 0})
+
+
+class ContainerSearchTest(CacheResetMixin, TestCase):
+    CONTAINERS = ['MSCU1234565', 'MSCU1234566', 'MSCU12345657', 'MSCU7654321', 'TGHU1234565']
+
+    def setUp(self):
+        super().setUp()
+        year = DatabaseYear.objects.create(year=2025, is_active=True)
+        for container in self.CONTAINERS:
+            ManifestEntry.objects.create(database_year=year, numar_manifest='1', container=container)
+
+    def search(self, query):
+        return sorted(ManifestEntry.objects.filter(container_search_q(query)).values_list('container', flat=True))
+
+    def test_full_code_is_exact(self):
+        self.assertEqual(self.search('MSCU1234565'), ['MSCU1234565'])
+        self.assertEqual(self.search('mscu 123456-5'), ['MSCU1234565'])
+
+    def test_owner_prefix(self):
+        self.assertEqual(self.search('MSCU123456'), ['MSCU1234565', 'MSCU12345657', 'MSCU1234566'])
+
+    def test_digits_prefix(self):
+        self.assertEqual(self.search('1234565'), ['MSCU1234565', 'MSCU12345657', 'TGHU1234565'])
+
+    def test_partial_letters(self):
+        self.assertEqual(self.search('CU1234565'), ['MSCU1234565', 'MSCU12345657'])
+
+    def test_unsupported_text(self):
+        self.assertIsNone(container_search_q('MSCU-12A'))
+
+
+class ApiTestMixin(CacheResetMixin):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('operator', password='parola')
+        self.client.force_login(self.user)
+
+    def get(self, url, **params):
+        response = self.client.get(url, params, secure=True)
+        self.assertEqual(response.status_code, 200, response.content[:300])
+        return response.json()
+
+
+class KeysetPaginationTest(ApiTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        year = DatabaseYear.objects.create(year=2025, is_active=True)
+        dates = [datetime.date(2025, 1, 5), None, datetime.date(2025, 1, 7), datetime.date(2025, 1, 5), None, datetime.date(2025, 1, 1)]
+        self.entries = [
+            ManifestEntry.objects.create(
+                database_year=year, numar_manifest=str(i), container='MSCU%07d' % i,
+                data_inregistrare=date, numar_curent=len(dates) - i,
+            )
+            for i, date in enumerate(dates)
+        ]
+
+    def walk(self, order):
+        """Toate paginile inainte, apoi inapoi de la ultima pagina"""
+        pages = []
+        data = self.get('/api/manifests/', pagination='cursor', order=order, page_size=2)
+        pages.append([row['id'] for row in data['results']])
+        while data['next']:
+            data = self.get(data['next'])
+            pages.append([row['id'] for row in data['results']])
+
+        backwards = [pages[-1]]
+        while data['previous']:
+            data = self.get(data['previous'])
+            backwards.append([row['id'] for row in data['results']])
+        return pages, backwards[::-1]
+
+    def test_date_order_puts_nulls_last(self):
+        def key(entry):
+            # Data descrescator, fara data la final, apoi id descrescator
+            return (entry.data_inregistrare is None, -(entry.data_inregistrare or datetime.date.min).toordinal(), -entry.pk)
+
+        expected = [entry.pk for entry in sorted(self.entries, key=key)]
+        pages, backwards = self.walk('data')
+
+        self.assertEqual(sum(pages, []), expected)
+        self.assertEqual(backwards, pages)
+
+    def test_number_order(self):
+        expected = [entry.pk for entry in sorted(self.entries, key=lambda entry: entry.numar_curent)]
+        pages, backwards = self.walk('numar')
+
+        self.assertEqual(sum(pages, []), expected)
+        self.assertEqual(backwards, pages)
+
+
+class ArchiveTest(ApiTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.active = DatabaseYear.objects.create(year=2025, is_active=True)
+        self.closed = DatabaseYear.objects.create(year=2023)
+        BulkImporter(self.closed).run(entry_rows(3, nume_nava='ALPHA', data_inregistrare=datetime.date(2023, 5, 1)))
+        self.ids = set(ManifestEntry.objects.values_list('pk', flat=True))
+
+    def test_archive_and_restore(self):
+        before = counter_values()
+
+        self.assertEqual(archive.archive_year(self.closed, batch_size=2), 3)
+
+        self.closed.refresh_from_db()
+        self.assertTrue(self.closed.is_archived)
+        self.assertFalse(ManifestEntry.objects.exists())
+        self.assertEqual(set(ManifestEntryArchive.objects.values_list('pk', flat=True)), self.ids)
+        self.assertIs(archive.entry_model(self.closed.pk), ManifestEntryArchive)
+        self.assertEqual(archive.entries_for_year(self.closed.pk).count(), 3)
+        self.assertEqual(counter_values(), before)
+        counters.rebuild()
+        self.assertEqual(counter_values(), before)
+
+        data = self.get('/api/manifests/search/', container='MSCU0000001', year=2023)
+        self.assertEqual([row['container'] for row in data['results']], ['MSCU0000001'])
+        self.assertEqual(YearSummary.objects.get(database_year=self.closed).latest_data_inregistrare, datetime.date(2023, 5, 1))
+
+        self.assertEqual(archive.restore_year(self.closed), 3)
+        self.closed.refresh_from_db()
+        self.assertFalse(self.closed.is_archived)
+        self.assertEqual(set(ManifestEntry.objects.values_list('pk', flat=True)), self.ids)
+        self.assertFalse(ManifestEntryArchive.objects.exists())
+
+    def test_archived_year_rejects_new_entries(self):
+        archive.archive_year(self.closed)
+        resource = ManifestEntryResource()
+
+        with self.assertRaises(archive.ArchiveError):
+            BulkImporter(self.closed).run(entry_rows(1, start=10))
+        with self.assertRaises(archive.ArchiveError):
+            ManifestEntry.objects.create(database_year=self.closed, numar_manifest='1', container='MSCU7654321')
+        with self.assertRaises(ValidationError):
+            ManifestEntry(database_year=self.closed, numar_manifest='1', container='MSCU7654321').full_clean()
+        resource.before_import(None)
+        with self.assertRaises(archive.ArchiveError):
+            resource.before_save_instance(ManifestEntry(database_year=self.closed, container='MSCU7654321'), {})
+        self.assertFalse(ManifestEntry.objects.exists())
+
+    def test_fallback_year_skips_archived_years(self):
+        archive.archive_year(self.closed)
+        DatabaseYear.objects.filter(pk=self.active.pk).update(is_active=False)
+        DatabaseYear.objects.create(year=2026, is_archived=True)
+        lookups.clear_lookup_caches()
+
+        self.assertEqual(lookups.resolve_active_year_id(), self.active.pk)
+
+    def test_active_year_cannot_be_archived(self):
+        with self.assertRaises(archive.ArchiveError):
+            archive.archive_year(self.active)
+
+
+class CacheInvalidationTest(ApiTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.year = DatabaseYear.objects.create(year=2025, is_active=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            BulkImporter(self.year).run(entry_rows(1, data_inregistrare=datetime.date(2025, 1, 1)))
+
+    def search(self):
+        return [row['container'] for row in self.get('/api/manifests/search/', container='0000001')['results']]
+
+    def test_import_invalidates_search(self):
+        self.assertEqual(self.search(), [])
+        self.assertEqual(self.search(), [])  # din cache
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BulkImporter(self.year).run(entry_rows(1, start=1))
+
+        self.assertEqual(self.search(), ['MSCU0000001'])
+
+    def test_import_invalidates_latest_manifest(self):
+        first = self.client.get('/api/latest-manifest/', secure=True)
+        self.assertEqual(first.json()['entries_count'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BulkImporter(self.year).run(entry_rows(1, start=1, data_inregistrare=datetime.date(2025, 2, 1)))
+
+        second = self.client.get('/api/latest-manifest/', secure=True, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json()['entries_count'], 2)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+
+    def test_delete_invalidates_search(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            BulkImporter(self.year).run(entry_rows(1, start=1))
+        self.assertEqual(self.search(), ['MSCU0000001'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            deletion.delete_entries(ManifestEntry.objects.filter(container='MSCU0000001'))
+
+        self.assertEqual(self.search(), [])
+
+
+class JobsTest(CacheResetMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.year = DatabaseYear.objects.create(year=2025, is_active=True)
+
+    def test_claim_next_takes_oldest_pending_once(self):
+        first = jobs.enqueue('sync_lookup_tables')
+        second = jobs.enqueue('sync_lookup_tables')
+
+        claimed = jobs.claim_next()
+        self.assertEqual(claimed.pk, first.pk)
+        self.assertEqual(claimed.status, Job.STATUS_RUNNING)
+        self.assertEqual(claimed.worker, jobs.worker_id())
+        self.assertEqual(jobs.claim_next().pk, second.pk)
+        self.assertIsNone(jobs.claim_next())
+
+    def test_run_job_records_failure(self):
+        jobs.enqueue('custom_import', staged_id=0)
+
+        with self.assertLogs('manifests.jobs', 'ERROR'):
+            job = jobs.run_job(jobs.claim_next())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertIn('Importul pregătit nu mai există', job.message)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_fail_stale_jobs_checks_local_worker(self):
+        old = timezone.now() - jobs.STALE_AFTER * 2
+        host = socket.gethostname()
+        dead_pid = self.finished_pid()
+        running = [
+            Job.objects.create(kind='custom_import', status=Job.STATUS_RUNNING, worker=worker)
+            for worker in (f'{host}:{os.getpid()}', f'{host}:{dead_pid}', 'alt-server:1', 'alt-server:2')
+        ]
+        Job.objects.filter(pk__in=[running[0].pk, running[2].pk]).update(updated_at=old)
+
+        self.assertEqual(jobs.fail_stale_jobs(), 2)
+
+        statuses = [Job.objects.get(pk=job.pk).status for job in running]
+        # Workerul local in viata nu e atins, oricat de vechi ar fi updated_at (SQLite)
+        self.assertEqual(statuses, [Job.STATUS_RUNNING, Job.STATUS_FAILED, Job.STATUS_FAILED, Job.STATUS_RUNNING])
+
+    def finished_pid(self):
+        process = subprocess.Popen(['true'])
+        process.wait()
+        return process.pid
+
+    def test_resource_import_rolls_back_validation_errors(self):
+        model_admin = admin.site.get_model_admin(ManifestEntry)
+        storage = model_admin.get_tmp_storage_class()(encoding='utf-8-sig', read_mode='r')
+        storage.save((
+            'numar manifest,numar pozitie,container,data inregistrare\n'
+            '1,1,MSCU1234565,01.03.2025\n'
+            '1,2,MSCU1234566,nu e data\n'
+        ).encode())
+        jobs.enqueue('resource_import', import_file_name=storage.name, original_file_name='manifest.csv', format=0)
+
+        with self.assertLogs('manifests.jobs', 'ERROR'):
+            job = jobs.run_job(jobs.claim_next())
+
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertIn('Rând 2', job.message)
+        self.assertFalse(ManifestEntry.objects.exists())
+        self.assertFalse(os.path.exists(storage.get_full_path()))
+
+
+class ReadersTest(TestCase):
+    def setUp(self):
+        self.template = ImportTemplate.objects.create(
+            nume='CSV', rand_start=2, mapare_coloane={'container': 'A', 'numar_colete': 'B', 'descriere_marfa': 'C'},
+        )
+
+    def test_sniff_format(self):
+        self.assertEqual(readers.sniff_format(b'PK\x03\x04rest'), readers.FORMAT_XLSX)
+        self.assertEqual(readers.sniff_format(readers.XLS_MAGIC + b'rest'), readers.FORMAT_XLS)
+        self.assertEqual(readers.sniff_format('\ufeffcontainer;colete\n'.encode('utf-8')), readers.FORMAT_CSV)
+        self.assertEqual(readers.sniff_format('container;descriere\nMSCU1;Ţesături\n'.encode('cp1250')), readers.FORMAT_CSV)
+        for content in (b'\x89PNG\r\n\x1a\n\x00\x00', b'%PDF-1.7\n1 0 obj', b'  <html><body>a,b</body></html>', b'fara separator', b''):
+            self.assertIsNone(readers.sniff_format(content), content)
+
+    def test_csv_rows_and_encoding(self):
+        content = 'container;colete;descriere\nMSCU1234565;3;Ţesături\n\nMSCU1234566;x;Oţel\n;;\n\n'.encode('cp1250')
+
+        rows = list(readers.iter_rows(io.BytesIO(content), self.template))
+
+        # Liniile goale (inclusiv cele de la final) nu devin intrari
+        self.assertEqual(rows, [
+            readers.ParsedRow(2, {'container': 'MSCU1234565', 'numar_colete': 3, 'descriere_marfa': 'Ţesături'}, None),
+            readers.ParsedRow(4, {'container': 'MSCU1234566', 'descriere_marfa': 'Oţel'}, None),
+        ])
+
+    def test_xls_rows(self):
+        workbook = xlwt.Workbook()
+        sheet = workbook.add_sheet('Manifest')
+        for row_idx, row in enumerate([['container', 'colete', 'descriere'], ['MSCU1234565', 3, 'Ţesături'], [], ['MSCU1234566', 4.0, '']]):
+            for col, value in enumerate(row):
+                sheet.write(row_idx, col, value)
+        content = io.BytesIO()
+        workbook.save(content)
+        content.seek(0)
+
+        self.assertEqual(readers.sniff_format(content.getvalue()), readers.FORMAT_XLS)
+        self.assertEqual(list(readers.iter_rows(content, self.template)), [
+            readers.ParsedRow(2, {'container': 'MSCU1234565', 'numar_colete': 3, 'descriere_marfa': 'Ţesături'}, None),
+            readers.ParsedRow(4, {'container': 'MSCU1234566', 'numar_colete': 4}, None),
+        ])
+
+    def test_unsupported_file(self):
+        with self.assertRaises(readers.UnsupportedFormat):
+            readers.iter_rows(io.BytesIO(b'<?xml version="1.0"?><a/>'), self.template)
+
+
+class ColumnPlanTest(TestCase):
+    def test_parse_converts_and_skips_manual_fields(self):
+        plan = mapping.ColumnPlan({
+            'container': 'B', 'numar_colete': 'C', 'greutate_bruta': 'D', 'tip_operatiune': 'E',
+            'numar_manifest': 'A', 'descriere_marfa': 'AA', 'linie_maritima': '',
+        })
+
+        self.assertEqual(plan.max_col, 27)
+        self.assertEqual(plan.parse(['M1', ' MSCU1234565 ', '12.0', '1234,5', 'imp']), {
+            'container': 'MSCU1234565', 'numar_colete': 12, 'greutate_bruta': Decimal('1234.5'), 'tip_operatiune': 'I',
+        })
+        # Celulele goale sau neconvertibile sunt ignorate
+        self.assertEqual(plan.parse([None, '', 'multe', None, 'T']), {'tip_operatiune': 'T'})
+        self.assertEqual(plan.parse([]), {})
+
+    def test_invalid_tip_operatiune_rejects_row(self):
+        plan = mapping.ColumnPlan({'tip_operatiune': 'A'})
+
+        with self.assertRaises(mapping.InvalidCellValue):
+            plan.parse(['EXP'])
+
+    def test_excel_col_to_index(self):
+        self.assertEqual([mapping.excel_col_to_index(col) for col in ('A', 'z', 'AA', 'AZ', ' BA ')], [1, 26, 27, 52, 53])
+
+    def test_plan_is_cached_until_template_changes(self):
+        template = ImportTemplate.objects.create(nume='Plan', mapare_coloane={'container': 'A'})
+        plan = template.get_plan()
+        self.assertIs(template.get_plan(), plan)
+
+        template.mapare_coloane = {'container': 'B'}
+        template.save()
+
+        self.assertEqual(template.get_plan().parse(['x', 'MSCU1234565']), {'container': 'MSCU1234565'})
+
+
+class BatchImportTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.template = batch_import.ParseTemplate(
+            ImportTemplate.objects.create(nume='Lot', rand_start=2, mapare_coloane={'container': 'A'})
+        )
+
+    def zip_upload(self, members, name='lot.zip'):
+        content = io.BytesIO()
+        with zipfile.ZipFile(content, 'w') as archive:
+            for member, data in members.items():
+                archive.writestr(member, data)
+        return SimpleUploadedFile(name, content.getvalue())
+
+    def csv_file(self, name, containers):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('container\n' + ''.join(f'{container}\n' for container in containers))
+        return {'name': name, 'path': path, 'manual_fields': {'numar_manifest': name}}
+
+    def test_extract_zip(self):
+        upload = self.zip_upload({
+            '../../etc/2025-001.csv': 'container\nMSCU1234565\n',
+            'sub/2025-002.csv': 'container\nMSCU1234566\n',
+            'manifeste.csv': 'fisier;numar_manifest;nume_nava\n2025-002.csv;M-2;ALPHA\n',
+            '__MACOSX/._2025-001.csv': 'x',
+            'note.txt': 'x',
+        })
+
+        files = batch_import.save_upload(self.tmp.name, upload, {'nume_nava': 'BETA'})
+
+        self.assertEqual([file['name'] for file in files], ['lot.zip/2025-001.csv', 'lot.zip/2025-002.csv'])
+        # Caile din arhiva sunt ignorate - fisierele raman in directorul lotului
+        self.assertEqual({os.path.dirname(file['path']) for file in files}, {self.tmp.name})
+        self.assertEqual(files[0]['manual_fields'], {'nume_nava': 'BETA', 'numar_manifest': '2025-001'})
+        self.assertEqual(files[1]['manual_fields'], {'nume_nava': 'ALPHA', 'numar_manifest': 'M-2'})
+
+    @override_settings(IMPORT_ZIP_MAX_FILES=2, IMPORT_ZIP_MAX_SIZE=1024 * 1024)
+    def test_extract_zip_limits(self):
+        too_many = self.zip_upload({f'{i}.csv': 'container\n' for i in range(3)})
+        too_large = self.zip_upload({'mare.csv': 'container\n' + 'MSCU1234565\n' * 100000})
+
+        for upload in (too_many, too_large):
+            with self.assertRaises(batch_import.BatchError):
+                batch_import.save_upload(self.tmp.name, upload, {})
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    @override_settings(IMPORT_WORKERS=2)
+    def test_iter_parsed_keeps_file_order(self):
+        files = [self.csv_file(f'{i}.csv', ['MSCU%07d' % j for j in range(i + 1)]) for i in range(4)]
+
+        results = list(batch_import.iter_parsed(files, self.template))
+
+        self.assertEqual([result['name'] for result in results], ['0.csv', '1.csv', '2.csv', '3.csv'])
+        self.assertEqual([len(result['rows']) for result in results], [1, 2, 3, 4])
+        self.assertEqual(results[3]['rows'][0], {'container': 'MSCU0000000', 'numar_manifest': '3.csv', 'numar_permis': '', 'cerere_operatiune': ''})
+
+    @override_settings(IMPORT_WORKERS=2)
+    def test_iter_parsed_falls_back_to_current_process(self):
+        files = [self.csv_file('a.csv', ['MSCU1234565']), self.csv_file('b.csv', [])]
+
+        with mock.patch.object(batch_import, 'ProcessPoolExecutor', side_effect=OSError):
+            results = list(batch_import.iter_parsed(files, self.template))
+
+        self.assertEqual([(result['name'], len(result['rows'])) for result in results], [('a.csv', 1), ('b.csv', 0)])
+
+
+class ManifestEntryResourceTest(CacheResetMixin, TestCase):
+    HEADERS = ['numar manifest', 'numar pozitie', 'container', 'nume nava', 'tip container']
+
+    def setUp(self):
+        super().setUp()
+        self.year = DatabaseYear.objects.create(year=2025, is_active=True)
+
+    def import_rows(self, rows):
+        dataset = tablib.Dataset(*rows, headers=self.HEADERS)
+        result = ManifestEntryResource().import_data(dataset)
+        self.assertFalse(result.has_errors() or result.has_validation_errors())
+        return result
+
+    def test_creates_with_one_number_block(self):
+        reserve = YearSequence.reserve
+        with mock.patch.object(YearSequence, 'reserve', side_effect=reserve) as reserved:
+            result = self.import_rows([
+                ['M1', '1', 'MSCU0000001', 'ALPHA', '45G1'],
+                ['M1', '2', 'MSCU0000002', 'ALPHA', '45G1'],
+                ['M1', '3', 'MSCU0000003', 'BETA', '22G1'],
+            ])
+
+        self.assertEqual(result.totals[RowResult.IMPORT_TYPE_NEW], 3)
+        self.assertEqual(reserved.call_count, 1)
+        self.assertEqual(
+            list(ManifestEntry.objects.order_by('numar_curent').values_list('numar_curent', 'ship_rel__nume', 'database_year')),
+            [(1, 'ALPHA', self.year.pk), (2, 'ALPHA', self.year.pk), (3, 'BETA', self.year.pk)],
+        )
+        self.assertEqual(counter_values()['ships'], {'ALPHA': 2, 'BETA': 1})
+
+    def test_updates_existing_and_repeated_keys(self):
+        self.import_rows([['M1', '1', 'MSCU0000001', 'ALPHA', '45G1']])
+        existing = ManifestEntry.objects.get()
+
+        result = self.import_rows([
+            ['M1', '1', 'MSCU0000001', 'BETA', '45G1'],
+            ['M1', '2', 'MSCU0000002', 'ALPHA', '45G1'],
+            # Aceeasi cheie ca randul anterior, inca necreat: actualizeaza intrarea din lot, nu o dubleaza
+            ['M1', '2', 'MSCU0000002', 'GAMMA', '45G1'],
+        ])
+
+        self.assertEqual(result.totals[RowResult.IMPORT_TYPE_UPDATE], 2)
+        self.assertEqual(result.totals[RowResult.IMPORT_TYPE_NEW], 1)
+        entries = list(ManifestEntry.objects.order_by('numar_curent'))
+        self.assertEqual([(entry.pk, entry.numar_curent, entry.nume_nava) for entry in entries],
+                         [(existing.pk, 1, 'BETA'), (entries[1].pk, 2, 'GAMMA')])
+        self.assertEqual(entries[1].ship_rel.nume, 'GAMMA')
+
+
+class ExportViewTest(ApiTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        year = DatabaseYear.objects.create(year=2025, is_active=True)
+        BulkImporter(year).run(
+            entry_rows(3, numar_manifest='M1', nume_nava='ALPHA', data_inregistrare=datetime.date(2025, 3, 1))
+            + entry_rows(1, start=3, numar_manifest='M2', nume_nava='BETA')
+        )
+
+    def export(self, **params):
+        response = self.client.get('/api/export/', params, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_csv(self):
+        response = self.export(export_format='csv', year=2025, nava='alpha')
+
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="registru_2025.csv"')
+        content = b''.join(response.streaming_content).decode('utf-8')
+        rows = list(csv.reader(io.StringIO(content.lstrip('\ufeff'))))
+        self.assertEqual(rows[0], exports.headers())
+        self.assertEqual([(row[0], row[1], row[5], row[6]) for row in rows[1:]], [
+            ('1', 'M1', '01.03.2025', 'MSCU0000000'),
+            ('2', 'M1', '01.03.2025', 'MSCU0000001'),
+            ('3', 'M1', '01.03.2025', 'MSCU0000002'),
+        ])
+
+    def test_xlsx(self):
+        response = self.export(export_format='xlsx', container='MSCU0000003')
+
+        workbook = openpyxl.load_workbook(io.BytesIO(b''.join(response.streaming_content)), read_only=True)
+        rows = list(workbook.active.values)
+        self.assertEqual(list(rows[0]), exports.headers())
+        self.assertEqual(rows[1][:2] + rows[1][5:7], (4, 'M2', None, 'MSCU0000003'))
+        self.assertEqual(len(rows), 2)
+
+    def test_iter_rows_pages_by_numar_curent(self):
+        rows = list(exports.iter_rows(exports.export_queryset(), chunk_size=3))
+
+        self.assertEqual([row[0] for row in rows], [1, 2, 3, 4])
+
+    def test_unknown_year(self):
+        self.assertEqual(self.client.get('/api/export/', {'year': 1990}, secure=True).status_code, 404)
+
+
+class CompactSerializerTest(ApiTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        year = DatabaseYear.objects.create(year=2025, is_active=True)
+        BulkImporter(year).run(
+            entry_rows(2, nume_nava='ALPHA', pavilion_nava='PANAMA', greutate_bruta=Decimal('10.5'),
+                       data_inregistrare=datetime.date(2025, 3, 1))
+            + entry_rows(1, start=2, nume_nava='BETA', pavilion_nava='PANAMA')
+        )
+
+    def test_included_lists_each_reference_once(self):
+        data = self.get('/api/manifests/', compact=1)
+        full = self.get('/api/manifests/')
+
+        ships = {ship.nume: ship for ship in Ship.objects.all()}
+        pavilion = Pavilion.objects.get()
+        container_type = ContainerType.objects.get()
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(sorted(data['included']['ships']), sorted(str(ship.pk) for ship in ships.values()))
+        self.assertEqual(data['included']['ships'][str(ships['ALPHA'].pk)]['pavilion'], pavilion.pk)
+        self.assertEqual(list(data['included']['pavilions']), [str(pavilion.pk)])
+        self.assertEqual(data['included']['pavilions'][str(pavilion.pk)]['nume'], 'PANAMA')
+        self.assertEqual(list(data['included']['container_types']), [str(container_type.pk)])
+
+        # Campurile comune au aceleasi valori ca in serializarea completa
+        full_rows = {row['id']: row for row in full['results']}
+        for row in data['results']:
+            self.assertEqual(row['ship'], ships[row['nume_nava']].pk)
+            self.assertEqual(row['container_type'], container_type.pk)
+            for name in ('numar_curent', 'container', 'greutate_bruta', 'data_inregistrare', 'data_inregistrare_formatted', 'created_at'):
+                self.assertEqual(row[name], full_rows[row['id']][name], name)
+
+
+class DuplicateCountTest(CacheResetMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.year = DatabaseYear.objects.create(year=2025, is_active=True)
+        other = DatabaseYear.objects.create(year=2024)
+        for year, container in ((self.year, 'MSCU1234565'), (self.year, 'MSCU1234565'), (self.year, 'MSCU7654321'), (other, 'MSCU1234565')):
+            ManifestEntry.objects.create(database_year=year, numar_manifest='1', container=container)
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'parola')
+
+    def test_annotation_counts_per_year(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        queryset = admin.site.get_model_admin(ManifestEntry).get_queryset(request)
+
+        counts = sorted(queryset.values_list('database_year__year', 'container', 'duplicate_count'))
+        self.assertEqual(counts, [
+            (2024, 'MSCU1234565', 1),
+            (2025, 'MSCU1234565', 2), (2025, 'MSCU1234565', 2), (2025, 'MSCU7654321', 1),
+        ])
+
+    def test_changelist_highlights_duplicates_without_per_row_queries(self):
+        self.client.force_login(self.user)
+        url = f'/admin/manifests/manifestentry/?database_year__id__exact={self.year.pk}'
+
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.get(url, secure=True)
+        self.assertContains(response, 'data-duplicate-count="2"', count=2)
+
+        for i in range(10):
+            ManifestEntry.objects.create(database_year=self.year, numar_manifest='2', container='TGHU%07d' % i)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(url, secure=True)
+        self.assertEqual(len(many), len(few))
+
+
+class SyncLookupTablesTest(CacheResetMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        year = DatabaseYear.objects.create(year=2025, is_active=True)
+        self.alpha = Ship.objects.create(nume='Alpha')
+        # bulk_create nu apeleaza save(): intrari fara relatii, ca dupa un import vechi
+        entries = [
+            ManifestEntry(database_year=year, numar_manifest='1', container='MSCU%07d' % i, tip_container='45G1',
+                          nume_nava=nume, pavilion_nava=' PANAMA ')
+            for i, nume in enumerate(['ALPHA ', 'alpha', 'Beta', 'BETA'])
+        ]
+        for entry in entries:
+            entry.populate_derived_fields()
+        ManifestEntry.objects.bulk_create(entries)
+
+    def sync(self, **options):
+        call_command('sync_lookup_tables', stdout=io.StringIO(), batch_size=2, **options)
+
+    def test_dry_run_writes_nothing(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.sync(dry_run=True)
+
+        writes = [query['sql'] for query in queries if query['sql'].lstrip().upper().startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        self.assertEqual(writes, [])
+        self.assertEqual(Ship.objects.count(), 1)
+        self.assertFalse(ManifestEntry.objects.filter(ship_rel__isnull=False).exists())
+
+    def test_links_ships_case_insensitively(self):
+        self.sync()
+
+        beta = Ship.objects.get(nume__iexact='beta')
+        self.assertEqual(Ship.objects.count(), 2)
+        self.assertEqual(beta.pavilion.nume, 'PANAMA')
+        self.assertEqual(
+            sorted(ManifestEntry.objects.values_list('nume_nava', 'ship_rel')),
+            sorted([('ALPHA ', self.alpha.pk), ('alpha', self.alpha.pk), ('Beta', beta.pk), ('BETA', beta.pk)]),
+        )
+        self.assertFalse(ManifestEntry.objects.filter(container_type_rel__isnull=True).exists())
+        self.assertEqual(counter_values()['ships'], {'Alpha': 2, beta.nume: 2})
+        self.assertEqual(counter_values()['container_types'], {'MSCU45G1': 4})
+
+
+class ThumbnailTest(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media.name, THUMBNAIL_FORMAT='PNG')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.media_root = media.name
+        thumbnails._known.clear()
+        thumbnails._failed.clear()
+
+    def image_upload(self, name, size=(1000, 600)):
+        content = io.BytesIO()
+        Image.new('RGBA', size, (200, 0, 0, 128)).save(content, 'PNG')
+        return SimpleUploadedFile(name, content.getvalue())
+
+    def test_thumbnail_generated_on_save(self):
+        ship = Ship.objects.create(nume='ALPHA', imagine=self.image_upload('alpha.png'))
+
+        url = thumbnails.thumbnail_url(ship.imagine, 'small')
+
+        name = thumbnails.thumb_name(ship.imagine.name, 'small')
+        self.assertEqual(url, f'/media/{name}')
+        self.assertTrue(name.startswith('thumbs/ships/'))
+        with Image.open(os.path.join(self.media_root, name)) as thumb:
+            self.assertEqual(thumb.size, (120, 72))
+            self.assertEqual(thumb.mode, 'RGBA')
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, thumbnails.thumb_name(ship.imagine.name, 'large'))))
+
+    def test_missing_thumbnail_generated_on_request(self):
+        ship = Ship.objects.create(nume='ALPHA', imagine=self.image_upload('alpha.png'))
+        name = thumbnails.thumb_name(ship.imagine.name, 'large')
+        os.remove(os.path.join(self.media_root, name))
+        thumbnails._known.clear()
+
+        self.assertEqual(thumbnails.thumbnail_url(ship.imagine, 'large'), f'/media/{name}')
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, name)))
+
+    def test_unreadable_image_falls_back_to_original(self):
+        with self.assertLogs('manifests.thumbnails', 'WARNING'):
+            ship = Ship.objects.create(nume='ALPHA', imagine=SimpleUploadedFile('alpha.png', b'nu e imagine'))
+            self.assertEqual(thumbnails.thumbnail_url(ship.imagine), ship.imagine.url)
+        # Nu se reincearca in acelasi proces
+        self.assertEqual(thumbnails.thumbnail_url(ship.imagine), ship.imagine.url)
+        self.assertIsNone(thumbnails.thumbnail_url(Ship().imagine))
+
+
+@override_settings(REQUEST_TIMING_ENABLED=True, REQUEST_TIMING_SAMPLE_RATE=1.0)
+class RequestTimingTest(ApiTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        DatabaseYear.objects.create(year=2025, is_active=True)
+
+    def test_server_timing_header_and_sample(self):
+        response = self.client.get('/api/manifests/', secure=True)
+
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="\d+ queries", render;dur=[\d.]+, total;dur=[\d.]+$')
+        sample = RequestTiming.objects.get()
+        self.assertEqual((sample.endpoint, sample.method, sample.status_code), ('/api/manifests/', 'GET', 200))
+        self.assertIn(f'desc="{sample.queries} queries"', timing)
+        self.assertGreater(sample.queries, 0)
+        self.assertTrue(sample.slowest_sql)
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=0.0, REQUEST_TIMING_SLOW_MS=10 ** 6)
+    def test_fast_requests_outside_sample_are_not_saved(self):
+        self.assertIn('Server-Timing', self.client.get('/api/latest-manifest/', secure=True))
+        self.assertFalse(RequestTiming.objects.exists())
+
+    def test_summarize_p95(self):
+        RequestTiming.objects.bulk_create(
+            [RequestTiming(endpoint='/api/a/', method='GET', status_code=200, duration_ms=ms, db_ms=1, queries=ms % 3)
+             for ms in range(1, 21)]
+            + [RequestTiming(endpoint='/api/b/', method='GET', status_code=200, duration_ms=ms, db_ms=1, queries=1)
+               for ms in (500, 100)]
+        )
+
+        expected = [('/api/b/', 500, 2), ('/api/a/', 19, 20)]
+        summary = instrumentation.summarize(RequestTiming.objects.all())
+        self.assertEqual([(row['endpoint'], row['p95_ms'], row['count']) for row in summary], expected)
+        self.assertEqual(summary[1]['max_queries'], 2)
+
+        # Baze de date fara functii fereastra: un query per endpoint, acelasi rezultat
+        with mock.patch.object(connection.features, 'supports_over_clause', False):
+            summary = instrumentation.summarize(RequestTiming.objects.all())
+        self.assertEqual([(row['endpoint'], row['p95_ms'], row['count']) for row in summary], expected)
@@ -0,0 +1,116 @@
+"""
+Miniaturi (thumbnails) pentru imaginile tabelelor de referinta.
+
+Imaginile incarcate pentru ContainerType, Ship si Pavilion sunt originale de
+cativa MB (PNG, PSD). API-ul si admin-ul folosesc in locul lor miniaturi de
+dimensiune fixa, generate cu Pillow si pastrate pe disc in
+MEDIA_ROOT/<THUMBNAIL_DIR>/ (aceeasi structura de directoare ca originalele):
+
+    ships/Nava.png -> thumbs/ships/Nava-large.webp
+
+Miniaturile sunt generate la salvarea obiectului (vezi signals.py) sau, pentru
+imaginile existente, la prima cerere. Numele miniaturii depinde doar de numele
+originalului: o imagine noua primeste un nume nou de la storage, deci si o
+miniatura noua. Daca originalul nu poate fi citit, se foloseste URL-ul lui.
+
+Pentru imaginile existente: python manage.py generate_thumbnails
+"""
+import io
+import logging
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+
+logger = logging.getLogger(__name__)
+
+# Dimensiuni maxime (latime, inaltime); proportiile imaginii sunt pastrate
+SIZES = {
+    'small': (120, 80),    # liste admin, steaguri
+    'large': (480, 360),   # pagina de cautare, formularul din admin
+}
+
+# Format Pillow -> extensie
+EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg', 'PNG': 'png'}
+
+QUALITY = 80
+
+# Miniaturi despre care stim ca exista pe disc (evita un stat() per imagine la fiecare cerere)
+# si originale care nu pot fi citite (nu mai sunt reincercate in acest proces)
+_known = set()
+_failed = set()
+
+
+def thumb_name(name, size):
+    """Numele (in storage) miniaturii unei imagini"""
+    stem = PurePosixPath(name).with_suffix('')
+    extension = EXTENSIONS[settings.THUMBNAIL_FORMAT]
+    return f'{settings.THUMBNAIL_DIR}/{stem}-{size}.{extension}'
+
+
+def render(image, size):
+    """Miniatura unei imagini (ImageFieldFile) ca bytes, in THUMBNAIL_FORMAT"""
+    image_format = settings.THUMBNAIL_FORMAT
+    with image.storage.open(image.name, 'rb') as source:
+        picture = Image.open(source)
+        # JPEG: decodare direct la o rezolutie redusa
+        picture.draft('RGB', SIZES[size])
+        picture = ImageOps.exif_transpose(picture)
+        picture.thumbnail(SIZES[size], Image.Resampling.LANCZOS)
+
+    has_alpha = picture.mode in ('RGBA', 'LA', 'PA') or 'transparency' in picture.info
+    if image_format == 'JPEG' and has_alpha:
+        # JPEG nu are transparenta - fundal alb
+        background = Image.new('RGB', picture.size, 'white')
+        background.paste(picture.convert('RGBA'), mask=picture.convert('RGBA').getchannel('A'))
+        picture = background
+    elif picture.mode not in ('RGB', 'RGBA'):
+        picture = picture.convert('RGBA' if has_alpha else 'RGB')
+
+    output = io.BytesIO()
+    picture.save(output, image_format, quality=QUALITY)
+    return output.getvalue()
+
+
+def generate(image, size, force=False):
+    """Genereaza (daca lipseste) miniatura unei imagini; intoarce numele ei"""
+    name = thumb_name(image.name, size)
+    storage = image.storage
+    if force or not storage.exists(name):
+        content = render(image, size)
+        if storage.exists(name):
+            storage.delete(name)
+        storage.save(name, ContentFile(content))
+    _known.add(name)
+    _failed.discard(name)
+    return name
+
+
+def generate_all(image, force=False):
+    """Toate dimensiunile pentru o imagine; erorile sunt doar logate"""
+    if not image:
+        return
+    for size in SIZES:
+        try:
+            generate(image, size, force=force)
+        except Exception:
+            logger.warning('Nu s-a putut genera miniatura %s pentru %s', size, image.name, exc_info=True)
+
+
+def thumbnail_url(image, size='small'):
+    """URL-ul miniaturii (generata la nevoie), sau al originalului daca nu poate fi generata"""
+    if not image:
+        return None
+    name = thumb_name(image.name, size)
+    if name in _failed:
+        return image.url
+    if name not in _known:
+        try:
+            generate(image, size)
+        except Exception:
+            logger.warning('Nu s-a putut genera miniatura %s pentru %s', size, image.name, exc_info=True)
+            _failed.add(name)
+            return image.url
+    return image.storage.url(name)
@@ -3,7 +3,7 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     ManifestEntryViewSet, DatabaseYearViewSet, ContainerTypeViewSet,
     ShipViewSet, PavilionViewSet, get_csrf_token, login_view, logout_view, check_auth_view,
-    latest_manifest_view
+    latest_manifest_view, export_view
 )
 
 router = DefaultRouter()
@@ -19,5 +19,6 @@ urlpatterns = [
     path('logout/', logout_view, name='logout'),
     path('check-auth/', check_auth_view, name='check_auth'),
     path('latest-manifest/', latest_manifest_view, name='latest_manifest'),
+    path('export/', export_view, name='export'),
     path('', include(router.urls)),
 ]
@@ -1,18 +1,24 @@
 from django.shortcuts import render
 from django.views.decorators.csrf import ensure_csrf_cookie
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse, FileResponse
 from django.contrib.auth import authenticate, login, logout
 from django.views.decorators.http import require_http_methods
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from django.db.models import Q, Max
-from .models import ManifestEntry, DatabaseYear, ContainerType, Ship, Pavilion
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, Max, Sum
+from django.utils.http import parse_etags
+from . import exports, lookups, search_cache, summaries
+from .containers import container_search_q, normalize_container
+from .models import ManifestEntry, ManifestEntryArchive, DatabaseYear, ContainerType, Ship, Pavilion, YearSummary
+from .pagination import KeysetPagination
 from .serializers import (
-    ManifestEntrySerializer, ManifestSearchSerializer,
+    ManifestEntrySerializer, ManifestSearchSerializer, CompactManifestEntrySerializer, ManifestExportSerializer,
     DatabaseYearSerializer, ContainerTypeSerializer, ShipSerializer, PavilionSerializer
 )
+import hashlib
 import json
 import re
 
@@ -90,7 +96,8 @@ class ManifestEntryViewSet(viewsets.ReadOnlyModelViewSet):
     ViewSet pentru cautare si vizualizare intrari manifest.
     Doar utilizatorii autentificati pot accesa.
     """
-    queryset = ManifestEntry.objects.select_related('container_type_rel', 'ship_rel', 'ship_rel__pavilion', 'database_year').all()
+    RELATED = ('container_type_rel', 'ship_rel', 'ship_rel__pavilion', 'database_year')
+    queryset = ManifestEntry.objects.select_related(*RELATED).all()
     serializer_class = ManifestEntrySerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -98,6 +105,46 @@ class ManifestEntryViewSet(viewsets.ReadOnlyModelViewSet):
     ordering_fields = ['data_inregistrare', 'created_at', 'numar_manifest']
     ordering = ['-data_inregistrare']
 
+    # Parametrii de format/paginare care influenteaza raspunsul (si cheia de cache)
+    RESPONSE_PARAMS = ('compact', 'pagination', 'page', 'cursor', 'order', 'page_size', 'count')
+
+    def is_compact(self):
+        """?compact=1 - relatiile ca id-uri + obiectele de referinta o singura data in `included`"""
+        return self.request.query_params.get('compact') in ('1', 'true')
+
+    def get_serializer_class(self):
+        if self.is_compact():
+            return CompactManifestEntrySerializer
+        return super().get_serializer_class()
+
+    def serialize_rows(self, rows, paginated=True):
+        """Datele raspunsului pentru o lista de intrari (paginata sau nu)"""
+        serializer = self.get_serializer(rows, many=True)
+        data = self.get_paginated_response(serializer.data).data if paginated else serializer.data
+        if isinstance(serializer, CompactManifestEntrySerializer):
+            if not paginated:
+                data = {'results': data}
+            data['included'] = serializer.included
+        return data
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return Response(self.serialize_rows(page))
+        return Response(self.serialize_rows(queryset, paginated=False))
+
+    @property
+    def paginator(self):
+        """Paginare cu numar de pagina (implicit) sau keyset cu ?pagination=cursor"""
+        if not hasattr(self, '_paginator'):
+            request = getattr(self, 'request', None)
+            if request is not None and request.query_params.get('pagination') == 'cursor':
+                self._paginator = KeysetPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
     @action(detail=False, methods=['get'])
     def search(self, request):
         """
@@ -120,23 +167,42 @@ class ManifestEntryViewSet(viewsets.ReadOnlyModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-        queryset = self.get_queryset()
+        # Anul cautat (sau anul activ) - rezolvat din cache-ul de referinta
+        year_id = lookups.resolve_year_id(year)
 
-        # Filtru dupa an
-        if year:
-            queryset = queryset.filter(database_year__year=year)
+        container_q = container_search_q(container) if container else None
+        if container_q is not None:
+            container_key = normalize_container(container)
         else:
-            # Daca nu e specificat anul, foloseste anul activ
-            active_year = DatabaseYear.objects.filter(is_active=True).first()
-            if active_year:
-                queryset = queryset.filter(database_year=active_year)
+            container_key = container.upper()
 
-        # Filtru dupa container (exact sau partial)
+        cache_key = search_cache.make_key(
+            'search', year_id,
+            year, request.scheme, request.get_host(),
+            container_key, numar_manifest.upper(),
+            *(request.query_params.get(param, '') for param in self.RESPONSE_PARAMS),
+        )
+        data = search_cache.get_response(cache_key)
+        if data is not None:
+            return Response(data)
+
+        queryset = self.get_queryset()
+
+        # Filtru dupa an (anul cerut sau anul activ); anii arhivati sunt cititi din arhiva
+        if year_id:
+            if lookups.is_archived_year(year_id):
+                queryset = ManifestEntryArchive.objects.select_related(*self.RELATED)
+            queryset = queryset.filter(database_year_id=year_id)
+        elif year:
+            # Anul cerut nu exista
+            queryset = queryset.none()
+
+        # Filtru dupa container: cautare indexata pe codul normalizat (exact sau prefix),
+        # cu fallback pe cautarea partiala pentru texte neobisnuite
         if container:
-            queryset = queryset.filter(
-                Q(container__icontains=container) |
-                Q(model_container__icontains=container)
-            )
+            if container_q is None:
+                container_q = Q(container__icontains=container) | Q(model_container__icontains=container)
+            queryset = queryset.filter(container_q)
 
         # Filtru dupa numar manifest (exact sau partial)
         if numar_manifest:
@@ -145,11 +211,12 @@ class ManifestEntryViewSet(viewsets.ReadOnlyModelViewSet):
         # Paginare
         page = self.paginate_queryset(queryset)
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            data = self.serialize_rows(page)
+        else:
+            data = self.serialize_rows(queryset, paginated=False)
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        search_cache.set_response(cache_key, data)
+        return Response(data)
 
 
 class DatabaseYearViewSet(viewsets.ReadOnlyModelViewSet):
@@ -192,39 +259,92 @@ class PavilionViewSet(viewsets.ReadOnlyModelViewSet):
 def latest_manifest_view(request):
     """
     Endpoint pentru obtinerea ultimului manifest actualizat
-    Returneaza numarul manifest cel mai mare si data cea mai recenta
+    Returneaza numarul manifest cel mai mare si data cea mai recenta, din
+    rezumatul precalculat al anului (YearSummary), cu ETag pentru 304
     """
     year = request.GET.get('year')
 
-    queryset = ManifestEntry.objects.all()
-
-    # Filtru dupa an
-    if year:
-        try:
-            year_obj = DatabaseYear.objects.get(year=int(year))
-            queryset = queryset.filter(database_year=year_obj)
-        except DatabaseYear.DoesNotExist:
-            pass
+    # Anul cerut sau, daca lipseste/nu exista, anul activ
+    year_id = lookups.resolve_year_id(int(year)) if year else None
+    if year_id is None and not year:
+        year_id = lookups.resolve_year_id()
+
+    cache_key = search_cache.make_key('latest', year_id)
+    cached = search_cache.get_response(cache_key)
+    if cached is None:
+        data = _latest_manifest_data(year_id)
+        payload = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+        cached = {'data': data, 'etag': f'"{hashlib.md5(payload.encode("utf-8")).hexdigest()}"'}
+        search_cache.set_response(cache_key, cached)
+
+    if cached['etag'] in parse_etags(request.headers.get('If-None-Match', '')):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
     else:
-        # Foloseste anul activ
-        active_year = DatabaseYear.objects.filter(is_active=True).first()
-        if active_year:
-            queryset = queryset.filter(database_year=active_year)
-
-    # Gaseste intrarea cu data_inregistrare cea mai recenta
-    latest_entry = queryset.filter(
-        data_inregistrare__isnull=False
-    ).order_by('-data_inregistrare', '-numar_manifest').first()
-
-    if latest_entry:
-        return Response({
-            'numar_manifest': latest_entry.numar_manifest,
-            'data_inregistrare': latest_entry.data_inregistrare.strftime('%d.%m.%Y') if latest_entry.data_inregistrare else None,
-            'nume_nava': latest_entry.nume_nava or None
-        })
+        response = Response(cached['data'])
+    response['ETag'] = cached['etag']
+    # Clientul poate pastra raspunsul, dar il revalideaza la fiecare cerere
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _latest_manifest_data(year_id):
+    """Raspunsul pentru /api/latest-manifest/ din YearSummary (fara ORDER BY peste intrari)"""
+    if year_id:
+        summary = summaries.get(year_id)
+        entries_count = summary.database_year.entries_count
     else:
-        return Response({
+        # Fara an: cel mai recent manifest dintre rezumatele tuturor anilor
+        summary = YearSummary.objects.filter(latest_data_inregistrare__isnull=False).order_by(
+            '-latest_data_inregistrare', '-latest_numar_manifest'
+        ).first()
+        entries_count = DatabaseYear.objects.aggregate(total=Sum('entries_count'))['total'] or 0
+
+    if summary is None or summary.latest_data_inregistrare is None:
+        return {
             'numar_manifest': None,
             'data_inregistrare': None,
-            'nume_nava': None
-        })
+            'nume_nava': None,
+            'entries_count': entries_count,
+            'last_import_at': summary.last_import_at if summary else None,
+        }
+    return {
+        'numar_manifest': summary.latest_numar_manifest,
+        'data_inregistrare': summary.latest_data_inregistrare.strftime('%d.%m.%Y'),
+        'nume_nava': summary.latest_nume_nava or None,
+        'entries_count': entries_count,
+        'last_import_at': summary.last_import_at,
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_view(request):
+    """
+    Export in flux al intrarilor (CSV sau XLSX), in memorie constanta
+    GET /api/export/?export_format=csv|xlsx&year=2025&numar_manifest=&nava=&container=&data_de=&data_pana=
+    """
+    serializer = ManifestExportSerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    params = serializer.validated_data
+
+    year_id = lookups.resolve_year_id(params.get('year'))
+    if params.get('year') and year_id is None:
+        return Response({'detail': 'Anul cerut nu exista'}, status=status.HTTP_404_NOT_FOUND)
+
+    queryset = exports.export_queryset(
+        year_id=year_id,
+        numar_manifest=params.get('numar_manifest', '').strip(),
+        nume_nava=params.get('nava', '').strip(),
+        container=params.get('container', '').strip(),
+        data_de=params.get('data_de'),
+        data_pana=params.get('data_pana'),
+    )
+    rows = exports.iter_rows(queryset)
+    filename = f"registru_{params.get('year') or 'activ'}"
+
+    if params['export_format'] == 'xlsx':
+        return FileResponse(exports.xlsx_tempfile(rows), as_attachment=True, filename=f'{filename}.xlsx')
+
+    response = StreamingHttpResponse(exports.iter_csv(rows), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response